@@ -0,0 +1,112 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+"""
+Stacks kept compressed in memory while they are not in use, so that more of them can be kept open at once.
+
+Each image is compressed on its own, with lz4 if it is installed, as it is several times faster,
+or zlib otherwise. Both release the GIL, so the images are compressed and decompressed in threads.
+"""
+
+import zlib
+from logging import getLogger
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+from mantidimaging.core.data.lazy_stack import LazyStack
+from mantidimaging.core.parallel import shared as ps, utility as pu
+from mantidimaging.core.parallel.backends import Backend
+from mantidimaging.core.utility.optional_imports import safe_import
+from mantidimaging.core.utility.progress_reporting import Progress
+
+LOG = getLogger(__name__)
+
+lz4_frame = safe_import('lz4.frame')
+
+# zlib level used without lz4. Higher levels are several times slower, but barely compress images better
+ZLIB_LEVEL = 1
+
+
+def compress_image(image: np.ndarray) -> bytes:
+    buffer = np.ascontiguousarray(image).data
+    if lz4_frame is not None:
+        return lz4_frame.compress(buffer)
+    return zlib.compress(buffer, ZLIB_LEVEL)
+
+
+def decompress_image(chunk: bytes, shape, dtype) -> np.ndarray:
+    buffer = lz4_frame.decompress(chunk) if lz4_frame is not None else zlib.decompress(chunk)
+    return np.frombuffer(buffer, dtype).reshape(shape)
+
+
+def _compress_images(images: np.ndarray, chunks: np.ndarray):
+    for position, image in enumerate(images):
+        chunks[position] = compress_image(image)
+
+
+def _decompress_images(chunks: Sequence[bytes], out: np.ndarray):
+    for position, chunk in enumerate(chunks):
+        out[position] = decompress_image(chunk, out.shape[1:], out.dtype)
+
+
+class CompressedStack(LazyStack):
+    """
+    A stack of images kept compressed in memory, which are decompressed when they are accessed.
+
+    Single images are decompressed on their own, e.g. to be shown in the stack visualiser,
+    while the whole stack is decompressed on several cores, see `materialise`.
+    """
+    def __init__(self,
+                 data: Union[np.ndarray, LazyStack],
+                 progress: Optional[Progress] = None,
+                 cores: Optional[int] = None):
+        """
+        :param data: The stack to compress. Lazy stacks are read a block of images at a time, without loading all
+                     of them first
+        :param progress: Progress of the images compressed
+        :param cores: Number of threads to compress and decompress with, all cores by default
+        """
+        chunks = np.empty(data.shape[0], dtype=object)
+        ps.execute(ps.create_partial(_compress_images, ps.inplace2_stored),
+                   data.shape[0],
+                   progress,
+                   msg="Compressing",
+                   cores=cores or pu.get_cores(),
+                   batched=True,
+                   shared_list=[data, chunks],
+                   backend=Backend.THREADS)
+        super().__init__(list(chunks), self._decompress, data.shape[1:], data.dtype)
+        self.cores = cores
+        # the decompressed images are only wanted while they are shown, so few of them are kept
+        self.cache_size = min(self.cache_size, 2)
+
+    def _decompress(self, chunk: bytes) -> np.ndarray:
+        return decompress_image(chunk, self.shape[1:], self.dtype)
+
+    @property
+    def compressed_bytes(self) -> int:
+        return sum(len(chunk) for chunk in self.files)
+
+    def materialise(self, progress: Optional[Progress] = None) -> np.ndarray:
+        """
+        Decompresses all of the images into a shared array on several cores, and drops the compressed images.
+        """
+        with self._lock:
+            if self._materialised is not None:
+                return self._materialised
+
+            LOG.info(f"Decompressing all {len(self)} images of the stack")
+            data = pu.create_array(self.shape, self.dtype, first_touch=True)
+            ps.execute(ps.create_partial(_decompress_images, ps.inplace2_stored),
+                       len(self),
+                       progress,
+                       msg="Decompressing",
+                       cores=self.cores or pu.get_cores(),
+                       batched=True,
+                       shared_list=[self.files, data],
+                       backend=Backend.THREADS)
+            for index, image in self._written.items():
+                data[index] = image
+            self._set_materialised(data)
+            self.files = []
+            return data
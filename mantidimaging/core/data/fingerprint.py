@@ -0,0 +1,41 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+"""
+Fingerprints of the contents of stacks, so that two stacks can be compared without comparing all of their data.
+
+Each image is hashed on its own, and the hashes of the images are combined into the fingerprint of the stack.
+Only the images that have changed since are hashed again, see `Images.mark_changed`.
+"""
+
+import hashlib
+
+import numpy as np
+
+from mantidimaging.core.data.statistics import PerImageCache
+from mantidimaging.core.parallel.backends import Backend
+
+DIGEST_SIZE = 16
+
+
+def image_digest(image: np.ndarray) -> np.ndarray:
+    return np.frombuffer(hashlib.blake2b(np.ascontiguousarray(image).data, digest_size=DIGEST_SIZE).digest(), np.uint8)
+
+
+class StackFingerprint(PerImageCache):
+    width = DIGEST_SIZE
+    dtype = np.uint8
+    # hashlib releases the GIL while hashing, and threads can read the images of lazy stacks without loading them all
+    backend = Backend.THREADS
+
+    @staticmethod
+    def compute(image: np.ndarray) -> np.ndarray:
+        return image_digest(image)
+
+    def digest(self, shape, dtype) -> bytes:
+        """
+        :return: The fingerprint of the whole stack, which has to be up to date, see `update`
+        """
+        assert not self.is_stale, "The fingerprint has to be updated first"
+        stack_hash = hashlib.blake2b(f"{tuple(shape)} {np.dtype(dtype).str}".encode(), digest_size=DIGEST_SIZE)
+        stack_hash.update(self.per_image.data)
+        return stack_hash.digest()
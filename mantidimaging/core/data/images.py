@@ -4,30 +4,40 @@
 import datetime
 import json
 from copy import deepcopy
-from typing import List, Tuple, Optional, Any, Dict
+from logging import getLogger
+from typing import List, Tuple, Optional, Any, Dict, Set, Union
 
 import numpy as np
 
+from mantidimaging.core.data import transpose
+from mantidimaging.core.data.compressed_stack import CompressedStack
+from mantidimaging.core.data.fingerprint import StackFingerprint
+from mantidimaging.core.data.lazy_stack import LazyStack, copy_on_write
+from mantidimaging.core.data.statistics import StackStatistics
 from mantidimaging.core.data.utility import mark_cropped
 from mantidimaging.core.operation_history import const
-from mantidimaging.core.parallel import utility as pu
+from mantidimaging.core.parallel import allocator, scratch, shared as ps, utility as pu
 from mantidimaging.core.utility.data_containers import ProjectionAngles, Counts
 from mantidimaging.core.utility.imat_log_file_parser import IMATLogFile
+from mantidimaging.core.utility.memory_usage import NotEnoughMemory
+from mantidimaging.core.utility.progress_reporting import Progress
 from mantidimaging.core.utility.sensible_roi import SensibleROI
 
+LOG = getLogger(__name__)
+
 
 class Images:
     NO_FILENAME_IMAGE_TITLE_STRING = "Image: {}"
 
     def __init__(self,
-                 data: np.ndarray,
+                 data: Union[np.ndarray, LazyStack],
                  filenames: Optional[List[str]] = None,
                  indices: Optional[Tuple[int, int, int]] = None,
                  metadata: Optional[Dict[str, Any]] = None,
                  sinograms: bool = False):
         """
 
-        :param data: Images of the Sample/Projection data
+        :param data: Images of the Sample/Projection data, or a LazyStack that decodes them when they are accessed
         :param filenames: All filenames that were matched for loading
         :param indices: Indices that were actually loaded
         :param metadata: Properties to copy when creating a new stack from an existing one
@@ -45,22 +55,50 @@ class Images:
         self._log_file: Optional[IMATLogFile] = None
         self._projection_angles: Optional[ProjectionAngles] = None
 
+        # Copy of projection data with the sinograms contiguous in memory, see `build_sinogram_mirror`
+        self._sinogram_mirror: Optional[np.ndarray] = None
+        # Projections that have changed since they were copied into the mirror
+        self._stale_mirror_projections: Set[int] = set()
+        self._statistics: Optional[StackStatistics] = None
+        self._fingerprint: Optional[StackFingerprint] = None
+        # Whether the data was moved into a scratch file by `evict`, rather than loaded into one
+        self._evicted = False
+        # Whether the array was handed out by `data` since the kept statistics, fingerprint and mirror were checked,
+        # as it might have been changed through it
+        self._data_exposed = False
+
     def __eq__(self, other):
         if isinstance(other, Images):
-            return np.array_equal(self.data, other.data) \
-                   and self.is_sinograms == other.is_sinograms \
-                   and self.metadata == other.metadata \
-                   and self.indices == other.indices
+            return self is other or (self.is_sinograms == other.is_sinograms and self.metadata == other.metadata
+                                     and self.indices == other.indices and self._same_data(other))
         elif isinstance(other, np.ndarray):
-            return np.array_equal(self.data, other)
+            return np.array_equal(self._array(), other)
         else:
             raise ValueError(f"Cannot compare against {other}")
 
     def __ne__(self, other):
         return not self == other
 
+    def _same_data(self, other: 'Images') -> bool:
+        if self._data.shape != other._data.shape:
+            return False
+        if self.dtype != other.dtype:
+            return np.array_equal(self._array(), other._array())
+        return self.fingerprint() == other.fingerprint()
+
+    def fingerprint(self) -> bytes:
+        """
+        A hash of the contents of the images, which only hashes again the images that have changed since,
+        see `mark_changed`.
+        """
+        self._check_exposed_data()
+        if self._fingerprint is None:
+            self._fingerprint = StackFingerprint(self._data.shape[0])
+        self._fingerprint.update(self._data)
+        return self._fingerprint.digest(self._data.shape, self.dtype)
+
     def __str__(self):
-        return f'Image Stack: data={self.data.shape} | properties|={len(self.metadata)}'
+        return f'Image Stack: data={self._data.shape} | properties|={len(self.metadata)}'
 
     def count(self) -> int:
         return len(self._filenames) if self._filenames else 0
@@ -71,7 +109,7 @@ class Images:
 
     @filenames.setter
     def filenames(self, new_ones: List[str]):
-        assert len(new_ones) == self.data.shape[0], "Number of filenames and number of images must match."
+        assert len(new_ones) == self._data.shape[0], "Number of filenames and number of images must match."
         self._filenames = new_ones
 
     def load_metadata(self, f):
@@ -87,6 +125,7 @@ class Images:
         json.dump(self.metadata, f, indent=4)
 
     def record_operation(self, func_name: str, display_name, *args, **kwargs):
+        self.mark_changed()
         if const.OPERATION_HISTORY not in self.metadata:
             self.metadata[const.OPERATION_HISTORY] = []
 
@@ -111,12 +150,19 @@ class Images:
         })
 
     def copy(self, flip_axes=False) -> 'Images':
-        shape = (self.data.shape[1], self.data.shape[0], self.data.shape[2]) if flip_axes else self.data.shape
-        data_copy = pu.create_array(shape, self.data.dtype)
+        """
+        Copies the images. Without flipping the axes, the copy shares its memory with these images
+        until either of them is changed, and then only copies the images that were changed, or all of them
+        if the whole stack is used as an array, see `lazy_stack.copy_on_write`. These images then read from
+        the shared memory as well, so a view showing them should show `display_data` again.
+        """
+        data_copy: Union[np.ndarray, LazyStack]
         if flip_axes:
-            data_copy[:] = np.swapaxes(self.data, 0, 1)
+            data = self._array()
+            data_copy = pu.create_array(transpose.swapped_shape(data), data.dtype, use_scratch=self.is_scratch_backed)
+            transpose.swap_axes(data, data_copy)
         else:
-            data_copy[:] = self.data[:]
+            self._data, data_copy = copy_on_write(self._data)
 
         images = Images(data_copy,
                         indices=deepcopy(self.indices),
@@ -125,10 +171,10 @@ class Images:
         return images
 
     def copy_roi(self, roi: SensibleROI):
-        shape = (self.data.shape[0], roi.height, roi.width)
+        shape = (self._data.shape[0], roi.height, roi.width)
 
-        data_copy = pu.create_array(shape, self.data.dtype)
-        data_copy[:] = self.data[:, roi.top:roi.bottom, roi.left:roi.right]
+        data_copy = pu.create_array(shape, self.dtype, use_scratch=self.is_scratch_backed)
+        data_copy[:] = self._array()[:, roi.top:roi.bottom, roi.left:roi.right]
 
         images = Images(data_copy,
                         indices=deepcopy(self.indices),
@@ -139,18 +185,18 @@ class Images:
         return images
 
     def index_as_images(self, index) -> 'Images':
-        return Images(np.asarray([self.data[index]]), metadata=deepcopy(self.metadata), sinograms=self.is_sinograms)
+        return Images(np.asarray([self._data[index]]), metadata=deepcopy(self.metadata), sinograms=self.is_sinograms)
 
     @property
     def height(self):
         if not self._is_sinograms:
-            return self.data.shape[1]
+            return self._data.shape[1]
         else:
-            return self.data.shape[0]
+            return self._data.shape[0]
 
     @property
     def width(self):
-        return self.data.shape[2]
+        return self._data.shape[2]
 
     @property
     def h_middle(self) -> float:
@@ -168,30 +214,34 @@ class Images:
 
     @property
     def num_images(self) -> int:
-        return self.data.shape[0]
+        return self._data.shape[0]
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        """
+        The shape of the stack, which is read without loading or decompressing the images
+        """
+        return self._data.shape
 
     @property
     def num_projections(self) -> int:
         if not self._is_sinograms:
-            return self.data.shape[0]
+            return self._data.shape[0]
         else:
-            return self.data.shape[1]
+            return self._data.shape[1]
 
     @property
     def num_sinograms(self) -> int:
         return self.height
 
     def sino(self, slice_idx) -> np.ndarray:
-        if not self._is_sinograms:
-            return np.swapaxes(self.data, 0, 1)[slice_idx]
-        else:
-            return self.data[slice_idx]
+        return self.sinograms[slice_idx]
 
     def projection(self, projection_idx) -> np.ndarray:
         if self._is_sinograms:
-            return np.swapaxes(self.data, 0, 1)[projection_idx]
+            return np.swapaxes(self._array(), 0, 1)[projection_idx]
         else:
-            return self.data[projection_idx]
+            return self._data[projection_idx]
 
     def has_proj180deg(self):
         return self._proj180deg is not None
@@ -214,27 +264,281 @@ class Images:
 
     @property
     def projections(self):
-        return self._data if not self._is_sinograms else np.swapaxes(self._data, 0, 1)
+        return self.data if not self._is_sinograms else np.swapaxes(self.data, 0, 1)
+
+    @property
+    def sinograms(self) -> np.ndarray:
+        """
+        The images as sinograms. If there is a sinogram mirror, this is a read-only view of it.
+        """
+        if self._is_sinograms:
+            return self.data
+        self._check_exposed_data()
+        if self._sinogram_mirror is None:
+            return np.swapaxes(self.data, 0, 1)
+
+        data = self._array()
+        for projection in self._stale_mirror_projections:
+            self._sinogram_mirror[:, projection] = data[projection]
+        self._stale_mirror_projections.clear()
+        sinograms = self._sinogram_mirror.view()
+        sinograms.flags.writeable = False
+        return sinograms
+
+    def build_sinogram_mirror(self, progress: Optional[Progress] = None) -> bool:
+        """
+        Keeps a copy of projection data with each sinogram contiguous in memory, which `sino` and `sinograms` read
+        from instead of the strided view of the projections. The mirror is dropped when all of the images are marked
+        as changed, see `mark_changed`, so projections should be changed through `set_projection` while the mirror
+        is in use.
+
+        :return: Whether there is a mirror, as it is not built if there is not enough memory for it
+        """
+        self._check_exposed_data()
+        if self._is_sinograms or self._sinogram_mirror is not None:
+            return self._sinogram_mirror is not None
+
+        data = self._array()
+        try:
+            mirror = pu.create_array(transpose.swapped_shape(data), data.dtype, use_scratch=self.is_scratch_backed)
+        except NotEnoughMemory as e:
+            LOG.warning(f"Not using a sinogram mirror: {e}")
+            return False
+        self._sinogram_mirror = transpose.swap_axes(data, mirror, progress)
+        self._stale_mirror_projections.clear()
+        return True
+
+    def drop_sinogram_mirror(self):
+        self._sinogram_mirror = None
+        self._stale_mirror_projections.clear()
+
+    @property
+    def has_sinogram_mirror(self) -> bool:
+        return self._sinogram_mirror is not None
+
+    def set_projection(self, projection_idx: int, image: np.ndarray):
+        """
+        Changes a projection, and only the parts of the sinogram mirror and statistics that it is in.
+        """
+        if self._is_sinograms:
+            self._data[:, projection_idx] = image
+            self.mark_changed()
+        else:
+            self._data[projection_idx] = image
+            self.mark_changed([projection_idx % self.num_projections])
+
+    def mark_changed(self, indices: Optional[List[int]] = None):
+        """
+        Marks that images have been changed in place, so that what is kept about them is worked out again.
+        Operations do this when they are recorded, see `record_operation`.
+
+        :param indices: The images that have changed, or None if any of them might have
+        """
+        if self._statistics is not None:
+            self._statistics.mark_changed(indices)
+        if self._fingerprint is not None:
+            self._fingerprint.mark_changed(indices)
+        if self._sinogram_mirror is not None:
+            if indices is None:
+                self.drop_sinogram_mirror()
+            else:
+                self._stale_mirror_projections.update(indices)
 
     @property
-    def sinograms(self):
-        return self._data if self._is_sinograms else np.swapaxes(self._data, 0, 1)
+    def statistics(self) -> StackStatistics:
+        """
+        The statistics of the images, which are only worked out again for the images that have changed since,
+        see `mark_changed`.
+        """
+        self._check_exposed_data()
+        statistics = self._statistics_cache()
+        statistics.update(self._array())
+        return statistics
+
+    def summed_image(self) -> np.ndarray:
+        """
+        The sum of all of the images, which is kept until any of them change.
+        """
+        self._check_exposed_data()
+        return self._statistics_cache().summed_image(self._array())
+
+    def _statistics_cache(self) -> StackStatistics:
+        if self._statistics is None:
+            data = self._array()
+            self._statistics = StackStatistics(data.shape[0], int(np.prod(data.shape[1:])))
+        return self._statistics
+
+    def _check_exposed_data(self):
+        if self._data_exposed:
+            self._data_exposed = False
+            self.mark_changed()
 
     @property
     def data(self) -> np.ndarray:
-        return self._data
+        """
+        The images as an array. Lazy images are all loaded the first time this is used, see `display_data`.
+        As the images can be changed through it, all of them are treated as changed the next time that their
+        statistics, fingerprint or sinograms are used, see `mark_changed`. Use `read_only_data` to only read them.
+        """
+        self._data_exposed = True
+        return self._array()
 
     @data.setter
     def data(self, other: np.ndarray):
+        self.drop_sinogram_mirror()
+        self._evicted = False
+        self._statistics = None
+        self._fingerprint = None
+        self._data_exposed = False
         self._data = other
 
+    @property
+    def read_only_data(self) -> np.ndarray:
+        """
+        The images as a read-only view of their array, which keeps what is known about them, unlike `data`
+        """
+        data = self._array().view()
+        data.flags.writeable = False
+        return data
+
+    def _array(self) -> np.ndarray:
+        if isinstance(self._data, LazyStack):
+            self._data = self._data.materialise()
+        return self._data
+
+    @property
+    def display_data(self) -> Union[np.ndarray, LazyStack]:
+        """
+        The images for showing one at a time, which does not load lazy images until they are shown
+        """
+        return self._data
+
+    @property
+    def is_lazy(self) -> bool:
+        """
+        Whether the images are still decoded from their files, or read from the stack that they were copied from,
+        when they are accessed
+        """
+        return isinstance(self._data, LazyStack)
+
+    @property
+    def is_file_backed(self) -> bool:
+        """
+        Whether the images are still decoded from their files when they are accessed, so do not take up memory
+        """
+        return type(self._data) is LazyStack and not self._data.is_materialised
+
+    def release(self):
+        """
+        Marks that the stack is done with its memory, see `allocator.release`. Memory that is shared with copies
+        of the stack is only released by the last of them to read from it.
+        """
+        if isinstance(self._data, LazyStack):
+            self._data.release()
+        else:
+            allocator.release(self._data)
+
+    def compress(self, progress: Optional[Progress] = None) -> bool:
+        """
+        Keeps the images compressed in memory until they are used, see `compressed_stack`. Images that are
+        still decoded from their files, already compressed, or in a scratch file, are left as they are.
+        Copies that still share their memory are compressed from it, without copying the whole stack first.
+
+        :return: Whether the images were compressed
+        """
+        if self.is_file_backed or self.is_compressed or self.is_scratch_backed:
+            return False
+        self.drop_sinogram_mirror()
+        self._data = CompressedStack(self._data, progress)
+        return True
+
+    @property
+    def is_compressed(self) -> bool:
+        return isinstance(self._data, CompressedStack) and not self._data.is_materialised
+
+    def evict(self) -> bool:
+        """
+        Moves the images into a scratch file, which frees up their memory until they are moved back with `restore`.
+        They can still be used in the meantime, but are read from the scratch file. Images that are still decoded
+        from their files, compressed, or already in a scratch file, are left as they are.
+
+        :return: Whether the images were moved
+        """
+        if self.is_file_backed or self.is_compressed or self.is_scratch_backed:
+            return False
+        evicted = scratch.create_array(self._data.shape, self.dtype)
+        if isinstance(self._data, LazyStack) and not self._data.is_materialised:
+            # a copy that still shares its memory is moved an image at a time, rather than copied in memory first
+            for index in range(self.num_images):
+                evicted[index] = self._data[index]
+        else:
+            evicted[:] = self._array()
+        self.drop_sinogram_mirror()
+        self._data = evicted
+        self._evicted = True
+        return True
+
+    def restore(self) -> bool:
+        """
+        Moves images that were evicted to a scratch file back into memory, if there is enough memory for them.
+
+        :return: Whether the images were moved
+        """
+        if not self._evicted:
+            return False
+        data = self._array()
+        try:
+            restored = pu.create_array(data.shape, data.dtype)
+        except NotEnoughMemory as e:
+            LOG.warning(f"Keeping the images in their scratch file: {e}")
+            return False
+        if scratch.is_scratch_array(restored):
+            # there was only room for them in another scratch file
+            return False
+        restored[:] = data
+        self._data = restored
+        self._evicted = False
+        return True
+
+    @property
+    def is_evicted(self) -> bool:
+        return self._evicted
+
+    @property
+    def is_scratch_backed(self) -> bool:
+        """
+        Whether the data is memory mapped from a scratch file rather than held in memory, see core.parallel.scratch
+        """
+        if isinstance(self._data, LazyStack):
+            return self._data.use_scratch
+        return scratch.is_scratch_array(self._data)
+
     @property
     def dtype(self):
         return self._data.dtype
 
+    @property
+    def is_reduced_precision(self) -> bool:
+        """
+        Whether the images are stored in reduced precision, e.g. float16. The operations then work on them
+        upcast an image at a time, see `shared.REDUCED_PRECISION_DTYPES`.
+        """
+        return self.dtype in ps.REDUCED_PRECISION_DTYPES
+
+    def change_storage_dtype(self, dtype):
+        """
+        Converts the images to be stored in another type, e.g. float16 to halve the memory of a float32 stack.
+        """
+        data = self._array()
+        if data.dtype == dtype:
+            return
+        converted = pu.create_array(data.shape, dtype, use_scratch=self.is_scratch_backed)
+        converted[:] = data
+        self.data = converted
+
     @staticmethod
     def create_empty_images(shape, dtype, metadata):
-        arr = pu.create_array(shape, dtype)
+        arr = pu.create_array(shape, dtype, zeroed=True)
         return Images(arr, metadata=metadata)
 
     @property
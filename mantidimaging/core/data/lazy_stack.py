@@ -0,0 +1,304 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+
+import threading
+import weakref
+from collections import OrderedDict
+from logging import getLogger
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from mantidimaging.core.parallel import allocator, scratch, utility as pu
+from mantidimaging.core.utility.progress_reporting import Progress
+
+LOG = getLogger(__name__)
+
+# Memory used by the decoded images kept for each lazy stack
+CACHE_BYTES = 512 * 1024**2
+
+
+class LazyStack:
+    """
+    A stack of images that are only decoded from their files when they are accessed.
+
+    It looks enough like a 3D array to be shown in the stack visualiser: indexing a single image
+    decodes only that one, and keeps it in a cache of the most recently used images. Writing to a
+    single image keeps the written image instead. Anything that works on the whole stack converts it
+    to an array, which loads every image into a shared array, see `materialise`. From then on the
+    stack only forwards to that array.
+    """
+    ndim = 3
+
+    def __init__(self,
+                 files: Sequence,
+                 load_func: Callable[..., np.ndarray],
+                 image_shape: Tuple[int, int],
+                 dtype,
+                 use_scratch: bool = False):
+        """
+        :param files: The file of each image, in order
+        :param load_func: Decodes the image in a file
+        :param image_shape: Shape that all of the images have
+        :param dtype: Dtype that the images are converted to
+        :param use_scratch: Materialise the stack into a scratch file rather than memory, see core.parallel.scratch
+        """
+        self.files = files
+        self.load_func = load_func
+        self.shape = (len(files), image_shape[0], image_shape[1])
+        self.dtype = np.dtype(dtype)
+        self.cache_size = max(1, CACHE_BYTES // (image_shape[0] * image_shape[1] * self.dtype.itemsize))
+        self.use_scratch = use_scratch
+        self._cache: 'OrderedDict[int, np.ndarray]' = OrderedDict()
+        # Images that have been written to, which are kept until the stack is materialised
+        self._written: Dict[int, np.ndarray] = {}
+        self._lock = threading.RLock()
+        self._materialised: Optional[np.ndarray] = None
+
+    @property
+    def size(self) -> int:
+        return int(np.prod(self.shape))
+
+    @property
+    def nbytes(self) -> int:
+        return self.size * self.dtype.itemsize
+
+    @property
+    def is_materialised(self) -> bool:
+        return self._materialised is not None
+
+    def __len__(self):
+        return self.shape[0]
+
+    def _load(self, index: int) -> np.ndarray:
+        with self._lock:
+            if index in self._written:
+                return self._written[index]
+            if index in self._cache:
+                self._cache.move_to_end(index)
+                return self._cache[index]
+
+        image = np.asarray(self.load_func(self.files[index]), dtype=self.dtype)
+        if image.shape != self.shape[1:]:
+            raise ValueError(f"Image {self.files[index]} has shape {image.shape}, "
+                             f"but all images must have shape {self.shape[1:]}")
+
+        with self._lock:
+            self._cache[index] = image
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return image
+
+    def __getitem__(self, key):
+        if self._materialised is not None:
+            return self._materialised[key]
+
+        key = key if isinstance(key, tuple) else (key, )
+        first, rest = key[0], key[1:]
+        if isinstance(first, (int, np.integer)):
+            image = self._load(self._image_index(first))
+            return image[rest] if rest else image
+        if first is Ellipsis or first is None:
+            return self.materialise()[key]
+
+        indices = np.arange(len(self))[first]
+        images = np.empty((len(indices), ) + self.shape[1:], self.dtype)
+        for position, index in enumerate(indices):
+            images[position] = self._load(index)
+        return images[(slice(None), ) + rest]
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            if self._materialised is None:
+                key = key if isinstance(key, tuple) else (key, )
+                if isinstance(key[0], (int, np.integer)):
+                    index = self._image_index(key[0])
+                    if index not in self._written:
+                        self._written[index] = self._load(index).copy()
+                        self._cache.pop(index, None)
+                    self._written[index][key[1:]] = value
+                    return
+            self.materialise()[key] = value
+
+    def _image_index(self, index) -> int:
+        index = int(index)
+        if not -len(self) <= index < len(self):
+            raise IndexError(f"Index {index} is out of bounds for a stack of {len(self)} images")
+        return index % len(self)
+
+    def __array__(self, dtype=None):
+        data = self.materialise()
+        return data if dtype is None else data.astype(dtype)
+
+    def transpose(self, *axes):
+        # pyqtgraph passes the axes as a list, e.g. [0, 1, 2]
+        if axes == () or tuple(np.ravel(axes)) == (0, 1, 2):
+            return self
+        return self.materialise().transpose(*axes)
+
+    def min(self, *args, **kwargs):
+        return self.materialise().min(*args, **kwargs)
+
+    def max(self, *args, **kwargs):
+        return self.materialise().max(*args, **kwargs)
+
+    def materialise(self, progress: Optional[Progress] = None) -> np.ndarray:
+        """
+        Loads all of the images into a shared array, reusing those that are already decoded.
+        """
+        with self._lock:
+            if self._materialised is not None:
+                return self._materialised
+
+            LOG.info(f"Loading all {len(self)} images of the stack")
+            progress = Progress.ensure_instance(progress, num_steps=len(self), task_name='Loading')
+            data = pu.create_array(self.shape, self.dtype, first_touch=True, use_scratch=self.use_scratch)
+            with progress:
+                for index in range(len(self)):
+                    data[index] = self._load(index)
+                    progress.update(msg='Image')
+            self._set_materialised(data)
+            return data
+
+    def release(self):
+        """
+        Marks that the stack is done with the array it was materialised into, see `allocator.release`.
+        """
+        if self._materialised is not None:
+            allocator.release(self._materialised)
+
+    def _set_materialised(self, data: np.ndarray):
+        self._materialised = data
+        self._cache.clear()
+        self._written.clear()
+
+
+class _SharedBase:
+    """
+    The array that copy-on-write stacks read from, and how many of them still do. It owns the array until
+    the last of them releases it or takes it over, see `allocator.retain`.
+    """
+    def __init__(self, data: np.ndarray):
+        allocator.retain(data)
+        self.data: Optional[np.ndarray] = data
+        self.users = 0
+        self.lock = threading.Lock()
+
+    def read(self, index: int) -> np.ndarray:
+        assert self.data is not None
+        return self.data[index]
+
+    def join(self, stack: 'CopyOnWriteStack') -> weakref.finalize:
+        """
+        :return: Leaves the array without taking it over, when called or once the stack is garbage collected,
+                 see `abandon`
+        """
+        with self.lock:
+            self.users += 1
+        return weakref.finalize(stack, self.abandon)
+
+    def abandon(self):
+        """
+        Leaves the array, and releases it if no other stack reads from it any more, see `allocator.release`.
+        """
+        data = self.leave()
+        if data is not None:
+            allocator.release(data)
+
+    def leave(self) -> Optional[np.ndarray]:
+        """
+        :return: The array, if the stack leaving was the last one reading from it, which then owns it instead
+        """
+        with self.lock:
+            self.users -= 1
+            if self.users > 0:
+                return None
+            data, self.data = self.data, None
+            return data
+
+
+class CopyOnWriteStack(LazyStack):
+    """
+    A copy of a stack that reads its images from the original array, until they are written to.
+
+    Writing to a single image copies only that image. Working on the whole stack copies all of it,
+    unless no other copy is reading from the original array any more, in which case it is taken over
+    without copying anything, see `copy_on_write`.
+    """
+    def __init__(self, base: _SharedBase):
+        assert base.data is not None
+        super().__init__(range(base.data.shape[0]),
+                         base.read,
+                         base.data.shape[1:],
+                         base.data.dtype,
+                         use_scratch=scratch.is_scratch_array(base.data))
+        # the images are views into the original array, so there is nothing worth caching
+        self.cache_size = 0
+        self._base = base
+        self._leave = base.join(self)
+
+    def materialise(self, progress: Optional[Progress] = None) -> np.ndarray:
+        with self._lock:
+            if self._materialised is None:
+                # the last stack reading from the array takes it over, instead of copying it
+                data = self._copy_base(progress) if self._base.users > 1 else None
+                last_data = self._base.leave() if self._leave.detach() is not None else None
+                data = data if data is not None else last_data
+                if data is None:
+                    return super().materialise(progress)
+                for index, image in self._written.items():
+                    data[index] = image
+                self._set_materialised(data)
+            return super().materialise(progress)
+
+    def _copy_base(self, progress: Optional[Progress]) -> np.ndarray:
+        """
+        Copies the whole original array at once, as going through it one image at a time is much slower.
+        """
+        assert self._base.data is not None
+        LOG.info(f"Copying all {len(self)} images of the stack")
+        progress = Progress.ensure_instance(progress, num_steps=1, task_name='Copying')
+        data = pu.create_array(self.shape, self.dtype, use_scratch=self.use_scratch)
+        with progress:
+            np.copyto(data, self._base.data)
+            progress.update(msg='Images')
+        return data
+
+    def release(self):
+        with self._lock:
+            if self._materialised is None:
+                self._leave()
+        super().release()
+
+    def share(self) -> 'CopyOnWriteStack':
+        """
+        Makes another copy of this stack, that reads from the same original array.
+        """
+        with self._lock:
+            assert self._materialised is None
+            copy = CopyOnWriteStack(self._base)
+            for index, image in self._written.items():
+                copy._written[index] = image.copy()
+            return copy
+
+
+def copy_on_write(data) -> Tuple[LazyStack, 'CopyOnWriteStack']:
+    """
+    Makes a copy of the stack that shares its memory until either of them is written to.
+    The original array is not used directly any more, as writing to it would change the copy.
+
+    :param data: The array of a stack, or a lazy stack
+    :return: The stack to use in place of the original one, and the copy
+    """
+    if isinstance(data, CopyOnWriteStack) and not data.is_materialised:
+        return data, data.share()
+    original = data
+    if isinstance(data, LazyStack):
+        data = data.materialise()
+    base = _SharedBase(data)
+    # the original stack hands the array over to the copies
+    if isinstance(original, LazyStack):
+        original.release()
+    else:
+        allocator.release(original)
+    return CopyOnWriteStack(base), CopyOnWriteStack(base)
@@ -0,0 +1,139 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+"""
+Statistics of the images in a stack, kept so that they are not recomputed by scanning the whole stack
+each time they are needed.
+
+The statistics are kept for each image, and the ones of the whole stack are worked out from those.
+Images that have changed since are marked as such, see `Images.mark_changed`, and only those are
+scanned again the next time the statistics are used.
+"""
+
+from typing import Any, Callable, Iterable, Optional
+
+import numpy as np
+
+from mantidimaging.core.parallel import shared as ps, utility as pu
+from mantidimaging.core.parallel.backends import DEFAULT_BACKEND
+from mantidimaging.core.utility.progress_reporting import Progress
+
+# The columns of the statistics of each image
+MIN, MAX, SUM, NAN_COUNT = range(4)
+
+
+def image_statistics(image: np.ndarray) -> np.ndarray:
+    """
+    :return: The min, max, sum and number of NaNs of the image, ignoring the NaNs
+    """
+    nan_count = np.count_nonzero(np.isnan(image))
+    if nan_count == image.size:
+        return np.array([np.nan, np.nan, 0, nan_count])
+    return np.array([np.nanmin(image), np.nanmax(image), np.nansum(image, dtype=np.float64), nan_count])
+
+
+class PerImageCache:
+    """
+    Values worked out for each image of a stack, which are only worked out again for the images that have changed.
+    """
+    # The function working out the values of an image, as a 1D array of `width` values of type `dtype`
+    compute: Callable[[np.ndarray], np.ndarray]
+    width: int
+    dtype: Any = np.float64
+    backend = DEFAULT_BACKEND
+
+    def __init__(self, num_images: int):
+        self.per_image = np.zeros((num_images, self.width), self.dtype)
+        self._stale = np.ones(num_images, dtype=bool)
+
+    @property
+    def is_stale(self) -> bool:
+        return bool(self._stale.any())
+
+    def mark_changed(self, indices: Optional[Iterable[int]] = None):
+        """
+        :param indices: The images that have changed, or None if all of them might have
+        """
+        if indices is None:
+            self._stale[:] = True
+        else:
+            self._stale[list(indices)] = True
+
+    def update(self, data, progress: Optional[Progress] = None, cores: Optional[int] = None):
+        """
+        Works out the values of the images that have changed. If they all have, this is done in one parallel pass.
+        """
+        stale = np.flatnonzero(self._stale)
+        if len(stale) == 0:
+            return
+        if len(stale) == len(self._stale):
+            out = pu.create_array(self.per_image.shape, self.dtype)
+            f = ps.create_partial(type(self).compute, ps.return_to_second_at_i)
+            ps.execute(f,
+                       len(stale),
+                       progress,
+                       msg=f"Calculating {type(self).__name__}",
+                       cores=cores,
+                       shared_list=[data, out],
+                       backend=self.backend)
+            self.per_image[:] = out
+        else:
+            for index in stale:
+                # upcast like the parallel pass does, so that the values do not depend on which one worked them out
+                self.per_image[index] = type(self).compute(ps.upcast(data[index]))
+        self._stale[:] = False
+
+
+class StackStatistics(PerImageCache):
+    width = 4
+
+    @staticmethod
+    def compute(image: np.ndarray) -> np.ndarray:
+        return image_statistics(image)
+
+    def __init__(self, num_images: int, image_size: int):
+        super().__init__(num_images)
+        self.image_size = image_size
+        self._summed_image: Optional[np.ndarray] = None
+
+    def mark_changed(self, indices: Optional[Iterable[int]] = None):
+        super().mark_changed(indices)
+        self._summed_image = None
+
+    @property
+    def min(self) -> float:
+        return float(np.nanmin(self.per_image[:, MIN])) if self.nan_count < self.size else np.nan
+
+    @property
+    def max(self) -> float:
+        return float(np.nanmax(self.per_image[:, MAX])) if self.nan_count < self.size else np.nan
+
+    @property
+    def sums(self) -> np.ndarray:
+        """
+        The sum of each image, ignoring NaNs
+        """
+        return self.per_image[:, SUM]
+
+    @property
+    def size(self) -> int:
+        return len(self.per_image) * self.image_size
+
+    @property
+    def nan_count(self) -> int:
+        return int(self.per_image[:, NAN_COUNT].sum())
+
+    @property
+    def mean(self) -> float:
+        """
+        The mean of the values that are not NaN
+        """
+        values = self.size - self.nan_count
+        return float(self.sums.sum() / values) if values > 0 else np.nan
+
+    def summed_image(self, data) -> np.ndarray:
+        """
+        :return: The sum of all of the images, which is kept until any of them change
+        """
+        if self._summed_image is None:
+            self._summed_image = np.sum(data, axis=0)
+        return self._summed_image
@@ -0,0 +1,55 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+
+import unittest
+from unittest import mock
+
+import numpy as np
+import numpy.testing as npt
+
+from mantidimaging.core.data import compressed_stack
+from mantidimaging.core.data.compressed_stack import CompressedStack
+from mantidimaging.test_helpers import unit_test_helper as th
+
+SHAPE = (6, 8, 10)
+
+
+class CompressedStackTest(unittest.TestCase):
+    def setUp(self):
+        self.expected = np.arange(np.prod(SHAPE), dtype=np.float32).reshape(SHAPE)
+        self.stack = CompressedStack(self.expected.copy())
+
+    def test_compressed(self):
+        self.assertEqual(self.stack.shape, SHAPE)
+        self.assertEqual(self.stack.dtype, np.float32)
+        self.assertLess(self.stack.compressed_bytes, self.stack.nbytes)
+        self.assertFalse(self.stack.is_materialised)
+
+    def test_index_decompresses_only_that_image(self):
+        with mock.patch.object(compressed_stack, 'decompress_image',
+                               wraps=compressed_stack.decompress_image) as decompress:
+            npt.assert_equal(self.stack[3], self.expected[3])
+            decompress.assert_called_once()
+        self.assertFalse(self.stack.is_materialised)
+
+    def test_materialise(self):
+        self.stack[1] = -1
+        data = self.stack.materialise()
+        self.expected[1] = -1
+        npt.assert_equal(data, self.expected)
+        self.assertEqual(self.stack.compressed_bytes, 0)
+
+    def test_reduced_precision_stack(self):
+        data = th.generate_images(SHAPE).data.astype(np.float16)
+        stack = CompressedStack(data)
+        npt.assert_equal(np.asarray(stack), data)
+        self.assertEqual(np.asarray(stack).dtype, np.float16)
+
+    def test_zlib_without_lz4(self):
+        with mock.patch.object(compressed_stack, 'lz4_frame', None):
+            stack = CompressedStack(self.expected)
+            npt.assert_equal(np.asarray(stack), self.expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from mantidimaging.core.data import fingerprint
+from mantidimaging.test_helpers import unit_test_helper as th
+
+
+class FingerprintTest(unittest.TestCase):
+    def setUp(self):
+        self.images = th.generate_images((5, 4, 3))
+
+    def test_copies_have_the_same_fingerprint(self):
+        copy = self.images.copy()
+        self.assertEqual(self.images.fingerprint(), copy.fingerprint())
+        self.assertEqual(self.images, copy)
+
+    def test_changed_projection_changes_fingerprint(self):
+        copy = self.images.copy()
+        copy.set_projection(2, np.zeros((4, 3)))
+        self.assertNotEqual(self.images.fingerprint(), copy.fingerprint())
+        self.assertNotEqual(self.images, copy)
+
+    def test_only_changed_images_are_hashed_again(self):
+        before = self.images.fingerprint()
+        with mock.patch.object(fingerprint, 'image_digest', wraps=fingerprint.image_digest) as digest:
+            self.assertEqual(self.images.fingerprint(), before)
+            digest.assert_not_called()
+
+            self.images.set_projection(1, np.ones((4, 3)))
+            self.assertNotEqual(self.images.fingerprint(), before)
+            digest.assert_called_once()
+
+    def test_shape_is_part_of_fingerprint(self):
+        images = th.generate_images((4, 5, 3))
+        images.data[:] = 0
+        reshaped = th.generate_images((4, 3, 5))
+        reshaped.data[:] = 0
+        self.assertNotEqual(images.fingerprint(), reshaped.fingerprint())
+
+    def test_same_stack_is_not_hashed(self):
+        with mock.patch.object(fingerprint, 'image_digest') as digest:
+            self.assertEqual(self.images, self.images)
+            digest.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
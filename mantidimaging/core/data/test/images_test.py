@@ -4,10 +4,12 @@
 import io
 from mantidimaging.core.utility.data_containers import ProjectionAngles
 import unittest
+from unittest import mock
 
 import numpy as np
 
 from mantidimaging.core.data import Images
+from mantidimaging.core.data.lazy_stack import LazyStack
 from mantidimaging.core.data.test.fake_logfile import generate_csv_logfile, generate_txt_logfile
 from mantidimaging.core.operations.crop_coords import CropCoordinatesFilter
 from mantidimaging.core.operation_history import const
@@ -67,6 +69,16 @@ class ImagesTest(unittest.TestCase):
         self.assertEqual(images.metadata, copy.metadata)
         self.assertNotEqual(images, copy)
 
+    def test_copy_not_equal_after_writing_through_data(self):
+        images = generate_images()
+        copy = images.copy()
+        self.assertEqual(images, copy)
+
+        copy.data[0] = 5
+
+        self.assertNotEqual(images, copy)
+        self.assertNotEqual(copy, images)
+
     def test_copy_flip_axes(self):
         images = generate_images()
         images.record_operation("Test", "Display", 123)
@@ -209,3 +221,112 @@ class ImagesTest(unittest.TestCase):
         actual = images.projection_angles()
         self.assertEqual(10, len(actual.value))
         self.assertAlmostEqual(images.projection_angles().value, pangles.value, places=4)
+
+    def test_sinogram_mirror(self):
+        images = generate_images()
+        expected = np.swapaxes(images.data, 0, 1).copy()
+        self.assertTrue(images.build_sinogram_mirror())
+
+        self.assertTrue(images.sinograms.flags.c_contiguous)
+        np.testing.assert_equal(images.sinograms, expected)
+        np.testing.assert_equal(images.sino(3), expected[3])
+        self.assertFalse(images.sino(3).flags.writeable)
+
+    def test_set_projection_updates_sinogram_mirror(self):
+        images = generate_images()
+        images.build_sinogram_mirror()
+        images.set_projection(2, np.full((images.height, images.width), 7))
+        images.set_projection(-1, np.full(images.width, 5))
+        self.assertTrue(images.has_sinogram_mirror)
+        np.testing.assert_equal(images.sino(0)[2], 7)
+        np.testing.assert_equal(images.sino(0)[-1], 5)
+        np.testing.assert_equal(images.sinograms, np.swapaxes(images._data, 0, 1))
+
+    def test_sinogram_mirror_dropped_when_all_images_changed(self):
+        images = generate_images()
+        images.build_sinogram_mirror()
+        images.mark_changed()
+        self.assertFalse(images.has_sinogram_mirror)
+
+    def test_sinogram_mirror_dropped_after_writing_through_data(self):
+        images = generate_images()
+        images.build_sinogram_mirror()
+        images.data[:, 1] = 3
+        np.testing.assert_equal(images.sino(1), 3)
+        self.assertFalse(images.has_sinogram_mirror)
+
+    def test_sinogram_mirror_kept_after_reading_read_only_data(self):
+        images = generate_images()
+        images.build_sinogram_mirror()
+        self.assertFalse(images.read_only_data.flags.writeable)
+        images.sino(1)
+        self.assertTrue(images.has_sinogram_mirror)
+
+    def test_no_sinogram_mirror_for_sinograms(self):
+        images = generate_images()
+        images._is_sinograms = True
+        self.assertFalse(images.build_sinogram_mirror())
+        self.assertIs(images.sinograms, images.data)
+
+    def test_change_storage_dtype(self):
+        images = generate_images()
+        expected = images.data.copy()
+        self.assertFalse(images.is_reduced_precision)
+
+        images.change_storage_dtype(np.float16)
+        self.assertTrue(images.is_reduced_precision)
+        self.assertEqual(images.data.dtype, np.float16)
+        np.testing.assert_allclose(images.data, expected, rtol=1e-3, atol=1e-4)
+
+    def test_compress(self):
+        images = generate_images()
+        expected = images.data.copy()
+        self.assertTrue(images.compress())
+        self.assertTrue(images.is_compressed)
+        np.testing.assert_equal(images.display_data[2], expected[2])
+
+        np.testing.assert_equal(images.data, expected)
+        self.assertFalse(images.is_compressed)
+
+    def test_lazy_images_not_compressed(self):
+        images = Images(LazyStack(["a", "b"], mock.Mock(), (2, 2), np.float32))
+        self.assertFalse(images.compress())
+        self.assertFalse(images.is_compressed)
+
+    def test_copy_compressed(self):
+        images = generate_images()
+        expected = images.data.copy()
+        copy = images.copy()
+
+        self.assertTrue(copy.compress())
+        self.assertTrue(copy.is_compressed)
+        self.assertFalse(images.display_data.is_materialised)
+        np.testing.assert_equal(copy.data, expected)
+        np.testing.assert_equal(images.data, expected)
+
+    def test_copy_evicted(self):
+        images = generate_images()
+        expected = images.data.copy()
+        copy = images.copy()
+
+        self.assertTrue(copy.evict())
+        self.assertTrue(copy.is_evicted)
+        self.assertFalse(images.display_data.is_materialised)
+        np.testing.assert_equal(copy.data, expected)
+        np.testing.assert_equal(images.data, expected)
+
+    def test_evict_and_restore(self):
+        images = generate_images()
+        expected = images.data.copy()
+        self.assertFalse(images.restore())
+
+        self.assertTrue(images.evict())
+        self.assertTrue(images.is_evicted)
+        self.assertTrue(images.is_scratch_backed)
+        np.testing.assert_equal(images.data, expected)
+        self.assertFalse(images.evict())
+
+        self.assertTrue(images.restore())
+        self.assertFalse(images.is_evicted)
+        self.assertFalse(images.is_scratch_backed)
+        np.testing.assert_equal(images.data, expected)
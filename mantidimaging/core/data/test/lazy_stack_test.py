@@ -0,0 +1,206 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+
+import unittest
+from unittest import mock
+
+import numpy as np
+import numpy.testing as npt
+
+from mantidimaging.core.data import Images
+from mantidimaging.core.data import lazy_stack
+from mantidimaging.core.data.lazy_stack import LazyStack, copy_on_write
+from mantidimaging.core.parallel import allocator
+from mantidimaging.test_helpers import unit_test_helper as th
+
+SHAPE = (6, 4, 5)
+
+
+class LazyStackTest(unittest.TestCase):
+    def setUp(self):
+        self.expected = np.arange(np.prod(SHAPE), dtype=np.float32).reshape(SHAPE)
+        self.files = [f"image_{index}.tif" for index in range(SHAPE[0])]
+        self.load_func = mock.Mock(side_effect=lambda f: self.expected[self.files.index(f)].astype(np.uint16))
+        self.stack = LazyStack(self.files, self.load_func, SHAPE[1:], np.float32)
+
+    def test_nothing_decoded_up_front(self):
+        self.assertEqual(self.stack.shape, SHAPE)
+        self.assertEqual(self.stack.size, np.prod(SHAPE))
+        self.load_func.assert_not_called()
+
+    def test_index_decodes_only_that_image(self):
+        image = self.stack[2]
+        npt.assert_equal(image, self.expected[2])
+        self.assertEqual(image.dtype, np.float32)
+        self.load_func.assert_called_once_with("image_2.tif")
+
+        self.assertEqual(self.stack[-1, 1, 2], self.expected[-1, 1, 2])
+        self.assertEqual(self.stack[2, 3, 4], self.expected[2, 3, 4])
+        self.assertEqual(self.load_func.call_count, 2)
+
+    def test_slice_decodes_the_images_in_it(self):
+        npt.assert_equal(self.stack[1:5:2, :, 1], self.expected[1:5:2, :, 1])
+        self.assertEqual(self.load_func.call_count, 2)
+
+    def test_least_recently_used_image_is_evicted(self):
+        self.stack.cache_size = 2
+        self.stack[0]
+        self.stack[1]
+        self.stack[0]
+        self.stack[2]
+        self.assertEqual(self.load_func.call_count, 3)
+        self.stack[0]
+        self.assertEqual(self.load_func.call_count, 3)
+        self.stack[1]
+        self.assertEqual(self.load_func.call_count, 4)
+
+    def test_cache_size_from_memory(self):
+        with mock.patch.object(lazy_stack, 'CACHE_BYTES', 3 * 4 * 5 * 4):
+            stack = LazyStack(self.files, self.load_func, SHAPE[1:], np.float32)
+        self.assertEqual(stack.cache_size, 3)
+
+    def test_materialise_reuses_decoded_images(self):
+        self.stack[3]
+        data = np.asarray(self.stack)
+        npt.assert_equal(data, self.expected)
+        self.assertEqual(self.load_func.call_count, SHAPE[0])
+        self.assertTrue(self.stack.is_materialised)
+
+        data[0] = -1
+        self.assertEqual(self.stack[0, 0, 0], -1)
+
+    def test_identity_transpose_does_not_materialise(self):
+        for axes in [(), ((0, 1, 2), ), ([0, 1, 2], ), (0, 1, 2)]:
+            self.assertIs(self.stack.transpose(*axes), self.stack)
+        self.assertFalse(self.stack.is_materialised)
+
+    def test_out_of_bounds_index(self):
+        self.assertRaises(IndexError, self.stack.__getitem__, SHAPE[0])
+
+    def test_image_with_different_shape(self):
+        self.load_func.side_effect = lambda f: np.zeros((2, 2))
+        self.assertRaises(ValueError, self.stack.__getitem__, 0)
+
+    def test_images_materialise_on_data(self):
+        images = Images(self.stack)
+        self.assertTrue(images.is_lazy)
+        self.assertEqual(images.num_images, SHAPE[0])
+        self.assertEqual(images.width, SHAPE[2])
+        npt.assert_equal(images.projection(1), self.expected[1])
+        npt.assert_equal(images.index_as_images(4).data[0], self.expected[4])
+        self.assertIs(images.display_data, self.stack)
+        self.assertEqual(self.load_func.call_count, 2)
+
+        npt.assert_equal(images.data, self.expected)
+        self.assertFalse(images.is_lazy)
+        self.assertIsInstance(images.display_data, np.ndarray)
+
+    def test_write_to_image_keeps_it_until_materialised(self):
+        self.stack.cache_size = 1
+        self.stack[1, 0] = -1
+        self.stack[2]
+        self.assertEqual(self.stack[1, 0, 0], -1)
+        self.assertEqual(self.stack[1, 1, 0], self.expected[1, 1, 0])
+        self.assertEqual(self.load_func.call_count, 2)
+
+        data = self.stack.materialise()
+        self.assertEqual(data[1, 0, 0], -1)
+        self.stack[:, 0, 0] = -2
+        npt.assert_equal(data[:, 0, 0], -2)
+
+
+class CopyOnWriteTest(unittest.TestCase):
+    def setUp(self):
+        self.original = th.gen_img_shared_array_with_val(1, SHAPE)
+        self.stack, self.copy = copy_on_write(self.original)
+
+    def test_copies_share_the_original(self):
+        self.assertIs(self.stack[2].base, self.copy[2].base)
+
+    def test_write_copies_only_that_image(self):
+        self.copy[3, 1] = 5
+        self.assertEqual(self.copy[3, 1, 0], 5)
+        self.assertEqual(self.stack[3, 1, 0], 1)
+        self.assertEqual(self.original[3, 1, 0], 1)
+        self.assertEqual(list(self.copy._written), [3])
+
+    def test_first_materialised_copies(self):
+        data = self.stack.materialise()
+        self.assertIsNot(data, self.original)
+        data[:] = 2
+        npt.assert_equal(self.copy[0], 1)
+
+    def test_first_materialised_copies_original_at_once(self):
+        self.stack[1, 0] = 5
+        with mock.patch.object(self.stack, '_load') as load:
+            data = self.stack.materialise()
+
+        load.assert_not_called()
+        self.assertEqual(data[1, 0, 0], 5)
+        npt.assert_equal(data[2], self.original[2])
+
+    def test_last_materialised_takes_over_original(self):
+        self.copy[4, 0] = 5
+        self.stack.materialise()
+        data = self.copy.materialise()
+        self.assertIs(data, self.original)
+        self.assertEqual(data[4, 0, 0], 5)
+
+    def test_takes_over_original_once_other_copy_is_collected(self):
+        del self.stack
+        self.assertIs(self.copy.materialise(), self.original)
+
+    def test_last_released_copy_releases_the_original(self):
+        with mock.patch.object(lazy_stack.allocator, 'release') as release:
+            self.stack.release()
+            release.assert_not_called()
+            self.copy.release()
+            release.assert_called_once_with(self.original)
+
+    def test_materialised_copy_releases_its_own_array(self):
+        data = self.stack.materialise()
+        with mock.patch.object(lazy_stack.allocator, 'release') as release:
+            self.stack.release()
+            release.assert_called_once_with(data)
+
+    def _owners(self, data):
+        name = allocator.find_block(data)[0]
+        return next(array.refs for array in allocator.live_arrays() if array.name == name)
+
+    def test_original_is_handed_over_to_the_copies(self):
+        self.assertEqual(self._owners(self.original), 1)
+
+    def test_taken_over_original_is_released_by_its_new_owner(self):
+        self.stack.release()
+        self.assertIs(self.copy.materialise(), self.original)
+        self.assertEqual(self._owners(self.original), 1)
+        self.copy.release()
+        self.assertEqual(self._owners(self.original), 0)
+
+    def test_copied_original_is_still_owned_by_the_other_copy(self):
+        data = self.stack.materialise()
+        self.stack.release()
+        self.assertEqual(self._owners(data), 0)
+        self.assertEqual(self._owners(self.original), 1)
+
+    def test_copy_of_copy_shares_the_original(self):
+        self.copy[0, 0] = 5
+        stack, copy = copy_on_write(self.copy)
+        self.assertIs(stack, self.copy)
+        self.assertEqual(copy[0, 0, 0], 5)
+        self.assertIs(copy[1].base, self.original)
+
+    def test_images_copy(self):
+        images = Images(self.original)
+        copy = images.copy()
+        self.assertTrue(images.is_lazy)
+        self.assertTrue(copy.is_lazy)
+
+        images.data[0] = 3
+        npt.assert_equal(copy.data, self.original)
+        npt.assert_equal(copy.data[0], 1)
+        self.assertIs(copy.data, self.original)
+
+
+if __name__ == '__main__':
+    unittest.main()
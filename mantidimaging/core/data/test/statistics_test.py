@@ -0,0 +1,83 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+
+import unittest
+from unittest import mock
+
+import numpy as np
+import numpy.testing as npt
+
+from mantidimaging.core.data import statistics
+from mantidimaging.test_helpers import unit_test_helper as th
+
+
+class StatisticsTest(unittest.TestCase):
+    def setUp(self):
+        self.images = th.generate_images((5, 4, 3))
+        self.images.data[1, 0, 0] = np.nan
+        self.images.data[2] = np.nan
+
+    def test_statistics_ignore_nans(self):
+        data = self.images.data
+        stats = self.images.statistics
+        self.assertAlmostEqual(stats.min, np.nanmin(data), places=6)
+        self.assertAlmostEqual(stats.max, np.nanmax(data), places=6)
+        self.assertAlmostEqual(stats.mean, np.nanmean(data), places=6)
+        self.assertEqual(stats.nan_count, 13)
+        npt.assert_allclose(stats.sums, np.nansum(data, axis=(1, 2)), rtol=1e-6)
+
+    def test_only_changed_images_are_scanned_again(self):
+        self.images.statistics
+        with mock.patch.object(statistics, 'image_statistics', wraps=statistics.image_statistics) as scan:
+            self.images.statistics
+            scan.assert_not_called()
+
+            self.images.set_projection(3, np.full((4, 3), 100))
+            self.assertEqual(self.images.statistics.max, 100)
+            scan.assert_called_once()
+
+    def test_recorded_operation_marks_all_images_changed(self):
+        self.images.statistics
+        self.images.data[:] = -5
+        self.images.record_operation("test", "Test")
+        self.assertEqual(self.images.statistics.max, -5)
+        self.assertEqual(self.images.statistics.nan_count, 0)
+
+    def test_reading_read_only_data_keeps_statistics(self):
+        self.images.statistics
+        with mock.patch.object(statistics, 'image_statistics', wraps=statistics.image_statistics) as scan:
+            np.sum(self.images.read_only_data)
+            self.images.statistics
+            scan.assert_not_called()
+
+    def test_writing_through_data_marks_all_images_changed(self):
+        self.images.statistics
+        self.images.data[2] = 10
+        self.assertEqual(self.images.statistics.max, 10)
+        self.assertEqual(self.images.statistics.nan_count, 1)
+
+    def test_summed_image_after_writing_through_data(self):
+        self.images.summed_image()
+        self.images.data[:] = 1
+        npt.assert_equal(self.images.summed_image(), 5)
+
+    def test_setting_data_marks_all_images_changed(self):
+        self.images.statistics
+        self.images.data = np.full((5, 4, 3), -5.0)
+        self.assertEqual(self.images.statistics.max, -5)
+
+    def test_summed_image_kept_until_changed(self):
+        summed = self.images.summed_image()
+        npt.assert_equal(summed, np.sum(self.images.display_data, axis=0))
+        self.assertIs(self.images.summed_image(), summed)
+        self.images.mark_changed([0])
+        self.assertIsNot(self.images.summed_image(), summed)
+
+    def test_all_nan_stack(self):
+        self.images.data[:] = np.nan
+        self.assertTrue(np.isnan(self.images.statistics.min))
+        self.assertTrue(np.isnan(self.images.statistics.mean))
+
+
+if __name__ == '__main__':
+    unittest.main()
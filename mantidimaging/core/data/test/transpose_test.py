@@ -0,0 +1,46 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+
+from unittest import mock
+
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+from mantidimaging.core.data import transpose
+
+
+@pytest.mark.parametrize('tile_bytes', [1, 7 * 4 * 3, 2**20])
+def test_swap_axes(tile_bytes):
+    data = np.arange(11 * 9 * 7, dtype=np.float32).reshape((11, 9, 7))
+    out = np.zeros((9, 11, 7), np.float32)
+    with mock.patch.object(transpose, 'TILE_BYTES', tile_bytes):
+        assert transpose.swap_axes(data, out) is out
+    npt.assert_equal(out, np.swapaxes(data, 0, 1))
+
+
+def test_swap_axes_on_several_threads():
+    data = np.arange(20 * 30 * 4, dtype=np.float32).reshape((20, 30, 4))
+    out = np.zeros((30, 20, 4), np.float32)
+    with mock.patch.object(transpose, 'TILE_BYTES', 4 * 4 * 4):
+        transpose.swap_axes(data, out, cores=2)
+    npt.assert_equal(out, np.swapaxes(data, 0, 1))
+
+
+def test_swapped_blocks():
+    data = np.arange(5 * 7 * 3, dtype=np.float32).reshape((5, 7, 3))
+    with mock.patch.object(transpose, 'BLOCK_BYTES', 2 * 5 * 3 * 4):
+        blocks = [(first, block.copy()) for first, block in transpose.swapped_blocks(data)]
+    assert [first for first, _ in blocks] == [0, 2, 4, 6]
+    npt.assert_equal(np.concatenate([block for _, block in blocks]), np.swapaxes(data, 0, 1))
+
+
+def test_tile_size():
+    data = np.zeros((4, 4, 64), np.float32)
+    with mock.patch.object(transpose, 'TILE_BYTES', 64 * 4 * 9):
+        assert transpose.tile_size(data) == 3
+
+
+def test_swap_axes_wrong_shape():
+    with pytest.raises(ValueError):
+        transpose.swap_axes(np.zeros((2, 3, 4)), np.zeros((2, 3, 4)))
@@ -0,0 +1,90 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+"""
+Swapping the first two axes of a stack, i.e. turning projections into sinograms and back.
+
+Copying `np.swapaxes(data, 0, 1)` reads one row from each image in turn, so for large images every row
+is in a different page, and nothing read from memory is still in the cache by the time it is used again.
+Here the stack is copied in tiles of a few images by a few rows, which fit in the cache together
+with the tile they are copied to. Bands of rows are copied on several cores at once, in threads,
+as NumPy releases the GIL while copying, and the arrays do not have to be in shared memory.
+"""
+
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+from mantidimaging.core.parallel import shared as ps, utility as pu
+from mantidimaging.core.parallel.backends import Backend
+from mantidimaging.core.utility.progress_reporting import Progress
+
+# Memory copied in one go, which should fit comfortably in the L2 cache
+TILE_BYTES = 256 * 1024
+
+# Memory of the blocks that `swapped_blocks` gives back at once
+BLOCK_BYTES = 64 * 1024**2
+
+
+def tile_size(data: np.ndarray) -> int:
+    """
+    :return: The number of images, and of rows in each of them, that make up a square tile
+    """
+    row_bytes = max(1, data.shape[2] * data.itemsize)
+    return max(1, int(np.sqrt(TILE_BYTES / row_bytes)))
+
+
+def swapped_shape(data: np.ndarray):
+    return (data.shape[1], data.shape[0]) + data.shape[2:]
+
+
+def _copy_in_tiles(source: np.ndarray, out: np.ndarray, tile: int):
+    for first_row in range(0, out.shape[0], tile):
+        rows = slice(first_row, first_row + tile)
+        for first_image in range(0, out.shape[1], tile):
+            images = slice(first_image, first_image + tile)
+            out[rows, images] = source[rows, images]
+
+
+def swap_axes(data: np.ndarray,
+              out: np.ndarray,
+              progress: Optional[Progress] = None,
+              cores: Optional[int] = None) -> np.ndarray:
+    """
+    Copies the stack into `out` with its first two axes swapped, one tile at a time, on several cores.
+
+    :param data: 3D stack to copy
+    :param out: Array of the swapped shape to copy into, which can be a memory map of a file
+    :param progress: Progress of the rows of `data` copied
+    :param cores: Number of threads to copy with, all cores by default
+    :return: out
+    """
+    if out.shape != swapped_shape(data):
+        raise ValueError(f"Cannot swap the axes of a stack of shape {data.shape} into shape {out.shape}")
+
+    f = ps.create_partial(_copy_in_tiles, ps.inplace2_stored, tile=tile_size(data))
+    ps.execute(f,
+               out.shape[0],
+               progress,
+               msg="Swapping axes",
+               cores=cores or pu.get_cores(),
+               batched=True,
+               shared_list=[np.swapaxes(data, 0, 1), out],
+               backend=Backend.THREADS)
+    return out
+
+
+def swapped_blocks(data: np.ndarray, cores: Optional[int] = None) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Gives the stack with its first two axes swapped a block of images at a time, e.g. to write it to disk
+    without holding a swapped copy of all of it. Each block is only valid until the next one is given,
+    as they are all copied into the same buffer.
+
+    :return: The index of the first image in the block, and the block
+    """
+    image_bytes = max(1, data.shape[0] * data.shape[2] * data.itemsize)
+    block_images = max(1, min(data.shape[1], BLOCK_BYTES // image_bytes))
+    buffer = np.empty((block_images, data.shape[0]) + data.shape[2:], data.dtype)
+    for first in range(0, data.shape[1], block_images):
+        rows = data[:, first:first + block_images]
+        block = buffer[:rows.shape[1]]
+        yield first, swap_axes(rows, block, cores=cores)
@@ -9,12 +9,18 @@ from typing import Tuple, Optional, List
 import numpy as np
 
 from mantidimaging.core.data import Images
+from mantidimaging.core.data.lazy_stack import LazyStack
 from mantidimaging.core.io.utility import get_file_names, get_prefix
-from mantidimaging.core.parallel import utility as pu
+from mantidimaging.core.parallel import shared as ps, utility as pu
+from mantidimaging.core.parallel.backends import Backend
 from mantidimaging.core.utility.progress_reporting import Progress
 from . import stack_loader
 from ...data.dataset import Dataset
 
+# Number of files that are read at once. Reading files is mostly waiting for the storage, especially network
+# storage, so more files can be read at once than there are cores. 1 reads them one at a time.
+READER_THREADS = 8
+
 
 def execute(load_func,
             sample_path,
@@ -25,7 +31,11 @@ def execute(load_func,
             img_format,
             dtype,
             indices,
-            progress=None) -> Dataset:
+            progress=None,
+            lazy=False,
+            reader_threads=READER_THREADS,
+            load_into_func=None,
+            info_func=None) -> Dataset:
     """
     Reads a stack of images into memory, assuming dark and flat images
     are in separate directories.
@@ -41,6 +51,14 @@ def execute(load_func,
         '>f2' - float16
         '>f4' - float32
 
+    :param lazy: Only decode the sample images when they are accessed, see LazyStack.
+                 The flat and dark images are always loaded straight away.
+    :param reader_threads: Number of files read at once
+    :param load_into_func: Decodes the image in a file straight into the array given to it, instead of
+                           returning it, e.g. to convert its type while decoding it. `load_func` is used if not given.
+    :param info_func: Reads the shape and type of the image in a file from its header, without decoding it.
+                      The first image is decoded to find out its shape if not given.
+
     :returns: Images object
     """
 
@@ -49,16 +67,13 @@ def execute(load_func,
 
     # The following codes assume that all images have the same size and properties as the first.
     # This is always true in the case of raw data
-    first_sample_img = load_func(sample_path[0])
+    img_shape = info_func(sample_path[0])[0] if info_func is not None else load_func(sample_path[0]).shape
 
     # select the files loaded based on the indices, if any are provided
     chosen_input_filenames = sample_path[indices[0]:indices[1]:indices[2]] if indices else sample_path
 
-    # get the shape of all images
-    img_shape = first_sample_img.shape
-
     # forward all arguments to internal class for easy re-usage
-    il = ImageLoader(load_func, img_format, img_shape, dtype, indices, progress)
+    il = ImageLoader(load_func, img_format, img_shape, dtype, indices, progress, reader_threads, load_into_func)
 
     # we load the flat and dark first, because if they fail we don't want to
     # fail after we've loaded a big stack into memory
@@ -66,7 +81,7 @@ def execute(load_func,
     flat_after_data, flat_after_filenames = il.load_data(flat_after_path)
     dark_before_data, dark_before_filenames = il.load_data(dark_before_path)
     dark_after_data, dark_after_filenames = il.load_data(dark_after_path)
-    sample_data = il.load_sample_data(chosen_input_filenames)
+    sample_data = il.load_sample_data(chosen_input_filenames, lazy)
 
     return Dataset(
         Images(sample_data, chosen_input_filenames, indices),
@@ -77,17 +92,29 @@ def execute(load_func,
 
 
 class ImageLoader(object):
-    def __init__(self, load_func, img_format, img_shape, data_dtype, indices, progress=None):
+    def __init__(self,
+                 load_func,
+                 img_format,
+                 img_shape,
+                 data_dtype,
+                 indices,
+                 progress=None,
+                 reader_threads=READER_THREADS,
+                 load_into_func=None):
         self.load_func = load_func
         self.img_format = img_format
         self.img_shape = img_shape
         self.data_dtype = data_dtype
         self.indices = indices
         self.progress = progress
+        self.reader_threads = reader_threads
+        self.load_into_func = load_into_func
 
-    def load_sample_data(self, input_file_names):
+    def load_sample_data(self, input_file_names, lazy=False):
         # determine what the loaded data was
-        if len(self.img_shape) == 2:
+        if len(self.img_shape) == 2 and lazy:
+            sample_data = LazyStack(input_file_names, self.load_func, self.img_shape, self.data_dtype)
+        elif len(self.img_shape) == 2:
             # the loaded file was a single image
             sample_data = self.load_files(input_file_names)
         elif len(self.img_shape) == 3:
@@ -109,21 +136,50 @@ class ImageLoader(object):
             return self.load_files(file_names), file_names
         return None, None
 
+    def _load_into(self, out, in_file):
+        try:
+            if self.load_into_func is not None:
+                self.load_into_func(in_file, out)
+            else:
+                out[:] = self.load_func(in_file)
+        except ValueError as exc:
+            raise ValueError("An image has different width and/or height "
+                             "dimensions! All images must have the same "
+                             "dimensions. Expected dimensions: {0} Error "
+                             "message: {1}".format(self.img_shape, exc))
+        except IOError as exc:
+            raise RuntimeError("Could not load file {0}. Error details: " "{1}".format(in_file, exc))
+
+    def _load_block(self, files, out):
+        for in_file, image in zip(files, out):
+            self._load_into(image, in_file)
+
     def _do_files_load_seq(self, data, files):
         progress = Progress.ensure_instance(self.progress, num_steps=len(files), task_name='Loading')
 
         with progress:
             for idx, in_file in enumerate(files):
-                try:
-                    data[idx, :] = self.load_func(in_file)
-                    progress.update(msg='Image')
-                except ValueError as exc:
-                    raise ValueError("An image has different width and/or height "
-                                     "dimensions! All images must have the same "
-                                     "dimensions. Expected dimensions: {0} Error "
-                                     "message: {1}".format(self.img_shape, exc))
-                except IOError as exc:
-                    raise RuntimeError("Could not load file {0}. Error details: " "{1}".format(in_file, exc))
+                self._load_into(data[idx], in_file)
+                progress.update(msg='Image')
+
+        return data
+
+    def _do_files_load_parallel(self, data, files):
+        """
+        Reads several files at once in threads, each straight into its own image of the shared array.
+        The progress is reported for each batch of files that has been read.
+        """
+        progress = Progress.ensure_instance(self.progress, num_steps=len(files), task_name='Loading')
+
+        with progress:
+            ps.execute(ps.create_partial(self._load_block, ps.inplace2_stored),
+                       len(files),
+                       progress,
+                       msg='Image',
+                       cores=self.reader_threads,
+                       batched=True,
+                       shared_list=[list(files), data],
+                       backend=Backend.THREADS)
 
         return data
 
@@ -132,7 +188,9 @@ class ImageLoader(object):
         # If it's not possible better crash here than later.
         num_images = len(files)
         shape = (num_images, self.img_shape[0], self.img_shape[1])
-        data = pu.create_array(shape, self.data_dtype)
+        data = pu.create_array(shape, self.data_dtype, first_touch=True)
+        if self.reader_threads > 1:
+            return self._do_files_load_parallel(data, files)
         return self._do_files_load_seq(data, files)
 
 
@@ -1,21 +1,27 @@
 # Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
 # SPDX - License - Identifier: GPL-3.0-or-later
+import json
 import os
+import threading
 from dataclasses import dataclass
+from functools import partial
 from logging import getLogger, Logger
 from pathlib import Path
-from typing import Tuple, List
+from typing import Callable, List, Optional, Tuple
 
 import numpy as np
 
 from mantidimaging.core.data import Images
 from mantidimaging.core.data.dataset import Dataset
-from mantidimaging.core.io.loader import img_loader
+from mantidimaging.core.io.loader import img_loader, nexus_loader
 from mantidimaging.core.io.utility import (DEFAULT_IO_FILE_FORMAT, get_file_names, get_prefix, get_file_extension,
                                            find_images, find_first_file_that_is_possibly_a_sample, find_log,
                                            find_180deg_proj)
+from mantidimaging.core.operation_history import const
+from mantidimaging.core.parallel import utility as pu
 from mantidimaging.core.utility.data_containers import ImageParameters, LoadingParameters
 from mantidimaging.core.utility.imat_log_file_parser import IMATLogFile
+from mantidimaging.core.utility.optional_imports import check_availability
 
 LOG = getLogger(__name__)
 
@@ -40,11 +46,29 @@ def _fitsread(filename):
     return image[0].data
 
 
-def _nxsread(filename):
-    import h5py
-    nexus = h5py.File(filename, 'r')
-    data = nexus["tomography/sample_data"]
-    return data
+def _fitsread_into(filename, out):
+    """
+    Reads one image straight into `out`. The file is memory mapped, and the image is converted to the type
+    of `out` as it is copied out of the file, instead of being read into a temporary array first.
+    Images that are scaled, see BSCALE and BZERO, are scaled in place, if `out` can hold the scaled values.
+    """
+    import astropy.io.fits as fits
+    with fits.open(filename, memmap=True, do_not_scale_image_data=True) as image:
+        if len(image) < 1:
+            raise RuntimeError("Could not load at least one FITS image/table file from: {0}".format(filename))
+        scale, zero = image[0].header.get('BSCALE', 1), image[0].header.get('BZERO', 0)
+        scaled = scale != 1 or zero != 0
+        if scaled and not (np.issubdtype(out.dtype, np.floating) and out.dtype.itemsize >= 4):
+            out[:] = _fitsread(filename)
+            return
+        data = image[0].data
+        np.copyto(out, data, casting='unsafe')
+        # the memory map has to be closed before the file is
+        del data
+    if scale != 1:
+        out *= scale
+    if zero != 0:
+        out += zero
 
 
 def _imread(filename):
@@ -53,6 +77,82 @@ def _imread(filename):
     return skio.imread(filename)
 
 
+# Images of another type than the one they are loaded as are decoded into these first, one for each thread
+_decode_buffers = threading.local()
+
+
+def _decode_buffer(shape, dtype) -> np.ndarray:
+    buffer = getattr(_decode_buffers, 'buffer', None)
+    if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+        buffer = _decode_buffers.buffer = np.empty(shape, dtype)
+    return buffer
+
+
+def _imread_into(filename, out):
+    """
+    Reads one image straight into `out`, if it is of the same type, or otherwise into a buffer
+    that is reused for all of the images, from which it is converted into `out`
+    """
+    import tifffile
+    with tifffile.TiffFile(filename) as tif:
+        series = tif.series[0]
+        if series.shape != out.shape:
+            raise ValueError(f"could not broadcast input array from shape {series.shape} into shape {out.shape}")
+        if series.dtype == out.dtype:
+            tif.asarray(out=out)
+        else:
+            buffer = _decode_buffer(series.shape, series.dtype)
+            tif.asarray(out=buffer)
+            np.copyto(out, buffer, casting='unsafe')
+
+
+# The type of the values in FITS images, by their BITPIX
+FITS_DTYPES = {8: np.uint8, 16: np.int16, 32: np.int32, 64: np.int64, -32: np.float32, -64: np.float64}
+
+
+def _fitsinfo(filename) -> Tuple[Tuple[int, ...], np.dtype]:
+    import astropy.io.fits as fits
+    header = fits.getheader(filename)
+    shape = tuple(header[f'NAXIS{axis}'] for axis in range(header['NAXIS'], 0, -1))
+    dtype = np.dtype(FITS_DTYPES[header['BITPIX']])
+    scale, zero = header.get('BSCALE', 1), header.get('BZERO', 0)
+    if dtype.kind == 'i' and scale == 1 and zero == 2**(8 * dtype.itemsize - 1):
+        # unsigned images are stored as signed ones, offset by BZERO
+        dtype = np.dtype(dtype.str.replace('i', 'u'))
+    elif scale != 1 or zero != 0:
+        dtype = np.dtype(np.float32)
+    return shape, dtype
+
+
+def _tiffinfo(filename) -> Tuple[Tuple[int, ...], np.dtype]:
+    import tifffile
+    with tifffile.TiffFile(filename) as tif:
+        series = tif.series[0]
+        return tuple(series.shape), np.dtype(series.dtype)
+
+
+def read_image_information(filename: str, in_format: str) -> Tuple[Tuple[int, ...], np.dtype]:
+    """
+    Reads the shape and type of the image in a file from its header, without decoding the image.
+    Formats whose header cannot be read on its own are decoded instead.
+
+    :return: The shape of the image, or of the stack of images in the file, and the type of its values
+    """
+    in_format = in_format.lstrip('.')
+    if in_format in ['fits', 'fit']:
+        return _fitsinfo(filename)
+    if in_format in ['tif', 'tiff'] and tifffile_available():
+        return _tiffinfo(filename)
+    if in_format == 'nxs':
+        return nexus_loader.read_info(filename)
+    image = _imread(filename)
+    return image.shape, image.dtype
+
+
+def tifffile_available() -> bool:
+    return check_availability('tifffile')
+
+
 def supported_formats():
     # ignore errors for unused import/variable, we are only checking
     # availability
@@ -71,7 +171,8 @@ def supported_formats():
 
     avail_list = \
         (['fits', 'fit', '.fits', '.fit'] if fits_available else []) + \
-        (['tif', 'tiff', '.tif', '.tiff'] if skio_available else [])
+        (['tif', 'tiff', '.tif', '.tiff'] if skio_available else []) + \
+        (['nxs', '.nxs'] if check_availability('h5py') else [])
 
     return avail_list
 
@@ -87,34 +188,45 @@ def read_in_file_information(input_path,
                              in_prefix='',
                              in_format=DEFAULT_IO_FILE_FORMAT,
                              data_dtype=np.float32) -> FileInformation:
+    """
+    Finds the images of a stack and reads their shape from the header of the first one, without loading any images,
+    see `read_image_information`. Whether they are sinograms is read from the metadata file, if there is one.
+    """
     input_file_names = get_file_names(input_path, in_format, in_prefix)
-    dataset = load(input_path,
-                   in_prefix=in_prefix,
-                   in_format=in_format,
-                   dtype=data_dtype,
-                   indices=[0, 1, 1],
-                   file_names=input_file_names)
-    images = dataset.sample
-
-    # construct and return the new shape
-    shape = (len(input_file_names), ) + images.data[0].shape
-
-    fi = FileInformation(filenames=input_file_names, shape=shape, sinograms=images.is_sinograms)
+    image_shape, _ = read_image_information(input_file_names[0], in_format)
+
+    # construct and return the new shape, files with a stack of images, like NeXus files, hold all of the images
+    num_images = image_shape[0] if len(image_shape) == 3 else len(input_file_names)
+    shape = (num_images, image_shape[-2], image_shape[-1])
+
+    sinograms = False
+    metadata_filename = _find_metadata_file(input_path, in_prefix)
+    if metadata_filename:
+        with open(metadata_filename) as f:
+            sinograms = json.load(f).get(const.SINOGRAMS, False)
+
+    fi = FileInformation(filenames=input_file_names, shape=shape, sinograms=sinograms)
     return fi
 
 
+def _find_metadata_file(input_path, in_prefix) -> Optional[str]:
+    metadata_found_filenames = get_file_names(input_path, 'json', in_prefix, essential=False)
+    return metadata_found_filenames[0] if metadata_found_filenames else None
+
+
 def load_log(log_file: str) -> IMATLogFile:
     with open(log_file, 'r') as f:
         return IMATLogFile(f.readlines(), log_file)
 
 
-def load_p(parameters: ImageParameters, dtype, progress) -> Images:
+def load_p(parameters: ImageParameters, dtype, progress, lazy=False) -> Images:
     return load(input_path=parameters.input_path,
                 in_prefix=parameters.prefix,
                 in_format=parameters.format,
                 indices=parameters.indices,
                 dtype=dtype,
-                progress=progress).sample
+                progress=progress,
+                lazy=lazy).sample
 
 
 def load_stack(file_path: str, progress=None) -> Images:
@@ -135,7 +247,9 @@ def load(input_path=None,
          dtype=np.float32,
          file_names=None,
          indices=None,
-         progress=None) -> Dataset:
+         progress=None,
+         lazy=False,
+         reader_threads=img_loader.READER_THREADS) -> Dataset:
     """
 
     Loads a stack, including sample, white and dark images.
@@ -154,6 +268,9 @@ def load(input_path=None,
                     filename, but removes all indices from the filenames list
                     that are not selected
     :param progress: The progress reporting instance
+    :param lazy: Only decode the sample images when they are accessed, see LazyStack
+    :param reader_threads: Number of files read at once, see img_loader.READER_THREADS.
+                           For NeXus files, the number of blocks of frames read at once, see nexus_loader
     :return: a tuple with shape 3: (sample, flat, dark), if no flat and dark
              were loaded, they will be None
     """
@@ -168,23 +285,29 @@ def load(input_path=None,
     else:
         input_file_names = file_names
 
-    if in_format in ['nxs']:
-        raise NotImplementedError("TODO this needs to be adapted to the new changes")
-        # pass only the first filename as we only expect a stack
-        # input_file = input_file_names[0]
-        # images = stack_loader.execute(_nxsread, input_file, dtype, "NXS Load", indices, progress)
+    if in_format in ['nxs', '.nxs']:
+        if lazy:
+            LOG.warning("NeXus files cannot be loaded on demand, so all of the file is loaded now")
+        # pass only the first filename as we only expect a stack, along with its flat and dark images.
+        # the readers are processes, so there are not more of them than cores
+        dataset = nexus_loader.execute(input_file_names[0], dtype, indices, progress,
+                                       min(reader_threads, pu.get_cores()))
     else:
+        load_into_func: Optional[Callable] = None
         if in_format in ['fits', 'fit']:
-            load_func = _fitsread
+            load_func, load_into_func = _fitsread, _fitsread_into
         else:
             load_func = _imread
+            if tifffile_available():
+                load_into_func = _imread_into
 
         dataset = img_loader.execute(load_func, input_file_names, input_path_flat_before, input_path_flat_after,
-                                     input_path_dark_before, input_path_dark_after, in_format, dtype, indices, progress)
+                                     input_path_dark_before, input_path_dark_after, in_format, dtype, indices, progress,
+                                     lazy, reader_threads, load_into_func,
+                                     partial(read_image_information, in_format=in_format))
 
     # Search for and load metadata file
-    metadata_found_filenames = get_file_names(input_path, 'json', in_prefix, essential=False)
-    metadata_filename = metadata_found_filenames[0] if metadata_found_filenames else None
+    metadata_filename = _find_metadata_file(input_path, in_prefix)
     if metadata_filename:
         with open(metadata_filename) as f:
             dataset.sample.load_metadata(f)
@@ -0,0 +1,181 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+"""
+This module handles the loading of NeXus files, which hold the whole stack, and its flat and dark images
+if there are any, in a single HDF5 file.
+
+The frames are read in blocks that are aligned with the chunks the datasets are stored in, so that no chunk
+is read and decompressed twice. Each block is read straight into the shared array, with HDF5 converting the
+values to its type. The blocks are read in the worker processes, as h5py lets only one thread use HDF5 at a time.
+
+The whole file is always loaded straight away, as the frames are not read on demand like image files can be.
+"""
+from logging import getLogger
+from typing import Optional, Tuple
+
+import numpy as np
+
+from mantidimaging.core.data import Images
+from mantidimaging.core.data.dataset import Dataset
+from mantidimaging.core.parallel import shared as ps, utility as pu
+from mantidimaging.core.parallel.backends import Backend
+from mantidimaging.core.utility.optional_imports import safe_import
+from mantidimaging.core.utility.progress_reporting import Progress, ProgressHandler
+
+LOG = getLogger(__name__)
+
+h5py = safe_import('h5py')
+
+SAMPLE_PATH = "tomography/sample_data"
+FLAT_BEFORE_PATH = "tomography/flat_before_data"
+FLAT_AFTER_PATH = "tomography/flat_after_data"
+DARK_BEFORE_PATH = "tomography/dark_before_data"
+DARK_AFTER_PATH = "tomography/dark_after_data"
+
+# Size of the blocks of frames read at once. It is rounded down to whole chunks, but a block always holds at least one
+READ_BLOCK_BYTES = 64 * 1024**2
+
+
+def read_info(filename: str) -> Tuple[Tuple[int, ...], np.dtype]:
+    """
+    :return: The shape and type of the sample frames, without reading any of them
+    """
+    with h5py.File(filename, 'r') as nexus:
+        dataset = nexus[SAMPLE_PATH]
+        return dataset.shape, dataset.dtype
+
+
+def frame_blocks(frames: range, chunk_frames: int, frame_bytes: int) -> np.ndarray:
+    """
+    Splits the selected frames into blocks, so that the frames of each block are in chunks that no other block uses.
+
+    :param frames: The frames that are loaded, e.g. range(0, 100, 2) for every other frame of the first 100
+    :param chunk_frames: Number of frames in each chunk of the dataset, 1 for datasets that are not chunked
+    :param frame_bytes: Size of a frame in the file
+    :return: The positions of the first and past the last frame of each block in `frames`, one row per block
+    """
+    frames_per_window = chunk_frames * max(1, READ_BLOCK_BYTES // (chunk_frames * frame_bytes))
+    blocks = []
+    position = 0
+    while position < len(frames):
+        first = frames[position]
+        window_end = (first // frames_per_window + 1) * frames_per_window
+        # number of selected frames left in the window, rounding up for the one the window starts in
+        end = min(len(frames), position + -(-(window_end - first) // frames.step))
+        blocks.append((position, end))
+        position = end
+    return np.array(blocks, dtype=np.int64).reshape(-1, 2)
+
+
+def _read_block(positions: np.ndarray, source: np.ndarray, out: np.ndarray, filename: str, dataset_path: str,
+                step: int):
+    with h5py.File(filename, 'r') as nexus:
+        nexus[dataset_path].read_direct(out, np.s_[source[0]:source[1]:step], np.s_[positions[0]:positions[1]])
+
+
+class _ForwardBlocks(ProgressHandler):
+    """
+    Reports the blocks read from one dataset as steps of the progress of the whole file
+    """
+    def __init__(self, progress: Progress, num_blocks: int):
+        super().__init__()
+        self.file_progress = progress
+        self.num_blocks = num_blocks
+        self.reported = 0
+
+    def progress_update(self):
+        # the execution adds a step of its own when it completes, which is not a block
+        steps = min(self.progress.current_step, self.num_blocks) - self.reported
+        if steps > 0:
+            self.reported += steps
+            self.file_progress.update(steps, msg="Block")
+
+
+class _DatasetPlan:
+    """
+    The frames of a dataset that are read, and the blocks they are read in
+    """
+    def __init__(self, filename: str, dataset_path: str, indices=None):
+        with h5py.File(filename, 'r') as nexus:
+            dataset = nexus[dataset_path]
+            self.shape = dataset.shape
+            chunk_frames = dataset.chunks[0] if dataset.chunks is not None else 1
+            frame_bytes = dataset.dtype.itemsize * int(np.prod(self.shape[1:]))
+
+        self.frames = range(self.shape[0])[slice(*indices)] if indices else range(self.shape[0])
+        self.positions = frame_blocks(self.frames, chunk_frames, frame_bytes)
+
+
+def load_dataset(filename: str, dataset_path: str, dtype, indices=None, progress=None, readers: int = 1) -> np.ndarray:
+    """
+    Reads the frames of one dataset of the file into a new shared array.
+
+    :param indices: The [start, stop, step] of the frames that are read. Frames that are skipped are not read at all
+    :param progress: Progress of the whole file, which each block that is read is a step of, see `execute`
+    :param readers: Number of worker processes that read blocks at once
+    """
+    return _load_dataset(filename, dataset_path, dtype, _DatasetPlan(filename, dataset_path, indices), progress,
+                         readers)
+
+
+def _load_dataset(filename: str, dataset_path: str, dtype, plan: _DatasetPlan, progress: Optional[Progress],
+                  readers: int) -> np.ndarray:
+    frames, positions = plan.frames, plan.positions
+    data = pu.create_array((len(frames), ) + tuple(plan.shape[1:]), dtype, first_touch=True)
+    source = positions * frames.step + frames.start
+    LOG.info(f"Reading {len(frames)} frames of {dataset_path} in {len(positions)} blocks")
+
+    # the execution sets the steps of the progress it is given, so it reports to one of its own for this dataset
+    dataset_progress = Progress(len(positions), task_name=f"Loading {dataset_path}")
+    if progress is not None:
+        dataset_progress.add_progress_handler(_ForwardBlocks(progress, len(positions)))
+
+    f = ps.create_partial(_read_block, ps.inplace3, filename=filename, dataset_path=dataset_path, step=frames.step)
+    ps.execute(f,
+               len(positions),
+               dataset_progress,
+               msg=f"Loading {dataset_path}",
+               cores=readers,
+               shared_list=[positions, source, data],
+               backend=Backend.PROCESSES)
+    return data
+
+
+def execute(filename: str, dtype, indices=None, progress=None, readers: int = 1) -> Dataset:
+    """
+    Loads the sample frames of a NeXus file, and its flat and dark frames if there are any.
+
+    :param indices: The [start, stop, step] of the sample frames that are loaded. The flat and dark frames
+                    are always all loaded.
+    :param progress: Progress of the whole file, which has a step for each block of any of the datasets
+    :param readers: Number of worker processes that read blocks at once
+    """
+    with h5py.File(filename, 'r') as nexus:
+        available = [path for path in (FLAT_BEFORE_PATH, FLAT_AFTER_PATH, DARK_BEFORE_PATH, DARK_AFTER_PATH)
+                     if path in nexus]
+
+    plans = {path: _DatasetPlan(filename, path) for path in available}
+    plans[SAMPLE_PATH] = _DatasetPlan(filename, SAMPLE_PATH, indices)
+    progress = Progress.ensure_instance(progress,
+                                        num_steps=sum(len(plan.positions) for plan in plans.values()),
+                                        task_name='Loading')
+
+    def load_optional(dataset_path: str) -> Optional[Images]:
+        if dataset_path not in available:
+            return None
+        return Images(_load_dataset(filename, dataset_path, dtype, plans[dataset_path], progress, readers), [filename])
+
+    with progress:
+        # like for image files, the flat and dark frames are loaded first so that they fail before the big stack is
+        # loaded
+        flat_before = load_optional(FLAT_BEFORE_PATH)
+        flat_after = load_optional(FLAT_AFTER_PATH)
+        dark_before = load_optional(DARK_BEFORE_PATH)
+        dark_after = load_optional(DARK_AFTER_PATH)
+        sample = _load_dataset(filename, SAMPLE_PATH, dtype, plans[SAMPLE_PATH], progress, readers)
+
+    return Dataset(Images(sample, [filename], indices),
+                   flat_before=flat_before,
+                   flat_after=flat_after,
+                   dark_before=dark_before,
+                   dark_after=dark_after)
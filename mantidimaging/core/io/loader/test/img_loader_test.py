@@ -0,0 +1,63 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+
+import unittest
+from unittest import mock
+
+import numpy as np
+import numpy.testing as npt
+
+from mantidimaging.core.io.loader.img_loader import ImageLoader
+
+SHAPE = (40, 3, 4)
+
+
+class ImageLoaderTest(unittest.TestCase):
+    def setUp(self):
+        self.expected = np.arange(np.prod(SHAPE), dtype=np.uint16).reshape(SHAPE)
+        self.files = [f"image_{index:03d}.tif" for index in range(SHAPE[0])]
+
+    def load_func(self, in_file):
+        return self.expected[self.files.index(in_file)]
+
+    def _loader(self, reader_threads, load_func=None):
+        return ImageLoader(load_func or self.load_func, "tif", SHAPE[1:], np.float32, None, None, reader_threads)
+
+    def test_files_loaded_in_order(self):
+        for reader_threads in [1, 4]:
+            data = self._loader(reader_threads).load_files(self.files)
+            npt.assert_equal(data, self.expected)
+            self.assertEqual(data.dtype, np.float32)
+
+    def test_loaded_stack_is_placed_by_the_workers(self):
+        with mock.patch('mantidimaging.core.parallel.numa.is_numa_aware', return_value=True), \
+                mock.patch('mantidimaging.core.parallel.numa.first_touch') as first_touch:
+            data = self._loader(1).load_files(self.files)
+        first_touch.assert_called_once_with(data)
+
+    def test_files_decoded_into_array(self):
+        def load_into_func(in_file, out):
+            out[:] = self.load_func(in_file)
+
+        loader = ImageLoader(None, "tif", SHAPE[1:], np.float32, None, None, 4, load_into_func)
+        npt.assert_equal(loader.load_files(self.files), self.expected)
+
+    def test_image_of_other_shape(self):
+        def load_func(in_file):
+            return np.zeros((5, 5)) if in_file == self.files[30] else self.load_func(in_file)
+
+        for reader_threads in [1, 4]:
+            with self.assertRaisesRegex(ValueError, "An image has different width and/or height"):
+                self._loader(reader_threads, load_func).load_files(self.files)
+
+    def test_unreadable_file(self):
+        def load_func(in_file):
+            raise IOError("no such file")
+
+        for reader_threads in [1, 4]:
+            with self.assertRaisesRegex(RuntimeError, f"Could not load file {self.files[0]}"):
+                self._loader(reader_threads, load_func).load_files(self.files)
+
+
+if __name__ == '__main__':
+    unittest.main()
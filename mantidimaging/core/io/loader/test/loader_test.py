@@ -3,10 +3,14 @@
 import os
 from unittest import mock
 
+import numpy as np
+import numpy.testing as npt
+
 from mantidimaging.core.io import loader
 from mantidimaging.core.io.loader import load_stack
 from mantidimaging.core.io.loader.loader import create_loading_parameters_for_file_path, DEFAULT_PIXEL_DEPTH, \
-    DEFAULT_PIXEL_SIZE, DEFAULT_IS_SINOGRAM
+    DEFAULT_PIXEL_SIZE, DEFAULT_IS_SINOGRAM, _fitsread, _fitsread_into, _imread_into, read_image_information, \
+    read_in_file_information
 from mantidimaging.test_helpers import FileOutputtingTestCase
 
 
@@ -148,3 +152,59 @@ class LoaderTest(FileOutputtingTestCase):
         self.assertEqual(proj_180_file, proj180.input_path)
         self.assertEqual(None, proj180.log_file)
         self.assertEqual(proj_180_file_prefix, proj180.prefix)
+
+    def test_imread_into(self):
+        import tifffile
+        image = np.arange(12, dtype=np.uint16).reshape(3, 4)
+        file_name = os.path.join(self.output_directory, "image.tif")
+        tifffile.imwrite(file_name, image)
+
+        for dtype in [np.uint16, np.float32]:
+            out = np.zeros((3, 4), dtype)
+            _imread_into(file_name, out)
+            npt.assert_equal(out, image)
+
+        with self.assertRaises(ValueError):
+            _imread_into(file_name, np.zeros((4, 3), np.float32))
+
+    def test_fitsread_into(self):
+        import astropy.io.fits as fits
+        image = np.arange(0, 60000, 5000, dtype=np.uint16).reshape(3, 4)
+        file_name = os.path.join(self.output_directory, "image.fits")
+        # unsigned images are stored as signed ones, offset with BZERO
+        fits.PrimaryHDU(image).writeto(file_name)
+
+        for dtype in [np.float32, np.float16, np.uint16]:
+            out = np.zeros((3, 4), dtype)
+            _fitsread_into(file_name, out)
+            npt.assert_equal(out, _fitsread(file_name).astype(dtype))
+
+    def test_read_image_information(self):
+        import astropy.io.fits as fits
+        import tifffile
+        image = np.zeros((3, 4), np.uint16)
+        tifffile.imwrite(os.path.join(self.output_directory, "image.tif"), image)
+        fits.PrimaryHDU(image).writeto(os.path.join(self.output_directory, "image.fits"))
+        fits.PrimaryHDU(image.astype(np.float32)).writeto(os.path.join(self.output_directory, "float.fits"))
+
+        self.assertEqual(read_image_information(os.path.join(self.output_directory, "image.tif"), "tif"),
+                         ((3, 4), np.uint16))
+        self.assertEqual(read_image_information(os.path.join(self.output_directory, "image.fits"), ".fits"),
+                         ((3, 4), np.uint16))
+        self.assertEqual(read_image_information(os.path.join(self.output_directory, "float.fits"), "fits"),
+                         ((3, 4), np.float32))
+
+    @mock.patch("mantidimaging.core.io.loader.loader._imread")
+    def test_read_in_file_information_does_not_decode_images(self, imread_mock: mock.Mock):
+        import tifffile
+        for index in range(5):
+            tifffile.imwrite(os.path.join(self.output_directory, f"image_{index:03d}.tif"), np.zeros((3, 4)))
+        with open(os.path.join(self.output_directory, "image_.json"), "w") as f:
+            f.write('{"sinograms": true}')
+
+        info = read_in_file_information(self.output_directory, in_prefix="image_", in_format="tif")
+
+        self.assertEqual(info.shape, (5, 3, 4))
+        self.assertEqual(len(info.filenames), 5)
+        self.assertTrue(info.sinograms)
+        imread_mock.assert_not_called()
@@ -0,0 +1,100 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+
+import os
+from unittest import mock
+
+import h5py
+import numpy as np
+import numpy.testing as npt
+
+from mantidimaging.core.io.loader import loader, nexus_loader
+from mantidimaging.core.utility.progress_reporting import Progress, ProgressHandler
+from mantidimaging.test_helpers import FileOutputtingTestCase
+
+SHAPE = (10, 4, 5)
+FRAME_BYTES = 2 * SHAPE[1] * SHAPE[2]
+
+
+class NexusLoaderTest(FileOutputtingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.filename = os.path.join(self.output_directory, "scan.nxs")
+        self.sample = np.arange(np.prod(SHAPE), dtype=np.int16).reshape(SHAPE)
+        self.flat = np.full((2, ) + SHAPE[1:], 7, dtype=np.int16)
+        with h5py.File(self.filename, 'w') as nexus:
+            nexus.create_dataset(nexus_loader.SAMPLE_PATH, data=self.sample, chunks=(3, ) + SHAPE[1:])
+            nexus.create_dataset(nexus_loader.FLAT_BEFORE_PATH, data=self.flat)
+
+    def test_frame_blocks_aligned_with_chunks(self):
+        with mock.patch.object(nexus_loader, 'READ_BLOCK_BYTES', 3 * FRAME_BYTES):
+            npt.assert_equal(nexus_loader.frame_blocks(range(10), 3, FRAME_BYTES), [[0, 3], [3, 6], [6, 9], [9, 10]])
+            # frames 1, 3, 5, 7 and 9, of which 3 and 5 are in the same chunk
+            npt.assert_equal(nexus_loader.frame_blocks(range(1, 10, 2), 3, FRAME_BYTES),
+                             [[0, 1], [1, 3], [3, 4], [4, 5]])
+
+    def test_frame_blocks_whole_chunks(self):
+        with mock.patch.object(nexus_loader, 'READ_BLOCK_BYTES', 4 * FRAME_BYTES):
+            # the blocks are rounded down to whole chunks, but are never smaller than one
+            npt.assert_equal(nexus_loader.frame_blocks(range(10), 3, FRAME_BYTES), [[0, 3], [3, 6], [6, 9], [9, 10]])
+            npt.assert_equal(nexus_loader.frame_blocks(range(10), 5, FRAME_BYTES), [[0, 5], [5, 10]])
+
+    def test_load_dataset(self):
+        with mock.patch.object(nexus_loader, 'READ_BLOCK_BYTES', FRAME_BYTES):
+            data = nexus_loader.load_dataset(self.filename, nexus_loader.SAMPLE_PATH, np.float32)
+
+        self.assertEqual(np.float32, data.dtype)
+        npt.assert_equal(data, self.sample)
+
+    def test_load_dataset_indices(self):
+        for readers in [1, 2]:
+            with mock.patch.object(nexus_loader, 'READ_BLOCK_BYTES', FRAME_BYTES):
+                data = nexus_loader.load_dataset(self.filename,
+                                                 nexus_loader.SAMPLE_PATH,
+                                                 np.float32,
+                                                 indices=[1, 9, 2],
+                                                 readers=readers)
+
+            npt.assert_equal(data, self.sample[1:9:2])
+
+    def test_execute_loads_flat_and_dark_from_same_file(self):
+        dataset = nexus_loader.execute(self.filename, np.float32, indices=[0, 4, 1])
+
+        npt.assert_equal(dataset.sample.data, self.sample[:4])
+        self.assertEqual([0, 4, 1], dataset.sample.indices)
+        npt.assert_equal(dataset.flat_before.data, self.flat)
+        self.assertIsNone(dataset.flat_after)
+        self.assertIsNone(dataset.dark_before)
+        self.assertIsNone(dataset.dark_after)
+
+    def test_execute_progress_has_a_step_for_each_block(self):
+        progress = Progress()
+        updates = []
+        handler = mock.create_autospec(ProgressHandler)
+        handler.progress_update.side_effect = lambda: updates.append((progress.current_step, progress.end_step))
+        progress.add_progress_handler(handler)
+
+        with mock.patch.object(nexus_loader, 'READ_BLOCK_BYTES', FRAME_BYTES):
+            # 4 blocks of sample frames and 2 of flat frames, then the step that completes the progress
+            nexus_loader.execute(self.filename, np.float32, progress=progress)
+
+        self.assertEqual([(step, 6) for step in range(1, 7)], updates[:-1])
+        self.assertTrue(progress.is_completed())
+
+    def test_loader_load_nexus_not_on_demand(self):
+        with self.assertLogs(loader.LOG, 'WARNING'):
+            dataset = loader.load(self.output_directory, in_format='nxs', lazy=True, reader_threads=1)
+
+        self.assertFalse(dataset.sample.is_lazy)
+
+    def test_loader_load(self):
+        dataset = loader.load(self.output_directory, in_format='nxs', reader_threads=1)
+
+        npt.assert_equal(dataset.sample.data, self.sample)
+        npt.assert_equal(dataset.flat_before.data, self.flat)
+
+    def test_read_in_file_information(self):
+        info = loader.read_in_file_information(self.output_directory, in_format='nxs')
+
+        self.assertEqual(SHAPE, info.shape)
+        self.assertEqual([self.filename], info.filenames)
@@ -8,6 +8,7 @@ from typing import List, Union
 import numpy as np
 
 from .utility import DEFAULT_IO_FILE_FORMAT
+from ..data import transpose
 from ..data.images import Images
 from ..operations.rescale import RescaleFilter
 from ..utility.progress_reporting import Progress
@@ -33,7 +34,7 @@ def write_img(data, filename, overwrite=False):
     skio.imsave(filename, data)
 
 
-def write_nxs(data, filename, projection_angles=None, overwrite=False):
+def write_nxs(data, filename, projection_angles=None, overwrite=False, swap_axes=False):
     import h5py
     nxs = h5py.File(filename, 'w')
 
@@ -41,8 +42,13 @@ def write_nxs(data, filename, projection_angles=None, overwrite=False):
     # new shape to account for appending flat and dark images
     # correct_shape = (data.shape[0] + 2, data.shape[1], data.shape[2])
 
-    dset = nxs.create_dataset("tomography/sample_data", data.shape)
-    dset[:data.shape[0]] = data[:]
+    if swap_axes:
+        dset = nxs.create_dataset("tomography/sample_data", transpose.swapped_shape(data))
+        for first, block in transpose.swapped_blocks(data):
+            dset[first:first + block.shape[0]] = block
+    else:
+        dset = nxs.create_dataset("tomography/sample_data", data.shape)
+        dset[:data.shape[0]] = data[:]
     # left here if we decide to start appending the flat and dark images again
     # dset[-2] = flat[:]
     # dset[-1] = dark[:]
@@ -101,17 +107,15 @@ def save(images: Images,
     output_dir = os.path.abspath(os.path.expanduser(output_dir))
     make_dirs_if_needed(output_dir, overwrite_all)
 
-    # Define current parameters
-    min_value = np.nanmin(images.data)
-    max_value = np.nanmax(images.data)
-    int_16_slope = max_value / INT16_SIZE
-
-    # Do rescale if needed.
+    # Do rescale if needed. The range of the values is only needed for that, and is kept by the stack, see
+    # `Images.statistics`, so saving the same stack again does not scan it
     if pixel_depth is None or pixel_depth == "float32":
         rescale_params = None
     elif pixel_depth == "int16":
+        min_value = images.statistics.min
+        max_value = images.statistics.max
         # turn the offset to string otherwise json throws a TypeError when trying to save float32
-        rescale_params = {"offset": str(min_value), "slope": int_16_slope}
+        rescale_params = {"offset": str(min_value), "slope": max_value / INT16_SIZE}
     else:
         raise ValueError("The pixel depth given is not handled: " + pixel_depth)
 
@@ -121,14 +125,11 @@ def save(images: Images,
     with open(metadata_filename, 'w+') as f:
         images.save_metadata(f, rescale_params)
 
-    data = images.data
-
-    if swap_axes:
-        data = np.swapaxes(data, 0, 1)
+    data = images.read_only_data
 
     if out_format in ['nxs']:
         filename = os.path.join(output_dir, name_prefix + name_postfix)
-        write_nxs(data, filename + '.nxs', overwrite=overwrite_all)
+        write_nxs(data, filename + '.nxs', overwrite=overwrite_all, swap_axes=swap_axes)
         return filename
     else:
         if out_format in ['fit', 'fits']:
@@ -137,7 +138,7 @@ def save(images: Images,
             # pass all other formats to skimage
             write_func = write_img
 
-        num_images = data.shape[0]
+        num_images = data.shape[1] if swap_axes else data.shape[0]
         progress.set_estimated_steps(num_images)
 
         names = generate_names(name_prefix, indices, num_images, custom_idx, zfill_len, name_postfix, out_format)
@@ -145,20 +146,24 @@ def save(images: Images,
         for i in range(len(names)):
             names[i] = os.path.join(output_dir, names[i])
 
+        # the swapped images are copied a block at a time, as writing each one from a strided view is slow
+        blocks = transpose.swapped_blocks(data) if swap_axes else [(0, data)]
+
         with progress:
-            min_value = images.data.min()
-            for idx in range(num_images):
-                # Overwrite images with the copy that has been rescaled.
-                if pixel_depth == "int16":
-                    write_func(
-                        rescale_single_image(np.copy(images.data[idx]),
-                                             min_input=min_value,
-                                             max_input=max_value,
-                                             max_output=INT16_SIZE - 1), names[idx], overwrite_all)
-                else:
-                    write_func(data[idx, :, :], names[idx], overwrite_all)
-
-                progress.update(msg='Image')
+            for first, block in blocks:
+                for offset, image in enumerate(block):
+                    idx = first + offset
+                    # Overwrite images with the copy that has been rescaled.
+                    if pixel_depth == "int16":
+                        write_func(
+                            rescale_single_image(np.copy(image),
+                                                 min_input=min_value,
+                                                 max_input=max_value,
+                                                 max_output=INT16_SIZE - 1), names[idx], overwrite_all)
+                    else:
+                        write_func(image, names[idx], overwrite_all)
+
+                    progress.update(msg='Image')
 
         return names
 
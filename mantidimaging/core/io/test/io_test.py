@@ -3,11 +3,13 @@
 
 import os
 import unittest
+from unittest import mock
 
+import numpy as np
 import numpy.testing as npt
 
 import mantidimaging.test_helpers.unit_test_helper as th
-from mantidimaging.core.data import Images
+from mantidimaging.core.data import Images, statistics, transpose
 from mantidimaging.core.io import loader
 from mantidimaging.core.io import saver
 from mantidimaging.helper import initialise_logging
@@ -218,6 +220,26 @@ class IOTest(FileOutputtingTestCase):
         # Ensure properties have been preserved
         self.assertEqual(loaded_images.metadata, images.metadata)
 
+    def test_save_swap_axes(self):
+        images = th.generate_images()
+
+        # a block of 3 sinograms at a time
+        with mock.patch.object(transpose, 'BLOCK_BYTES', 3 * images.num_projections * images.width * 4):
+            saver.save(images, self.output_directory, swap_axes=True)
+
+        loaded_images = loader.load(self.output_directory).sample
+        npt.assert_equal(loaded_images.data, np.swapaxes(images.data, 0, 1))
+
+    def test_saving_again_does_not_scan_the_stack(self):
+        images = th.generate_images()
+        images.statistics
+
+        with mock.patch.object(statistics, 'image_statistics') as scan:
+            saver.save(images, self.output_directory, pixel_depth="int16")
+            saver.save(images, self.output_directory, pixel_depth="int16", overwrite_all=True)
+
+        scan.assert_not_called()
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -2,7 +2,9 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 
 import os
+import time
 from pathlib import Path
+from unittest import mock
 
 from mantidimaging.helper import initialise_logging
 from mantidimaging.core.io import utility
@@ -35,6 +37,70 @@ class UtilityTest(FileOutputtingTestCase):
         # Expect to find the .tiff file
         self.assertEqual([tiff_filename], found_files)
 
+    def _write_files(self, *names):
+        for name in names:
+            with open(os.path.join(self.output_directory, name), 'wb') as f:
+                f.write(b'\0')
+
+    def _set_directory_modified(self, seconds_ago):
+        modified = time.time_ns() - seconds_ago * 10**9
+        os.utime(self.output_directory, ns=(modified, modified))
+
+    def test_get_file_names_natural_order_and_prefix(self):
+        self._write_files('Tomo_10.tif', 'Tomo_9.tif', 'Tomo_100.tif', 'Flat_1.tif', '.Tomo_1.tif', 'Tomo_1.txt')
+
+        found_files = utility.get_file_names(self.output_directory, 'tif', prefix='Tomo')
+
+        self.assertEqual(
+            [os.path.join(self.output_directory, f) for f in ('Tomo_9.tif', 'Tomo_10.tif', 'Tomo_100.tif')],
+            found_files)
+
+    def test_get_file_names_lists_directory_once(self):
+        self._write_files('Tomo_1.tif', 'Flat_1.tif')
+        self._set_directory_modified(seconds_ago=60)
+
+        with mock.patch('os.scandir', wraps=os.scandir) as scandir:
+            utility.get_file_names(self.output_directory, 'tif', prefix='Tomo')
+            utility.get_file_names(self.output_directory, 'tif', prefix='*Flat')
+            utility.get_file_names(self.output_directory, 'fits', essential=False)
+
+        scandir.assert_called_once_with(os.path.abspath(self.output_directory))
+
+    def test_get_file_names_lists_modified_directory_again(self):
+        self._write_files('Tomo_1.tif')
+        self._set_directory_modified(seconds_ago=60)
+        self.assertEqual(1, len(utility.get_file_names(self.output_directory, 'tif')))
+
+        self._write_files('Tomo_2.tif')
+        self._set_directory_modified(seconds_ago=30)
+
+        self.assertEqual(2, len(utility.get_file_names(self.output_directory, 'tif')))
+
+    def test_get_file_names_recently_modified_directory_is_listed_again(self):
+        self._write_files('Tomo_1.tif')
+
+        with mock.patch('os.scandir', wraps=os.scandir) as scandir:
+            utility.get_file_names(self.output_directory, 'tif')
+            utility.get_file_names(self.output_directory, 'tif')
+
+        self.assertEqual(2, scandir.call_count)
+
+    def test_get_file_names_prefix_with_directory(self):
+        self._write_files('Flat_log.txt')
+        sub_directory = os.path.join(self.output_directory, 'Flat')
+        os.mkdir(sub_directory)
+
+        found_files = utility.get_file_names(sub_directory, 'txt', prefix=os.path.join('..', 'Flat'))
+
+        self.assertEqual([os.path.join(self.output_directory, 'Flat_log.txt')],
+                         [os.path.normpath(f) for f in found_files])
+
+    def test_get_file_names_missing_directory(self):
+        missing = os.path.join(self.output_directory, 'missing')
+
+        self.assertEqual([], utility.get_file_names(missing, 'tif', essential=False))
+        self.assertRaises(RuntimeError, utility.get_file_names, missing, 'tif')
+
     def test_find_log(self):
         with open(os.path.join(self.output_directory, "../sample_log.txt"), 'w') as f:
             f.write("sample logs")
@@ -1,18 +1,29 @@
 # Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
 # SPDX - License - Identifier: GPL-3.0-or-later
 
+import fnmatch
 import glob
 import itertools
 import os
 import re
+import threading
+import time
+from collections import OrderedDict
 from logging import getLogger, Logger
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 DEFAULT_IO_FILE_FORMAT = 'tif'
 
 SIMILAR_FILE_EXTENSIONS = (('tif', 'tiff'), ('fit', 'fits'))
 
+# Number of directories whose listings are kept by `get_file_names`
+DIRECTORY_INDEX_CACHE_SIZE = 64
+
+# Listings taken this soon after the directory was modified are not reused, as file systems only update the
+# modification time every few milliseconds, or seconds on some network storage, so later changes could be missed
+DIRECTORY_INDEX_SETTLE_NS = 2 * 10**9
+
 
 def get_file_extension(file):
     """
@@ -73,10 +84,14 @@ def get_file_names(path, img_format, prefix='', essential=True) -> List[str]:
         return []
 
     path = os.path.abspath(os.path.expanduser(path))
+    # the prefix can include directories, e.g. when it is the path of a log file without its extension
+    directory, prefix = os.path.split(os.path.join(path, prefix))
+    index = _directory_index(directory) if not glob.has_magic(directory) else None
     extensions = get_candidate_file_extensions(img_format)
-    files_match = []
+    files_match: List[str] = []
     for ext in extensions:
-        files_match = glob.glob(os.path.join(path, "{0}*{1}".format(prefix, ext)))
+        pattern = "{0}*{1}".format(prefix, ext)
+        files_match = index.match(pattern) if index is not None else _glob_sorted(os.path.join(directory, pattern))
 
         if len(files_match) > 0:
             break
@@ -84,15 +99,83 @@ def get_file_names(path, img_format, prefix='', essential=True) -> List[str]:
     if len(files_match) == 0 and essential:
         raise RuntimeError(f"Could not find any image files in '{path}' with extensions: {extensions}")
 
-    # This is a necessary step, otherwise the file order is not guaranteed to
-    # be sequential and we get randomly ordered stack of names
-    files_match.sort(key=_alphanum_key_split)
-
     log.debug(f'Found {len(files_match)} files with common prefix: {os.path.commonprefix(files_match)}')
 
     return files_match
 
 
+class DirectoryIndex:
+    """
+    The names in a directory, listed once and kept in the natural sort order, so that the many
+    prefix and extension queries made while looking for a dataset do not each list the directory again.
+    """
+    def __init__(self, path: str, mtime: int):
+        self.path = path
+        self.mtime = mtime
+        self.listed_at = time.time_ns()
+        with os.scandir(path) as entries:
+            paths = [os.path.join(path, entry.name) for entry in entries]
+        # This is a necessary step, otherwise the file order is not guaranteed to
+        # be sequential and we get randomly ordered stack of names
+        paths.sort(key=_alphanum_key_split)
+        self.paths = paths
+        self.names = [os.path.basename(p) for p in paths]
+        self._matches: Dict[str, List[str]] = {}
+
+    def match(self, pattern: str) -> List[str]:
+        """
+        :param pattern: A glob pattern for the names, e.g. "*Flat*tif"
+        :return: The paths of the names matching the pattern, in the natural sort order.
+                 Like with glob, hidden names only match patterns that start with a dot.
+        """
+        if pattern not in self._matches:
+            include_hidden = pattern.startswith('.')
+            self._matches[pattern] = [
+                path for name, path in zip(self.names, self.paths)
+                if (include_hidden or not name.startswith('.')) and fnmatch.fnmatch(name, pattern)
+            ]
+        return list(self._matches[pattern])
+
+    def is_current(self, mtime: int) -> bool:
+        return mtime == self.mtime and self.listed_at - mtime > DIRECTORY_INDEX_SETTLE_NS
+
+
+_directory_indices: 'OrderedDict[str, DirectoryIndex]' = OrderedDict()
+_directory_indices_lock = threading.Lock()
+
+
+def _directory_index(path: str) -> Optional[DirectoryIndex]:
+    """
+    Gets the index of a directory, which is listed again if it was modified since it was last listed.
+    :return: The index, or None if the directory cannot be listed
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+        with _directory_indices_lock:
+            index = _directory_indices.get(path)
+            if index is None or not index.is_current(mtime):
+                index = DirectoryIndex(path, mtime)
+                _directory_indices[path] = index
+                while len(_directory_indices) > DIRECTORY_INDEX_CACHE_SIZE:
+                    _directory_indices.popitem(last=False)
+            else:
+                _directory_indices.move_to_end(path)
+            return index
+    except OSError:
+        return None
+
+
+def _glob_sorted(pattern: str) -> List[str]:
+    files_match = glob.glob(pattern)
+    files_match.sort(key=_alphanum_key_split)
+    return files_match
+
+
+def clear_directory_index_cache():
+    with _directory_indices_lock:
+        _directory_indices.clear()
+
+
 def find_images_in_same_directory(sample_dirname: Path, type: str, suffix: str,
                                   image_format: str) -> Optional[List[str]]:
     prefix_list = [f"*{type}", f"*{type.lower()}", f"*{type}_{suffix}", f"*{type.lower()}_{suffix}"]
@@ -84,6 +84,29 @@ class BaseFilter:
     def group_name() -> FilterGroup:
         return FilterGroup.NoGroup
 
+    @staticmethod
+    def calibration_kwargs(images: Images) -> Dict[str, Any]:
+        """
+        Parameters for filter_func that make it do its usual work on the given synthetic data.
+        Used to benchmark the parallel execution of the filter, see core.parallel.calibration.
+
+        :param images: The synthetic data that the filter will be applied to
+        :return: The kwargs that will be passed to filter_func
+        """
+        return {}
+
+    @staticmethod
+    def peak_extra_memory(images: Images, **kwargs) -> int:
+        """
+        The most memory that filter_func needs on top of the input data, e.g. for a new array for its output.
+        It is reserved from the memory budget before the filter runs, see core.parallel.budget.
+
+        :param images: The data that the filter will be applied to
+        :param kwargs: The kwargs that will be passed to filter_func
+        :return: The memory in bytes
+        """
+        return 0
+
 
 def raise_not_implemented(function_name):
     raise NotImplementedError(f"Required method '{function_name}' not implemented for filter")
@@ -53,10 +53,10 @@ class ClipValuesFilter(BaseFilter):
         # evaluates to false
         if clip_min is not None or clip_max is not None:
             with progress:
-                sample = data.data
                 progress.update(msg="Determining clip min and clip max")
-                clip_min = clip_min if clip_min is not None else sample.min()
-                clip_max = clip_max if clip_max is not None else sample.max()
+                clip_min = clip_min if clip_min is not None else data.statistics.min
+                clip_max = clip_max if clip_max is not None else data.statistics.max
+                sample = data.data
 
                 clip_min_new_value = clip_min_new_value if clip_min_new_value is not None else clip_min
 
@@ -7,6 +7,7 @@ from unittest import mock
 import numpy.testing as npt
 
 import mantidimaging.test_helpers.unit_test_helper as th
+from mantidimaging.core.data import statistics
 from mantidimaging.core.operations.clip_values import ClipValuesFilter
 from mantidimaging.core.utility.memory_usage import get_memory_usage_linux
 
@@ -65,6 +66,16 @@ class ClipValuesFilterTest(unittest.TestCase):
         npt.assert_approx_equal(result.data.min(), 0.2)
         npt.assert_approx_equal(result.data.max(), 0.8)
 
+    def test_clip_uses_kept_statistics(self):
+        images = th.generate_images()
+        images.statistics
+
+        with mock.patch.object(statistics, 'image_statistics') as scan:
+            ClipValuesFilter().filter_func(images, clip_min=0.2)
+
+        scan.assert_not_called()
+        self.assertGreaterEqual(images.statistics.min, 0.2)
+
     def test_memory_change_acceptable(self):
         """
         Expected behaviour for the filter is to be done in place
@@ -50,12 +50,7 @@ class CropCoordinatesFilter(BaseFilter):
         :return: The processed 3D numpy.ndarray
         """
 
-        if region_of_interest is None:
-            region_of_interest = SensibleROI.from_list([0, 0, 50, 50])
-        if isinstance(region_of_interest, list):
-            region_of_interest = SensibleROI.from_list(region_of_interest)
-
-        assert isinstance(region_of_interest, SensibleROI)
+        region_of_interest = _as_roi(region_of_interest)
 
         h.check_data_stack(images)
 
@@ -70,6 +65,11 @@ class CropCoordinatesFilter(BaseFilter):
 
         return images
 
+    @staticmethod
+    def peak_extra_memory(images: Images, region_of_interest=None, **kwargs) -> int:
+        roi = _as_roi(region_of_interest)
+        return images.num_images * max(0, roi.height) * max(0, roi.width) * images.dtype.itemsize
+
     @staticmethod
     def register_gui(form, on_change, view):
         from mantidimaging.gui.utility import add_property_to_form
@@ -114,3 +114,13 @@ def execute_single(data, roi, progress=None, out=None):
             output = out[:] if out is not None else data[:]
             output[:] = data[:, roi.top:roi.bottom, roi.left:roi.right]
         return output
+
+
+def _as_roi(region_of_interest: Optional[Union[List[int], List[float], SensibleROI]]) -> SensibleROI:
+    if region_of_interest is None:
+        region_of_interest = SensibleROI.from_list([0, 0, 50, 50])
+    if isinstance(region_of_interest, list):
+        region_of_interest = SensibleROI.from_list(region_of_interest)
+
+    assert isinstance(region_of_interest, SensibleROI)
+    return region_of_interest
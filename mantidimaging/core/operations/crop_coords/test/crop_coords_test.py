@@ -82,6 +82,12 @@ class CropCoordsTest(unittest.TestCase):
         self.assertRaises(ValueError, CropCoordinatesFilter.execute_wrapper, roi_mock)
         roi_mock.text.assert_called_once()
 
+    def test_peak_extra_memory_is_cropped_size(self):
+        images = th.generate_images((10, 20, 40))
+
+        peak = CropCoordinatesFilter.peak_extra_memory(images, region_of_interest=SensibleROI.from_list([1, 2, 6, 5]))
+        self.assertEqual(peak, 10 * 3 * 5 * 4)
+
 
 if __name__ == '__main__':
     unittest.main()
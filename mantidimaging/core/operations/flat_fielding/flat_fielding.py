@@ -100,20 +100,28 @@ class FlatFieldFilter(BaseFilter):
                 if 2 != flat_avg.ndim or 2 != dark_avg.ndim:
                     raise ValueError(
                         f"Incorrect shape of the flat image ({flat_avg.shape}) or dark image ({dark_avg.shape}) \
-                        which should match the shape of the sample images ({images.data.shape})")
+                        which should match the shape of the sample images ({images.shape})")
 
-                if not images.data.shape[1:] == flat_avg.shape == dark_avg.shape:
-                    raise ValueError(f"Not all images are the expected shape: {images.data.shape[1:]}, instead "
+                if not images.shape[1:] == flat_avg.shape == dark_avg.shape:
+                    raise ValueError(f"Not all images are the expected shape: {images.shape[1:]}, instead "
                                      f"flat had shape: {flat_avg.shape}, and dark had shape: {dark_avg.shape}")
 
                 progress = Progress.ensure_instance(progress,
-                                                    num_steps=images.data.shape[0],
+                                                    num_steps=images.shape[0],
                                                     task_name='Background Correction')
                 _execute(images.data, flat_avg, dark_avg, cores, chunksize, progress)
 
         h.check_data_stack(images)
         return images
 
+    @staticmethod
+    def calibration_kwargs(images: Images) -> Dict[str, Any]:
+        return {
+            'flat_before': Images(np.full((2, ) + images.shape[1:], 2, dtype=images.dtype)),
+            'dark_before': Images(np.ones((2, ) + images.shape[1:], dtype=images.dtype)),
+            'selected_flat_fielding': "Only Before"
+        }
+
     @staticmethod
     def register_gui(form, on_change, view: FiltersWindowView) -> Dict[str, Any]:
         from mantidimaging.gui.utility import add_property_to_form
@@ -289,12 +297,22 @@ def _execute(data: np.ndarray, flat=None, dark=None, cores=None, chunksize=None,
 
         # subtract the dark from all images
         do_subtract = ps.create_partial(_subtract, fwd_function=ps.inplace_second_2d)
-        ps.shared_list = [data, dark]
-        ps.execute(do_subtract, data.shape[0], progress, cores=cores)
+        ps.execute(do_subtract,
+                   data.shape[0],
+                   progress,
+                   cores=cores,
+                   batched=True,
+                   shared_list=[data, dark],
+                   backend=ps.Backend.THREADS)
 
         # divide the data by (flat - dark)
         do_divide = ps.create_partial(_divide, fwd_function=ps.inplace_second_2d)
-        ps.shared_list = [data, norm_divide]
-        ps.execute(do_divide, data.shape[0], progress, cores=cores)
+        ps.execute(do_divide,
+                   data.shape[0],
+                   progress,
+                   cores=cores,
+                   batched=True,
+                   shared_list=[data, norm_divide],
+                   backend=ps.Backend.THREADS)
 
     return data
@@ -3,6 +3,7 @@
 
 from functools import partial
 from logging import getLogger
+from typing import Any, Dict
 import numpy as np
 
 import scipy.ndimage as scipy_ndimage
@@ -53,6 +54,10 @@ class GaussianFilter(BaseFilter):
         h.check_data_stack(data)
         return data
 
+    @staticmethod
+    def calibration_kwargs(images: Images) -> Dict[str, Any]:
+        return {'size': 3, 'mode': 'reflect', 'order': 0}
+
     @staticmethod
     def register_gui(form, on_change, view):
         _, size_field = add_property_to_form('Kernel Size',
@@ -100,8 +105,13 @@ def _execute(data: np.ndarray, size, mode, order, cores=None, progress=None):
              "filter size/width: {1}.".format(data.dtype, size))
 
     progress.update()
-    ps.shared_list = [data]
-    ps.execute(f, data.shape[0], progress, msg="Gaussian filter", cores=cores)
+    ps.execute(f,
+               data.shape[0],
+               progress,
+               msg="Gaussian filter",
+               cores=cores,
+               shared_list=[data],
+               backend=ps.Backend.THREADS)
 
     progress.mark_complete()
     log.info("Finished  gaussian filter, with pixel data type: {0}, "
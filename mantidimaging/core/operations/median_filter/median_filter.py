@@ -57,6 +57,10 @@ class MedianFilter(BaseFilter):
         h.check_data_stack(data)
         return data
 
+    @staticmethod
+    def calibration_kwargs(images: Images) -> Dict[str, Any]:
+        return {'size': 3}
+
     @staticmethod
     def register_gui(form: 'QFormLayout', on_change: Callable, view) -> Dict[str, Any]:
         _, size_field = add_property_to_form('Kernel Size',
@@ -105,8 +109,13 @@ def _execute(data, size, mode, cores=None, chunksize=None, progress=None):
         log.info("PARALLEL median filter, with pixel data type: {0}, filter "
                  "size/width: {1}.".format(data.dtype, size))
 
-        ps.shared_list = [data]
-        ps.execute(f, data.shape[0], progress, msg="Median filter", cores=cores)
+        ps.execute(f,
+                   data.shape[0],
+                   progress,
+                   msg="Median filter",
+                   cores=cores,
+                   shared_list=[data],
+                   backend=ps.Backend.THREADS)
 
     return data
 
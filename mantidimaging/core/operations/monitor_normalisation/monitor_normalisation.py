@@ -13,7 +13,8 @@ from mantidimaging.gui.mvp_base import BaseMainWindowView
 
 
 def _divide_by_counts(data=None, counts=None):
-    data[:] = np.true_divide(data, counts)
+    # data is a block of images, with the matching block of counts
+    np.true_divide(data, counts[:, np.newaxis, np.newaxis], out=data)
 
 
 class MonitorNormalisation(BaseFilter):
@@ -38,8 +39,13 @@ class MonitorNormalisation(BaseFilter):
 
         counts_val = counts.value / counts.value[0]
         do_division = ps.create_partial(_divide_by_counts, fwd_function=ps.inplace2)
-        ps.shared_list = [images.data, counts_val]
-        ps.execute(do_division, images.num_projections, progress, cores=cores)
+        ps.execute(do_division,
+                   images.num_projections,
+                   progress,
+                   cores=cores,
+                   batched=True,
+                   shared_list=[images.data, counts_val],
+                   backend=ps.Backend.THREADS)
         return images
 
     @staticmethod
@@ -3,6 +3,7 @@
 
 import operator
 from functools import partial
+from typing import Any, Dict
 
 import numpy as np
 import scipy.ndimage as scipy_ndimage
@@ -63,13 +64,19 @@ class OutliersFilter(BaseFilter):
         """
         if diff and radius and diff > 0 and radius > 0:
             func = ps.create_partial(OutliersFilter._execute, ps.return_to_self, diff=diff, radius=radius, mode=mode)
-            ps.shared_list = [images.data]
             ps.execute(func,
                        images.num_projections,
                        progress=progress,
-                       msg=f"Outliers with threshold {diff} and kernel {radius}")
+                       msg=f"Outliers with threshold {diff} and kernel {radius}",
+                       shared_list=[images.data],
+                       backend=ps.Backend.THREADS,
+                       guided=True)
         return images
 
+    @staticmethod
+    def calibration_kwargs(images: Images) -> Dict[str, Any]:
+        return {'diff': 1000}
+
     @staticmethod
     def register_gui(form, on_change, view):
         _, diff_field = add_property_to_form('Difference',
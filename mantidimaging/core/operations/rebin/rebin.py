@@ -2,6 +2,8 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 
 from functools import partial
+
+import numpy as np
 import skimage.transform
 
 from mantidimaging import helper as h
@@ -55,12 +57,20 @@ class RebinFilter(BaseFilter):
                                   ps.return_to_second_at_i,
                                   mode=mode,
                                   output_shape=empty_resized_data.shape[1:])
-            ps.shared_list = [sample, empty_resized_data]
-            ps.execute(f, sample.shape[0], cores, "Applying Rebin", progress)
+            ps.execute(f,
+                       sample.shape[0],
+                       progress,
+                       msg="Applying Rebin",
+                       cores=cores,
+                       shared_list=[sample, empty_resized_data])
             images.data = empty_resized_data
 
         return images
 
+    @staticmethod
+    def peak_extra_memory(images: Images, rebin_param=0.5, **kwargs) -> int:
+        return int(np.prod([max(0, dim) for dim in _reshaped_shape(images, rebin_param)])) * images.dtype.itemsize
+
     @staticmethod
     def register_gui(form, on_change, view):
         # Rebin by uniform factor options
@@ -144,8 +154,8 @@ def modes():
     return ["constant", "edge", "wrap", "reflect", "symmetric"]
 
 
-def _create_reshaped_array(images, rebin_param):
-    old_shape = images.data.shape
+def _reshaped_shape(images, rebin_param):
+    old_shape = images.shape
     num_images = old_shape[0]
 
     # use SciPy's calculation to find the expected dimensions
@@ -157,6 +167,9 @@ def _create_reshaped_array(images, rebin_param):
         expected_dimy = int(rebin_param * old_shape[1])
         expected_dimx = int(rebin_param * old_shape[2])
 
+    return num_images, expected_dimy, expected_dimx
+
+
+def _create_reshaped_array(images, rebin_param):
     # allocate memory for images with new dimensions
-    shape = (num_images, expected_dimy, expected_dimx)
-    return pu.create_array(shape, images.dtype)
+    return pu.create_array(_reshaped_shape(images, rebin_param), images.dtype)
@@ -8,6 +8,8 @@ import numpy as np
 import numpy.testing as npt
 
 import mantidimaging.test_helpers.unit_test_helper as th
+from mantidimaging.core.data import Images
+from mantidimaging.core.data.lazy_stack import LazyStack
 from mantidimaging.core.operations.rebin import RebinFilter
 from mantidimaging.core.utility.memory_usage import get_memory_usage_linux
 
@@ -165,6 +167,19 @@ class RebinTest(unittest.TestCase):
         self.assertEqual(factor.value.call_count, 1)
         self.assertEqual(mode_field.currentText.call_count, 1)
 
+    def test_peak_extra_memory_is_rebinned_size(self):
+        images = th.generate_images((10, 20, 40))
+
+        self.assertEqual(RebinFilter.peak_extra_memory(images, rebin_param=0.5), 10 * 10 * 20 * 4)
+        self.assertEqual(RebinFilter.peak_extra_memory(images, rebin_param=(5, 6)), 10 * 5 * 6 * 4)
+
+    def test_peak_extra_memory_does_not_load_lazy_stack(self):
+        load_func = mock.Mock()
+        images = Images(LazyStack([f"image_{i}.tif" for i in range(10)], load_func, (20, 40), np.float32))
+
+        self.assertEqual(RebinFilter.peak_extra_memory(images, rebin_param=0.5), 10 * 10 * 20 * 4)
+        load_func.assert_not_called()
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -31,8 +31,7 @@ class RemoveAllStripesFilter(BaseFilter):
     @staticmethod
     def filter_func(images: Images, snr=3, la_size=61, sm_size=21, dim=1, cores=None, chunksize=None, progress=None):
         f = ps.create_partial(remove_all_stripe, ps.return_to_self, snr=snr, la_size=la_size, sm_size=sm_size, dim=dim)
-        ps.shared_list = [images.data]
-        ps.execute(f, images.num_projections, progress, cores=cores)
+        ps.execute(f, images.num_projections, progress, cores=cores, shared_list=[images.data], guided=True)
         return images
 
     @staticmethod
@@ -36,8 +36,7 @@ class RemoveDeadStripesFilter(BaseFilter):
             snr=snr,
             size=size,
         )
-        ps.shared_list = [images.data]
-        ps.execute(f, images.num_projections, progress, cores=cores)
+        ps.execute(f, images.num_projections, progress, cores=cores, shared_list=[images.data], guided=True)
         return images
 
     @staticmethod
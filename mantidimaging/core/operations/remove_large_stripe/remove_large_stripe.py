@@ -35,8 +35,7 @@ class RemoveLargeStripesFilter(BaseFilter):
             snr=snr,
             size=la_size,
         )
-        ps.shared_list = [images.data]
-        ps.execute(f, images.num_projections, progress, cores=cores)
+        ps.execute(f, images.num_projections, progress, cores=cores, shared_list=[images.data], guided=True)
         return images
 
     @staticmethod
@@ -36,8 +36,7 @@ class RemoveStripeSortingFittingFilter(BaseFilter):
                               sigmax=sigmax,
                               sigmay=sigmay)
 
-        ps.shared_list = [images.data]
-        ps.execute(f, images.num_projections, progress, cores=cores)
+        ps.execute(f, images.num_projections, progress, cores=cores, shared_list=[images.data])
         return images
 
     @staticmethod
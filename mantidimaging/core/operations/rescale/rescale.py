@@ -47,6 +47,13 @@ class RescaleFilter(BaseFilter):
 
         return images
 
+    @staticmethod
+    def peak_extra_memory(images: Images, data_type=None, **kwargs) -> int:
+        # converting to another type makes a copy of the data
+        if data_type is None or images.dtype == data_type:
+            return 0
+        return int(np.prod(images.shape)) * np.dtype(data_type).itemsize
+
     @staticmethod
     def filter_single_image(image: ndarray, min_input: float, max_input: float, max_output: float, data_type=float32):
         np.clip(image, min_input, max_input, out=image)
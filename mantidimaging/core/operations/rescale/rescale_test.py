@@ -2,11 +2,15 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 
 import math
+from unittest import mock
+
 import numpy as np
 import pytest
 from numpy import testing as npt, int16, uint16, float32, finfo, copy
 
 import mantidimaging.test_helpers.unit_test_helper as th
+from mantidimaging.core.data import Images
+from mantidimaging.core.data.lazy_stack import LazyStack
 from mantidimaging.core.operations.rescale import RescaleFilter
 from mantidimaging.test_helpers.qt_mocks import MockQSpinBox, MockQComboBox
 
@@ -133,6 +137,14 @@ def test_rescale_ignores_nans(value):
     assert all([math.isnan(x) for x in images.data[6][0:10].flatten()])
 
 
+def test_peak_extra_memory_does_not_load_lazy_stack():
+    load_func = mock.Mock()
+    images = Images(LazyStack([f"image_{i}.tif" for i in range(10)], load_func, (20, 40), float32))
+
+    assert RescaleFilter.peak_extra_memory(images, data_type=uint16) == 10 * 20 * 40 * 2
+    load_func.assert_not_called()
+
+
 if __name__ == "__main__":
     import pytest
 
@@ -3,6 +3,7 @@
 
 from functools import partial
 from logging import getLogger
+from typing import Any, Dict
 
 import numpy as np
 
@@ -56,19 +57,24 @@ class RoiNormalisationFilter(BaseFilter):
 
         # just get data reference
         if region_of_interest:
-            initial_image_max = images.data.max()
+            initial_image_max = images.statistics.max
 
             progress = Progress.ensure_instance(progress, task_name='ROI Normalisation')
             _execute(images.data, region_of_interest, cores, chunksize, progress)
+            images.mark_changed()
             progress.update(1, "Rescaling to input value range")
             images = RescaleFilter.filter_func(images,
-                                               min_input=images.data.min(),
-                                               max_input=images.data.max(),
+                                               min_input=images.statistics.min,
+                                               max_input=images.statistics.max,
                                                max_output=initial_image_max,
                                                progress=progress)
         h.check_data_stack(images)
         return images
 
+    @staticmethod
+    def calibration_kwargs(images: Images) -> Dict[str, Any]:
+        return {'region_of_interest': SensibleROI.from_list([0, 0, images.width // 4, images.height // 4])}
+
     @staticmethod
     def register_gui(form, on_change, view):
         label, roi_field = add_property_to_form("ROI",
@@ -97,11 +103,12 @@ class RoiNormalisationFilter(BaseFilter):
 
 
 def _calc_sum(data, air_left=None, air_top=None, air_right=None, air_bottom=None):
-    return data[air_top:air_bottom, air_left:air_right].mean()
+    # data is a block of images, the mean is calculated for each one
+    return data[:, air_top:air_bottom, air_left:air_right].mean(axis=(1, 2))
 
 
 def _divide_by_air_sum(data=None, air_sums=None):
-    data[:] = np.true_divide(data, air_sums)
+    np.true_divide(data, air_sums[:, np.newaxis, np.newaxis], out=data)
 
 
 def _execute(data: np.ndarray, air_region: SensibleROI, cores=None, chunksize=None, progress=None):
@@ -123,12 +130,22 @@ def _execute(data: np.ndarray, air_region: SensibleROI, cores=None, chunksize=No
                                                   air_right=air_region.right,
                                                   air_bottom=air_region.bottom)
 
-        ps.shared_list = [data, air_sums]
-        ps.execute(do_calculate_air_sums, data.shape[0], progress, cores=cores)
+        ps.execute(do_calculate_air_sums,
+                   data.shape[0],
+                   progress,
+                   cores=cores,
+                   batched=True,
+                   shared_list=[data, air_sums],
+                   backend=ps.Backend.THREADS)
 
         do_divide = ps.create_partial(_divide_by_air_sum, fwd_function=ps.inplace2)
-        ps.shared_list = [data, air_sums]
-        ps.execute(do_divide, data.shape[0], progress, cores=cores)
+        ps.execute(do_divide,
+                   data.shape[0],
+                   progress,
+                   cores=cores,
+                   batched=True,
+                   shared_list=[data, air_sums],
+                   backend=ps.Backend.THREADS)
 
         avg = np.average(air_sums)
         max_avg = np.max(air_sums) / avg
@@ -2,6 +2,7 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 
 from functools import partial
+from typing import Any, Dict
 import numpy as np
 
 from skimage.transform import rotate
@@ -46,6 +47,10 @@ class RotateFilter(BaseFilter):
 
         return data
 
+    @staticmethod
+    def calibration_kwargs(images: Images) -> Dict[str, Any]:
+        return {'angle': 30}
+
     @staticmethod
     def register_gui(form, on_change, view):
         from mantidimaging.gui.utility import add_property_to_form
@@ -74,7 +79,6 @@ def _execute(data: np.ndarray, angle: float, cores: int, chunksize: int, progres
 
     with progress:
         f = ps.create_partial(_rotate_image_inplace, ps.inplace1, angle=angle)
-        ps.shared_list = [data]
-        ps.execute(f, data.shape[0], progress, msg=f"Rotating by {angle} degrees", cores=cores)
+        ps.execute(f, data.shape[0], progress, msg=f"Rotating by {angle} degrees", cores=cores, shared_list=[data])
 
     return data
@@ -0,0 +1,235 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+"""
+Pool allocator for the shared memory behind the arrays made by `utility.create_array`.
+
+Once an array is garbage collected, its shared memory block is kept for the next array that needs
+a block of the same size, instead of being unlinked. This saves allocating and faulting in a new
+block of several GB each time a filter makes a new stack. Block sizes are rounded up to one of
+eight sizes between consecutive powers of two, so that similar sizes share blocks while wasting at
+most an eighth of the memory.
+
+The code that owns an array can `release` it once it is done with it, e.g. when its stack is closed.
+Code that takes the array as well, e.g. copies of a stack that read from it, has to `retain` it first.
+The block is then reused as soon as the last reference to the array goes away. Arrays that were
+released, but are still referenced from somewhere, are listed by `leak_report`.
+"""
+
+import atexit
+import gc
+import os
+import threading
+import traceback
+import weakref
+from collections import namedtuple
+from logging import getLogger
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+LOG = getLogger(__name__)
+
+# Upper limit of the memory kept in unused blocks, as a fraction of the physical memory
+MAX_POOLED_FRACTION = 0.25
+
+# Number of block sizes between consecutive powers of two
+SIZE_CLASSES_PER_POWER = 8
+
+LiveArray = namedtuple('LiveArray', ['name', 'shape', 'dtype', 'nbytes', 'created_at', 'refs'])
+
+
+class _Block:
+    def __init__(self, shared_memory: SharedMemory, address: int, shape, dtype: np.dtype, created_at: str):
+        self.shared_memory = shared_memory
+        self.address = address
+        self.shape = shape
+        self.dtype = dtype
+        self.created_at = created_at
+        # Number of owners that have not released the array yet
+        self.refs = 1
+
+
+# Blocks backing arrays that are still alive, keyed by name
+_live: Dict[str, _Block] = {}
+# Unused blocks, keyed by their size
+_pooled: Dict[int, List[SharedMemory]] = {}
+_lock = threading.RLock()
+# Set once the interpreter is exiting, after which blocks are freed instead of kept
+_exiting = False
+
+
+def block_size(size: int) -> int:
+    """
+    Rounds the size up to the next block size.
+    """
+    # shared memory cannot be empty, so an empty array still takes a byte
+    size = max(size, 1)
+    if size <= SIZE_CLASSES_PER_POWER:
+        return size
+    step = 2**max(0, (size - 1).bit_length() - 1) // SIZE_CLASSES_PER_POWER
+    return -(-size // step) * step
+
+
+def max_pooled_bytes() -> int:
+    return int(os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') * MAX_POOLED_FRACTION)
+
+
+def pooled_bytes() -> int:
+    """
+    :return: The memory held in unused blocks
+    """
+    with _lock:
+        return sum(size * len(blocks) for size, blocks in _pooled.items())
+
+
+def live_bytes() -> int:
+    """
+    :return: The memory held in blocks of arrays that are still alive
+    """
+    with _lock:
+        return sum(block.shared_memory.size for block in _live.values())
+
+
+def is_pooled(size: int) -> bool:
+    """
+    :return: Whether there is an unused block that an array of this many bytes can reuse
+    """
+    with _lock:
+        return bool(_pooled.get(block_size(size)))
+
+
+def allocate(shape, dtype: np.dtype) -> Tuple[np.ndarray, bool]:
+    """
+    Makes an array in a shared memory block, reusing an unused block of the right size if there is one.
+    New blocks are zeroed by the system, but reused blocks still hold the values of the array they backed before.
+
+    :return: The array, and whether its block was newly allocated
+    """
+    size = int(np.prod(shape)) * dtype.itemsize
+    blocks_size = block_size(size)
+    with _lock:
+        blocks = _pooled.get(blocks_size)
+        shared_memory = blocks.pop() if blocks else None
+    is_new = shared_memory is None
+    if shared_memory is None:
+        shared_memory = SharedMemory(create=True, size=blocks_size)
+
+    data: np.ndarray = np.ndarray(shape, dtype, buffer=shared_memory.buf)
+
+    block = _Block(shared_memory, data.__array_interface__['data'][0], shape, dtype, _caller())
+    with _lock:
+        _live[shared_memory.name] = block
+    weakref.finalize(data, _collected, shared_memory.name)
+    return data, is_new
+
+
+def _caller() -> str:
+    # the first frame outside of core.parallel, which is the code that asked for the array
+    parallel_dir = os.path.dirname(__file__)
+    for frame in reversed(traceback.extract_stack()[:-1]):
+        if os.path.dirname(frame.filename) != parallel_dir:
+            return f"{frame.filename}:{frame.lineno} in {frame.name}"
+    return "unknown"
+
+
+def _collected(name: str):
+    with _lock:
+        block = _live.pop(name)
+        shared_memory = block.shared_memory
+        if not _exiting and pooled_bytes() + shared_memory.size <= max_pooled_bytes():
+            _pooled.setdefault(shared_memory.size, []).append(shared_memory)
+            return
+    _unlink(shared_memory)
+
+
+def _unlink(shared_memory: SharedMemory):
+    shared_memory.close()
+    shared_memory.unlink()
+
+
+def trim(keep_bytes: int = 0):
+    """
+    Frees unused blocks, largest first, until at most `keep_bytes` are left in the pool.
+    """
+    with _lock:
+        for size in sorted(_pooled, reverse=True):
+            blocks = _pooled[size]
+            while blocks and pooled_bytes() > keep_bytes:
+                _unlink(blocks.pop())
+            if not blocks:
+                del _pooled[size]
+
+
+@atexit.register
+def _free_all():
+    global _exiting
+    _exiting = True
+    trim()
+
+
+def find_block(data: np.ndarray) -> Optional[Tuple[str, SharedMemory, int]]:
+    """
+    :return: The name, shared memory and buffer address of the block that the array, or view, is in
+    """
+    data_address = data.__array_interface__['data'][0]
+    with _lock:
+        for name, block in _live.items():
+            if block.address <= data_address < block.address + block.shared_memory.size:
+                return name, block.shared_memory, block.address
+    return None
+
+
+def _find_live_block(data: np.ndarray) -> _Block:
+    found = find_block(data)
+    if found is None:
+        raise ValueError("The array is not in shared memory made by create_array")
+    return _live[found[0]]
+
+
+def retain(data: np.ndarray):
+    """
+    Adds an owner to the array, which will also have to release it. Arrays that are not in shared memory are ignored.
+    """
+    if data is None or find_block(data) is None:
+        return
+    with _lock:
+        _find_live_block(data).refs += 1
+
+
+def release(data: np.ndarray):
+    """
+    Marks that an owner of the array is done with it. Its block is reused as soon as the array is garbage
+    collected, which is only tracked here, as other references to the array might still be in use.
+    Arrays that are not in shared memory are ignored.
+    """
+    if data is None or find_block(data) is None:
+        return
+    with _lock:
+        block = _find_live_block(data)
+        if block.refs <= 0:
+            LOG.warning(f"Array {block.shape} created at {block.created_at} released more times than it was retained")
+        block.refs -= 1
+
+
+def live_arrays() -> List[LiveArray]:
+    with _lock:
+        return [
+            LiveArray(name, block.shape, block.dtype, block.shared_memory.size, block.created_at, block.refs)
+            for name, block in _live.items()
+        ]
+
+
+def leak_report() -> List[LiveArray]:
+    """
+    :return: The arrays that all of their owners have released, but are still referenced from somewhere
+    """
+    return [array for array in live_arrays() if array.refs <= 0]
+
+
+def log_leak_report() -> None:
+    # arrays only referenced from reference cycles are not leaks, they are just waiting for the collector
+    gc.collect()
+    for leak in leak_report():
+        LOG.warning(f"Shared array {leak.shape} {leak.dtype} ({leak.nbytes / 1024**2:.1f} MB) created at "
+                    f"{leak.created_at} is still alive after being released")
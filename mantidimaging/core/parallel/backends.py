@@ -0,0 +1,88 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+"""
+The ways a parallel execution can run its tasks.
+
+Processes suit functions that hold the GIL for most of their work. Threads avoid sending the tasks
+to other processes altogether, and suit functions that spend their time in NumPy or SciPy kernels
+that release the GIL, such as ufuncs and most of `scipy.ndimage`.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from enum import Enum
+from functools import partial
+from multiprocessing.pool import Pool
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence
+
+import numpy as np
+
+from mantidimaging.core.parallel import manager, numa
+
+# Takes the function and the iterable of arguments, and gives back the results in order, like `map`
+Mapper = Callable[[Callable, Iterable], Iterator]
+
+
+class Backend(Enum):
+    PROCESSES = "processes"
+    THREADS = "threads"
+    SERIAL = "serial"
+
+
+DEFAULT_BACKEND = Backend.PROCESSES
+
+# Thread pools are kept for the lifetime of the application, one for each number of threads requested
+_thread_pools: Dict[int, ThreadPoolExecutor] = {}
+_thread_pools_lock = threading.Lock()
+
+
+def _get_thread_pool(threads: int) -> ThreadPoolExecutor:
+    with _thread_pools_lock:
+        if threads not in _thread_pools:
+            _thread_pools[threads] = ThreadPoolExecutor(threads, thread_name_prefix="mantidimaging-parallel")
+        return _thread_pools[threads]
+
+
+@contextmanager
+def mapper(backend: Backend, cores: int, chunksize: int = 1) -> Iterator[Mapper]:
+    """
+    Provides the `map` of the backend, for the duration of an execution.
+
+    :param backend: Where to run the tasks
+    :param cores: Number of processes or threads to run them on
+    :param chunksize: Number of tasks sent to a worker process at once. Only used by Backend.PROCESSES
+    """
+    if backend == Backend.PROCESSES:
+        with manager.acquire(cores) as pool:
+            worker_nodes = manager.worker_nodes()
+            if worker_nodes is not None and len(set(worker_nodes)) > 1:
+                yield partial(_node_local_imap, pool, worker_nodes, chunksize)
+            else:
+                yield partial(pool.imap, chunksize=chunksize)
+    elif backend == Backend.THREADS:
+        yield _get_thread_pool(cores).map
+    else:
+        yield map
+
+
+def _node_local_imap(pool: Pool, worker_nodes: List[int], chunksize: int, func: Callable, items: Sequence) -> Iterator:
+    """
+    Like `pool.imap`, but each worker processes the items from its own NUMA node's block first, see numa.NodeLocalTask.
+    The items must be a picklable sequence, like a range, as every task is sent all of them.
+    """
+    # imported here, as utility uses this module
+    from mantidimaging.core.parallel.utility import create_array, get_descriptor
+
+    workers_per_node = [worker_nodes.count(node) for node in range(max(worker_nodes) + 1)]
+    claims = create_array((len(workers_per_node), 2), np.int64)
+    claims[:] = numa.node_blocks(len(items), workers_per_node)
+    task = numa.NodeLocalTask(func, items, get_descriptor(claims))
+
+    finished = {}
+    next_item = 0
+    for item, result in pool.imap(task, range(len(items)), chunksize=chunksize):
+        finished[item] = result
+        while next_item in finished:
+            yield finished.pop(next_item)
+            next_item += 1
@@ -0,0 +1,172 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+"""
+Process-wide budget for the memory of the shared arrays.
+
+Every array made by `utility.create_array` counts against the budget while it is alive, and is refused
+if it would go over it. Operations that need memory beyond their input, e.g. a second full size array
+for their output, reserve it before they start with `reserve`. An operation that does not fit waits
+for others to finish, or is refused, before it has allocated anything, instead of running out of memory
+part of the way through. The arrays that an operation allocates while it is running are taken out
+of its own reservation.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from logging import getLogger
+from typing import Iterator, List, Optional
+
+from mantidimaging.core.parallel import allocator
+from mantidimaging.core.utility.memory_usage import MEMORY_BUDGET_FRACTION, NotEnoughMemory, system_total_memory
+
+LOG = getLogger(__name__)
+
+# How often waiting reservations check if memory has been freed, as arrays are freed by the garbage collector
+WAIT_POLL_SECONDS = 0.1
+
+# The budget in bytes, or None to use MEMORY_BUDGET_FRACTION of the physical memory
+_budget: Optional[int] = None
+# Reserved memory that has not been allocated yet, and allocations that are in progress
+_reserved = 0
+_pending = 0
+_lock = threading.RLock()
+_freed = threading.Condition(_lock)
+
+
+class MemoryBudgetExceeded(NotEnoughMemory):
+    pass
+
+
+class Reservation:
+    def __init__(self, nbytes: int, description: str):
+        self.nbytes = nbytes
+        self.description = description
+        # Reserved memory that the operation has not allocated yet
+        self.remaining = nbytes
+
+
+class _Reservations(threading.local):
+    # The reservations of the operations running in this thread, innermost last
+    active: List[Reservation]
+
+    def __init__(self):
+        self.active = []
+
+
+_reservations = _Reservations()
+
+
+def set_budget(nbytes: Optional[int]):
+    """
+    :param nbytes: The budget in bytes, or None to go back to the default fraction of the physical memory
+    """
+    global _budget
+    with _lock:
+        _budget = nbytes
+        _freed.notify_all()
+
+
+def get_budget() -> int:
+    if _budget is not None:
+        return _budget
+    return int(system_total_memory() * MEMORY_BUDGET_FRACTION)
+
+
+def used_bytes() -> int:
+    """
+    :return: The memory of the live shared arrays, and the memory reserved by running operations
+    """
+    with _lock:
+        return allocator.live_bytes() + _reserved + _pending
+
+
+def available_bytes() -> int:
+    return get_budget() - used_bytes()
+
+
+def _fits(nbytes: int) -> bool:
+    return nbytes <= available_bytes()
+
+
+def _wait_to_fit(nbytes: int, timeout: Optional[float], description: str):
+    # must be called with the lock held
+    deadline = None if timeout is None else time.monotonic() + timeout
+    waiting = False
+    while not _fits(nbytes):
+        left = None if deadline is None else deadline - time.monotonic()
+        if left is not None and left <= 0:
+            raise MemoryBudgetExceeded(f"{description} needs {_mb(nbytes)} MB, but only {_mb(available_bytes())} MB "
+                                       f"of the {_mb(get_budget())} MB memory budget is available. "
+                                       f"Closing stacks that are not needed will free up memory.")
+        if not waiting:
+            LOG.info(f"{description} is waiting for {_mb(nbytes)} MB of the memory budget to be freed")
+            waiting = True
+        _freed.wait(WAIT_POLL_SECONDS if left is None else min(WAIT_POLL_SECONDS, left))
+
+
+def _mb(nbytes: int) -> int:
+    return nbytes // 1024**2
+
+
+@contextmanager
+def reserve(nbytes: int,
+            description: str = "The operation",
+            timeout: Optional[float] = 0,
+            required: bool = True) -> Iterator[Reservation]:
+    """
+    Reserves memory for an operation while it runs. The shared arrays it allocates in this thread are
+    taken out of the reservation first, and anything left over is given back once it finishes.
+
+    :param nbytes: The peak memory the operation needs on top of its input
+    :param description: What the memory is for, used in the error message
+    :param timeout: How long to wait for other operations to free up memory. 0 refuses straight away,
+                    None waits for as long as it takes.
+    :param required: Whether to refuse the operation if the memory could not be reserved. Otherwise it runs
+                     without a reservation, e.g. when its arrays can be made in scratch files instead.
+    :raises MemoryBudgetExceeded: If the memory could not be reserved in time
+    """
+    global _reserved
+    with _lock:
+        try:
+            _wait_to_fit(nbytes, timeout, description)
+        except MemoryBudgetExceeded as e:
+            if required:
+                raise
+            LOG.warning(f"{e} Running without a reservation.")
+            nbytes = 0
+        _reserved += nbytes
+    reservation = Reservation(nbytes, description)
+    _reservations.active.append(reservation)
+    try:
+        yield reservation
+    finally:
+        _reservations.active.remove(reservation)
+        with _lock:
+            _reserved -= reservation.remaining
+            _freed.notify_all()
+
+
+@contextmanager
+def allocation(nbytes: int) -> Iterator[None]:
+    """
+    Admits a new shared array, taking it out of the reservation of the running operation where possible.
+
+    :raises MemoryBudgetExceeded: If the array would go over the budget
+    """
+    global _reserved, _pending
+    with _lock:
+        needed = nbytes
+        if _reservations.active:
+            reservation = _reservations.active[-1]
+            taken = min(nbytes, reservation.remaining)
+            reservation.remaining -= taken
+            _reserved -= taken
+            needed -= taken
+        _wait_to_fit(needed, 0, "The new array")
+        _pending += nbytes
+    try:
+        yield
+    finally:
+        with _lock:
+            _pending -= nbytes
@@ -0,0 +1,209 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+"""
+Benchmarks the parallel execution of the operations on this machine, and picks the backend and number
+of cores that processed synthetic data the fastest for each of them.
+
+More cores are not always faster, e.g. operations limited by memory bandwidth can slow down when they
+are spread over both sockets of a machine. The choices are saved to a profile in the home directory,
+one for each machine, and are used by `shared.execute` whenever it is not given a number of cores.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from functools import partial
+from logging import getLogger
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from mantidimaging.core.parallel import manager, utility as pu
+from mantidimaging.core.parallel.backends import Backend
+
+LOG = getLogger(__name__)
+
+PROFILE_DIR = os.path.join(os.path.expanduser("~"), ".mantidimaging")
+# Shape of the synthetic data the operations are benchmarked on
+CALIBRATION_SHAPE = (64, 512, 512)
+# Each choice is timed this many times and the fastest is kept, to leave out one-off costs
+CALIBRATION_REPEATS = 2
+
+Choice = namedtuple('Choice', ['backend', 'cores'])
+
+_profile: Optional[Dict[str, Choice]] = None
+
+
+class _Calibration(threading.local):
+    # The choice being benchmarked in this thread, and the functions that were executed with it
+    forced: Optional[Choice] = None
+    executed: Set[str] = set()
+
+
+_calibration = _Calibration()
+
+
+def profile_path() -> str:
+    # the home directory can be shared between machines, so the profile is named after this one
+    return os.path.join(PROFILE_DIR, f"parallel_profile_{socket.gethostname()}.json")
+
+
+def function_key(partial_func: Callable) -> str:
+    """
+    Identifies the function run by an execution, e.g. `scipy.ndimage._filters.median_filter`.
+
+    :param partial_func: The function given to `shared.execute`, constructed using `shared.create_partial`
+    """
+    func = partial_func.args[0] if isinstance(partial_func, partial) and partial_func.args else partial_func
+    return f"{getattr(func, '__module__', '')}.{getattr(func, '__qualname__', type(func).__name__)}"
+
+
+def load_profile(path: Optional[str] = None) -> Dict[str, Choice]:
+    """
+    Reads the choices from a profile. Profiles that cannot be read, or were made
+    for a different number of CPUs, are ignored.
+    """
+    path = path if path is not None else profile_path()
+    try:
+        with open(path) as f:
+            contents = json.load(f)
+        if contents["cpu_count"] != pu.get_cores():
+            LOG.warning(f"Ignoring parallel profile {path}, it was calibrated for {contents['cpu_count']} CPUs")
+            return {}
+        return {key: Choice(Backend(choice["backend"]), choice["cores"]) for key, choice in contents["choices"].items()}
+    except FileNotFoundError:
+        return {}
+    except (ValueError, KeyError, TypeError) as e:
+        LOG.warning(f"Ignoring parallel profile {path} that could not be read: {e}")
+        return {}
+
+
+def save_profile(choices: Dict[str, Choice], path: Optional[str] = None):
+    path = path if path is not None else profile_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    saved_choices = {key: {"backend": choice.backend.value, "cores": choice.cores} for key, choice in choices.items()}
+    contents = {"cpu_count": pu.get_cores(), "choices": saved_choices}
+    with open(path, 'w') as f:
+        json.dump(contents, f, indent=2)
+
+
+def get_profile() -> Dict[str, Choice]:
+    global _profile
+    if _profile is None:
+        _profile = load_profile()
+    return _profile
+
+
+def choose(partial_func: Callable, backend: Backend, cores: Optional[int]) -> Tuple[Backend, int]:
+    """
+    Picks how an execution will run. A number of cores given by the caller is always used as it is.
+    Otherwise the choice from the profile is used, falling back to the given backend on all cores.
+
+    :param partial_func: The function given to `shared.execute`
+    :param backend: The backend preferred by the caller
+    :param cores: The number of cores requested by the caller, if any
+    """
+    if _calibration.forced is not None:
+        _calibration.executed.add(function_key(partial_func))
+        return _calibration.forced
+    if cores:
+        return backend, cores
+    choice = get_profile().get(function_key(partial_func))
+    if choice is not None:
+        return choice.backend, choice.cores
+    return backend, pu.get_cores()
+
+
+@contextmanager
+def _forced(choice: Choice) -> Iterator[Set[str]]:
+    _calibration.forced = choice
+    _calibration.executed = set()
+    try:
+        yield _calibration.executed
+    finally:
+        _calibration.forced = None
+
+
+def candidate_choices(max_cores: int) -> List[Choice]:
+    """
+    Serial, and then both processes and threads on powers of two cores, up to and including all of them.
+    """
+    core_counts = sorted({2**power for power in range(1, max_cores.bit_length()) if 2**power < max_cores} | {max_cores})
+    return [Choice(Backend.SERIAL, 1)] + [
+        Choice(backend, cores) for cores in core_counts if cores > 1 for backend in (Backend.PROCESSES, Backend.THREADS)
+    ]
+
+
+def calibrate(filters=None,
+              shape: Tuple[int, int, int] = CALIBRATION_SHAPE,
+              choices: Optional[List[Choice]] = None,
+              save: bool = True) -> Dict[str, Choice]:
+    """
+    Benchmarks every filter on synthetic data with each of the choices, and keeps the fastest.
+
+    :param filters: The filter classes to calibrate, all of those from `load_filter_packages` by default
+    :param shape: Shape of the synthetic data
+    :param choices: The backends and number of cores to try, see `candidate_choices`
+    :param save: Add the results to the profile of this machine, replacing any previous choice for the same function
+    :return: The fastest choice for each function that the filters executed in parallel
+    """
+    global _profile
+    if filters is None:
+        from mantidimaging.core.operations.loader import load_filter_packages
+        filters = load_filter_packages()
+    if choices is None:
+        choices = candidate_choices(pu.get_cores())
+
+    results: Dict[str, Choice] = {}
+    for filter_class in filters:
+        try:
+            results.update(_calibrate_filter(filter_class, shape, choices))
+        except Exception:
+            LOG.exception(f"Could not calibrate '{filter_class.filter_name}', skipping it")
+
+    if save:
+        profile = dict(get_profile())
+        profile.update(results)
+        save_profile(profile)
+        _profile = profile
+        LOG.info(f"Saved parallel profile to {profile_path()}")
+    return results
+
+
+def _calibrate_filter(filter_class, shape: Tuple[int, int, int], choices: List[Choice]) -> Dict[str, Choice]:
+    from mantidimaging.core.data import Images
+
+    executed: Set[str] = set()
+    timings: List[Tuple[float, Choice]] = []
+    for choice in choices:
+        if choice.backend == Backend.PROCESSES:
+            # leave starting the pool out of the timing
+            manager.start(choice.cores)
+        fastest = float("inf")
+        for _ in range(CALIBRATION_REPEATS):
+            images = Images(_synthetic_data(shape))
+            kwargs = filter_class.calibration_kwargs(images)
+            with _forced(choice) as executed_with_choice:
+                start_time = time.perf_counter()
+                filter_class.filter_func(images, **kwargs)
+                fastest = min(fastest, time.perf_counter() - start_time)
+            executed |= executed_with_choice
+        if not executed:
+            LOG.info(f"'{filter_class.filter_name}' does not run in parallel, skipping it")
+            return {}
+        timings.append((fastest, choice))
+
+    _, best = min(timings, key=lambda timing: timing[0])
+    LOG.info(f"'{filter_class.filter_name}' is fastest with {best.backend.value} on {best.cores} cores, timings: " +
+             ", ".join(f"{choice.backend.value} {choice.cores}c {seconds:.3f}s" for seconds, choice in timings))
+    return {key: best for key in executed}
+
+
+def _synthetic_data(shape: Tuple[int, int, int]) -> np.ndarray:
+    data = pu.create_array(shape)
+    data[:] = np.random.default_rng(0).random(shape, dtype=np.float32) * 1000
+    return data
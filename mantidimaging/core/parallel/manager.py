@@ -0,0 +1,211 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+"""
+Owns the long-lived worker pool used by every parallel execution.
+
+The pool is started lazily on the first parallel execution and then reused, instead of forking
+a new set of processes for every call of `shared.execute`. By default the workers are started through
+a forkserver, so they do not inherit (and keep mapped) the memory of the main process at the time
+they were created. The data they work on is sent along with each task, with the shared arrays being
+attached by name, see `shared.ExecutionContext`. This works with any start method.
+
+Several executions, e.g. from different threads, can use the pool at the same time.
+It is only restarted or resized once none of them is using it anymore.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from contextlib import contextmanager
+from logging import getLogger
+from multiprocessing.pool import Pool, RUN  # type: ignore
+from typing import Iterator, List, Optional
+
+from mantidimaging.core.parallel import numa
+
+LOG = getLogger(__name__)
+
+# How long, in seconds, an idle pool is given to respond before it is considered unhealthy
+HEALTH_CHECK_TIMEOUT = 5
+
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+_pool: Optional[Pool] = None
+_pool_cores = 0
+# The NUMA node of each worker, if they are pinned
+_pool_nodes: Optional[List[int]] = None
+# Number of executions currently using the pool, see `acquire`
+_pool_users = 0
+# Guards the pool state. The pool is only replaced once it has no users, which is signalled through the condition
+_lock = threading.RLock()
+_pool_released = threading.Condition(_lock)
+
+
+def start(cores: int) -> Pool:
+    """
+    Starts the worker pool with the given number of processes, unless it is already running with that many.
+    If the pool has to be restarted, this waits until no execution is using it.
+
+    :param cores: Number of worker processes
+    :return: The running pool
+    """
+    global _pool, _pool_cores, _pool_nodes
+    with _lock:
+        if _pool is not None:
+            _wait_until_unused()
+            healthy = _responds(_pool)
+            if healthy and _pool_cores == cores:
+                return _pool
+            _stop(_pool, terminate=True, healthy=healthy)
+
+        LOG.info(f"Starting worker pool with {cores} processes using '{START_METHOD}'")
+        context = multiprocessing.get_context(START_METHOD)
+        if START_METHOD == "forkserver":
+            context.set_forkserver_preload(["mantidimaging.core.parallel.shared"])
+        if numa.is_numa_aware():
+            placements = numa.worker_placements(cores)
+            LOG.info(f"Pinning workers to CPUs {[cpus for _, cpus in placements]}")
+            _pool = context.Pool(cores,
+                                 initializer=numa.initialise_worker,
+                                 initargs=(placements, context.Value('i', 0), context.Lock()))
+            _pool_nodes = [node for node, _ in placements]
+        else:
+            _pool = context.Pool(cores)
+            _pool_nodes = None
+        _pool_cores = cores
+        return _pool
+
+
+def set_start_method(method: str):
+    """
+    Sets how the worker processes are started: 'fork', 'forkserver' or 'spawn'.
+    A running pool is shut down, and the next execution will start a new one with this method.
+    """
+    global START_METHOD
+    if method not in multiprocessing.get_all_start_methods():
+        raise ValueError(f"Start method '{method}' is not available on this platform")
+    with _lock:
+        shutdown()
+        START_METHOD = method
+
+
+def resize(cores: int) -> Pool:
+    """
+    Restarts the pool with a different number of processes. Does nothing if the size already matches.
+    """
+    return start(cores)
+
+
+def shutdown(terminate: bool = False):
+    """
+    Stops the worker pool. It will be started again on the next parallel execution.
+
+    :param terminate: Kill the workers immediately, instead of waiting for any outstanding work to finish.
+                      Without it, this also waits for the executions that are currently using the pool.
+    """
+    with _lock:
+        if _pool is None:
+            return
+        if not terminate:
+            _wait_until_unused()
+        _stop(_pool, terminate, healthy=not terminate or _responds(_pool))
+
+
+def _wait_until_unused():
+    while _pool_users > 0:
+        _pool_released.wait()
+
+
+def _stop(pool: Pool, terminate: bool, healthy: bool):
+    global _pool, _pool_cores, _pool_nodes
+    LOG.info("Shutting down worker pool")
+    if terminate:
+        if not healthy:
+            _unblock_task_queue(pool)
+        pool.terminate()
+    else:
+        pool.close()
+    pool.join()
+    _pool = None
+    _pool_cores = 0
+    _pool_nodes = None
+
+
+def is_running() -> bool:
+    return _pool is not None
+
+
+def size() -> int:
+    """
+    :return: The number of worker processes in the pool, or 0 if it is not running
+    """
+    return _pool_cores
+
+
+def worker_nodes() -> Optional[List[int]]:
+    """
+    :return: The NUMA node that each worker is pinned to, or None if they are not pinned
+    """
+    return _pool_nodes
+
+
+def is_healthy() -> bool:
+    """
+    Checks that the pool is running, all of its worker processes are alive, and that it can
+    still complete a task. This waits behind the tasks of any execution that is currently using the pool.
+
+    :return: Whether the pool is healthy
+    """
+    with _lock:
+        return _pool is not None and _responds(_pool)
+
+
+def _responds(pool: Pool) -> bool:
+    if pool._state != RUN or not all(process.is_alive() for process in pool._pool):  # type: ignore
+        return False
+    try:
+        pool.apply_async(os.getpid).get(HEALTH_CHECK_TIMEOUT)
+    except multiprocessing.TimeoutError:
+        LOG.warning("Worker pool did not respond to the health check")
+        return False
+    return True
+
+
+def _unblock_task_queue(pool: Pool):
+    """
+    A worker that dies while waiting for a task never releases the lock of the task queue.
+    This blocks the pool from getting any more work done, and blocks Pool.terminate forever.
+    """
+    queue_lock = pool._inqueue._rlock  # type: ignore
+    # Releases either the lock taken here, or the one left held by the dead worker
+    queue_lock.acquire(timeout=0.1)
+    queue_lock.release()
+
+
+@contextmanager
+def acquire(cores: int) -> Iterator[Pool]:
+    """
+    Provides the running pool for the duration of an execution. It will not be restarted or resized
+    in the meantime, so if it is already in use with a different number of processes, it is shared as it is.
+
+    :param cores: Number of worker processes, if the pool has to be started
+    """
+    global _pool_users
+    with _lock:
+        if _pool is not None and _pool_users > 0:
+            pool = _pool
+            if _pool_cores != cores:
+                LOG.info(f"Worker pool is in use, running on its {_pool_cores} processes instead of {cores}")
+        else:
+            pool = start(cores)
+        _pool_users += 1
+    try:
+        yield pool
+    finally:
+        with _lock:
+            _pool_users -= 1
+            _pool_released.notify_all()
+
+
+atexit.register(shutdown, terminate=True)
@@ -0,0 +1,184 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+"""
+NUMA awareness for the worker processes, on machines with more than one memory node (e.g. two sockets).
+
+- Each worker is pinned to a CPU, with the workers spread evenly over the nodes.
+- The images of an execution are split into one contiguous block per node, in proportion to the number
+  of workers on it. A worker processes the images of its own node's block first, and only then helps
+  with the blocks of the other nodes, see `NodeLocalTask`.
+- New shared arrays can be zeroed by the workers with the same split, see `first_touch`. As memory is
+  placed on the node of the process that first touches it, each block then lives on the node that will process it.
+
+This uses the Linux affinity API in `os`, and does nothing on machines with a single node.
+"""
+
+import glob
+import os
+import re
+from logging import getLogger
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+LOG = getLogger(__name__)
+
+# Set to False to leave the placement of the workers to the operating system
+NUMA_AWARE = True
+
+NODE_DIR = "/sys/devices/system/node"
+
+# The node and CPUs that a worker is pinned to
+Placement = Tuple[int, List[int]]
+
+# Set in each worker by `initialise_worker`
+_worker_node: Optional[int] = None
+_claim_lock: Any = None
+# The claims array of the execution running in this worker, attached on its first task, see `NodeLocalTask`
+_attached_claims: Tuple[Any, Optional[np.ndarray]] = (None, None)
+
+
+def _parse_cpu_list(cpu_list: str) -> List[int]:
+    """
+    Parses the kernel's format for a list of CPUs, e.g. '0-3,8-11'
+    """
+    cpus: List[int] = []
+    for part in cpu_list.strip().split(","):
+        if "-" in part:
+            first, last = part.split("-")
+            cpus.extend(range(int(first), int(last) + 1))
+        elif part:
+            cpus.append(int(part))
+    return cpus
+
+
+def get_nodes() -> List[List[int]]:
+    """
+    :return: The CPUs of each NUMA node that this process is allowed to run on.
+             A single node with all of them if the topology is not available.
+    """
+    allowed = os.sched_getaffinity(0) if hasattr(os, "sched_getaffinity") else set(range(os.cpu_count() or 1))
+    nodes = []
+    node_paths = glob.glob(os.path.join(NODE_DIR, "node[0-9]*"))
+    for path in sorted(node_paths, key=lambda p: int(re.sub(r"\D", "", os.path.basename(p)))):
+        try:
+            with open(os.path.join(path, "cpulist")) as f:
+                cpus = [cpu for cpu in _parse_cpu_list(f.read()) if cpu in allowed]
+        except (OSError, ValueError):
+            continue
+        if cpus:
+            nodes.append(cpus)
+    return nodes or [sorted(allowed)]
+
+
+def is_numa_aware() -> bool:
+    return NUMA_AWARE and hasattr(os, "sched_setaffinity") and len(get_nodes()) > 1
+
+
+def worker_placements(workers: int) -> List[Placement]:
+    """
+    Pins each worker to its own CPU, alternating between the nodes so that every node is used
+    even when there are fewer workers than CPUs.
+    """
+    nodes = get_nodes()
+    placements = []
+    for worker in range(workers):
+        node = worker % len(nodes)
+        cpus = nodes[node]
+        placements.append((node, [cpus[(worker // len(nodes)) % len(cpus)]]))
+    return placements
+
+
+def initialise_worker(placements: List[Placement], started_workers, claim_lock):
+    """
+    Pool initializer that pins the worker. Workers that replace dead ones continue around the placements.
+
+    :param placements: From `worker_placements`
+    :param started_workers: Shared counter of the workers started so far, to give each one a placement
+    :param claim_lock: Lock used by all the workers to claim images, see `NodeLocalTask`
+    """
+    global _worker_node, _claim_lock
+    with started_workers.get_lock():
+        worker = started_workers.value
+        started_workers.value += 1
+    _worker_node, cpus = placements[worker % len(placements)]
+    _claim_lock = claim_lock
+    try:
+        os.sched_setaffinity(0, cpus)
+    except OSError as e:
+        LOG.warning(f"Could not pin worker to CPUs {cpus}: {e}")
+
+
+def node_blocks(num_items: int, workers_per_node: Sequence[int]) -> np.ndarray:
+    """
+    Splits the items into contiguous blocks, one per node, in proportion to the number of workers on each.
+
+    :return: The [start, stop] of each node's block
+    """
+    bounds = np.round(np.cumsum([0] + list(workers_per_node)) / sum(workers_per_node) * num_items).astype(np.int64)
+    return np.stack([bounds[:-1], bounds[1:]], axis=1)
+
+
+class NodeLocalTask:
+    """
+    Picklable task that ignores the index it is given by the pool. Instead, it claims the next item
+    from the block of the worker's node, or from the block of another node once its own is done.
+    Sending one of these per item still processes every item exactly once.
+
+    Returns the index of the item it processed along with the result, as the pool gives back the
+    results in the order the tasks were sent, which is not the order the items were processed in.
+    """
+    def __init__(self, func: Callable, items: Sequence, claims_descriptor):
+        """
+        :param func: Called with the claimed item
+        :param items: All of the items of the execution, e.g. a range of image indices
+        :param claims_descriptor: Descriptor of the shared [next, stop] array of each node, from `node_blocks`
+        """
+        self.func = func
+        self.items = items
+        self.claims_descriptor = claims_descriptor
+
+    def __call__(self, _):
+        claims = _attach_claims(self.claims_descriptor)
+        own_node = _worker_node if _worker_node is not None else 0
+        with _claim_lock:
+            for node in [own_node] + [node for node in range(len(claims)) if node != own_node]:
+                if claims[node, 0] < claims[node, 1]:
+                    item = int(claims[node, 0])
+                    claims[node, 0] += 1
+                    break
+            else:
+                raise RuntimeError("More tasks were sent than there are items to process")
+        return item, self.func(self.items[item])
+
+
+def _attach_claims(claims_descriptor) -> np.ndarray:
+    global _attached_claims
+    descriptor, claims = _attached_claims
+    if claims is None or descriptor != claims_descriptor:
+        from mantidimaging.core.parallel.utility import attach_array
+
+        claims = attach_array(claims_descriptor, track=True)
+        _attached_claims = (claims_descriptor, claims)
+    return claims
+
+
+def _zero(data):
+    data[:] = 0
+
+
+def first_touch(data: np.ndarray):
+    """
+    Zeroes a new shared array from the workers, so that the memory of each block of images is placed
+    on the node whose workers will process it. Does nothing if the workers are not NUMA aware.
+    """
+    if not is_numa_aware():
+        return
+    from mantidimaging.core.parallel import manager, shared as ps
+    from mantidimaging.core.parallel.backends import Backend
+
+    ps.execute(ps.create_partial(_zero, ps.inplace1),
+               data.shape[0],
+               cores=manager.size() or None,
+               shared_list=[data],
+               backend=Backend.PROCESSES)
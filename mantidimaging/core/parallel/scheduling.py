@@ -0,0 +1,122 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+"""
+Guided scheduling, for functions whose cost varies a lot from image to image.
+
+The images are handed out in chunks that start large, to keep the overhead of sending them low, and
+shrink towards the end of the execution, so that the workers finish at about the same time instead of
+some of them waiting on the last few expensive images. The workers take the next chunk as soon as they
+are free, and time how long they spent on each, which is collected into a `UtilisationReport`.
+"""
+
+import math
+import os
+import threading
+import time
+from collections import namedtuple
+from logging import getLogger
+from typing import Callable, Dict, List, Optional
+
+LOG = getLogger(__name__)
+
+# Each chunk is this fraction of the images that are left, divided between the workers.
+# Smaller fractions give more, smaller chunks, which balance better but cost more to send
+GUIDED_FRACTION = 0.5
+
+# How long a worker spent on a chunk, and when it finished it
+ChunkStats = namedtuple('ChunkStats', ['worker', 'images', 'busy_seconds', 'finished_at'])
+
+# The report of the most recent guided execution
+last_report: Optional['UtilisationReport'] = None
+
+
+def guided_chunks(start: int, stop: int, workers: int, min_size: int = 1) -> List[slice]:
+    """
+    Splits the images into contiguous chunks that shrink as the number of images left goes down.
+
+    :param start: First image
+    :param stop: End of the images, exclusive
+    :param workers: Number of workers the chunks are shared between
+    :param min_size: Smallest size of a chunk
+    """
+    chunks = []
+    position = start
+    while position < stop:
+        size = max(min_size, math.ceil((stop - position) * GUIDED_FRACTION / workers))
+        chunks.append(slice(position, min(position + size, stop)))
+        position += size
+    return chunks
+
+
+class ChunkTask:
+    """
+    Picklable task that runs the function on a chunk of images and times it.
+    """
+    def __init__(self, func: Callable, batched: bool):
+        """
+        :param func: The function to run
+        :param batched: Whether the function takes the whole chunk as a slice, rather than one index at a time
+        """
+        self.func = func
+        self.batched = batched
+
+    def __call__(self, chunk: slice) -> ChunkStats:
+        start_time = time.monotonic()
+        if self.batched:
+            self.func(chunk)
+        else:
+            for index in range(chunk.start, chunk.stop):
+                self.func(index)
+        finished_at = time.monotonic()
+        worker = f"{os.getpid()}:{threading.current_thread().name}"
+        return ChunkStats(worker, chunk.stop - chunk.start, finished_at - start_time, finished_at)
+
+
+class UtilisationReport:
+    """
+    How busy each worker was over an execution. Workers that were not given any chunks are not included.
+    """
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.finished_at: Optional[float] = None
+        self.busy_seconds: Dict[str, float] = {}
+        self.images: Dict[str, int] = {}
+        self.last_finished_at: Dict[str, float] = {}
+
+    def add(self, stats: ChunkStats):
+        self.busy_seconds[stats.worker] = self.busy_seconds.get(stats.worker, 0) + stats.busy_seconds
+        self.images[stats.worker] = self.images.get(stats.worker, 0) + stats.images
+        self.last_finished_at[stats.worker] = max(self.last_finished_at.get(stats.worker, 0), stats.finished_at)
+
+    def finish(self):
+        self.finished_at = time.monotonic()
+
+    @property
+    def wall_seconds(self) -> float:
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return end - self.started_at
+
+    def utilisation(self) -> Dict[str, float]:
+        """
+        :return: The fraction of the execution each worker spent processing images
+        """
+        wall_seconds = self.wall_seconds
+        return {worker: busy / wall_seconds if wall_seconds > 0 else 1.0 for worker, busy in self.busy_seconds.items()}
+
+    @property
+    def tail_seconds(self) -> float:
+        """
+        How long the execution kept going after the first worker ran out of chunks
+        """
+        if not self.last_finished_at:
+            return 0.0
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return max(0.0, end - min(self.last_finished_at.values()))
+
+    def __str__(self):
+        utilisation = self.utilisation()
+        mean = sum(utilisation.values()) / len(utilisation) if utilisation else 0
+        workers = ", ".join(f"{worker} {fraction:.0%} ({self.images[worker]} images)"
+                            for worker, fraction in sorted(utilisation.items()))
+        return (f"{len(utilisation)} workers, {self.wall_seconds:.3f}s, mean utilisation {mean:.0%}, "
+                f"tail {self.tail_seconds:.3f}s: {workers}")
@@ -0,0 +1,114 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+"""
+Arrays backed by memory mapped scratch files, for stacks that are larger than the physical memory.
+
+The arrays are `np.memmap`s, so they can be used anywhere a shared array can, and the worker processes
+attach to them by mapping the same file, see `utility.get_descriptor`. Only the parts of the stack that
+are being worked on have to be in memory at any time, the rest is paged in and out by the operating system.
+This is only fast on local solid state storage, so the scratch directory should be on a local NVMe drive
+rather than a network share, and can be set with the environment variable MANTIDIMAGING_SCRATCH_DIR.
+Arrays that do not fit in memory are only made in scratch files if that variable is set, as the default
+temporary directory is often in memory itself (tmpfs), or on a small partition, see `fallback_to_scratch`.
+
+The scratch file is deleted once the array and all of the views into it have been garbage collected.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from logging import getLogger
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+LOG = getLogger(__name__)
+
+# Make arrays in scratch files when there is not enough memory for them, instead of refusing them.
+# None only does so if a scratch directory has been chosen with SCRATCH_DIR_VARIABLE
+FALLBACK_TO_SCRATCH: Optional[bool] = None
+
+SCRATCH_DIR_VARIABLE = "MANTIDIMAGING_SCRATCH_DIR"
+
+# The scratch files of the arrays that are still alive, keyed by their path, along with their address and size
+_files: Dict[str, Tuple[int, int]] = {}
+_lock = threading.Lock()
+
+
+def scratch_dir() -> str:
+    return os.environ.get(SCRATCH_DIR_VARIABLE, tempfile.gettempdir())
+
+
+def fallback_to_scratch() -> bool:
+    """
+    :return: Whether arrays that do not fit in memory are made in scratch files, see FALLBACK_TO_SCRATCH
+    """
+    if FALLBACK_TO_SCRATCH is not None:
+        return FALLBACK_TO_SCRATCH
+    return SCRATCH_DIR_VARIABLE in os.environ
+
+
+def enough_scratch_space(size: int) -> bool:
+    return size <= shutil.disk_usage(scratch_dir()).free
+
+
+def create_array(shape, dtype: np.dtype) -> np.memmap:
+    """
+    Makes a zeroed array in a new scratch file.
+
+    :raises RuntimeError: If the scratch directory does not have enough space for it
+    """
+    size = int(np.prod(shape)) * dtype.itemsize
+    directory = scratch_dir()
+    if not enough_scratch_space(size):
+        raise RuntimeError(f"There is not enough space in the scratch directory {directory} to allocate this data. "
+                           f"Another directory can be chosen with the environment variable {SCRATCH_DIR_VARIABLE}.")
+
+    fd, path = tempfile.mkstemp(prefix="mantidimaging-", suffix=".scratch", dir=directory)
+    LOG.warning(f'Backing array with shape={shape}, size={size}, dtype={dtype} by the scratch file {path}')
+    try:
+        # the file is sparse, so this does not write anything, and reads back as zeroes
+        os.ftruncate(fd, max(size, 1))
+    finally:
+        os.close(fd)
+
+    data = np.memmap(path, dtype, mode='r+', shape=shape)
+    with _lock:
+        _files[path] = (data.__array_interface__['data'][0], max(size, 1))
+    weakref.finalize(data, _delete, path)
+    return data
+
+
+def _delete(path: str):
+    with _lock:
+        del _files[path]
+    try:
+        os.remove(path)
+    except OSError as e:
+        LOG.warning(f"Could not delete scratch file {path}: {e}")
+
+
+def find_file(data: np.ndarray) -> Optional[Tuple[str, int]]:
+    """
+    :return: The path and buffer address of the scratch file that the array, or view, is in
+    """
+    data_address = data.__array_interface__['data'][0]
+    with _lock:
+        for path, (address, size) in _files.items():
+            if address <= data_address < address + size:
+                return path, address
+    return None
+
+
+def is_scratch_array(data: np.ndarray) -> bool:
+    return find_file(data) is not None
+
+
+def attach_array(path: str, shape, dtype, offset: int, strides) -> np.ndarray:
+    """
+    Maps an array in a scratch file made by another process. The file is mapped for as long as the array is alive.
+    """
+    mapped = np.memmap(path, np.uint8, mode='r+')
+    return np.ndarray(shape, dtype, buffer=mapped, offset=offset, strides=strides)
@@ -1,49 +1,245 @@
 # Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
 # SPDX - License - Identifier: GPL-3.0-or-later
 
+import pickle
+import threading
+import time
+import uuid
 from functools import partial
-from typing import List
+from typing import Any, Dict, List, NamedTuple, Optional
 
-import numpy
+import numpy as np
 
-from mantidimaging.core.parallel import utility as pu
+from mantidimaging.core.parallel import calibration, utility as pu
+from mantidimaging.core.parallel.backends import Backend, DEFAULT_BACKEND
 
-shared_list: List[numpy.ndarray] = []
+# The worker processes attach to the shared arrays of an execution on its first task, and reuse them for
+# its following tasks. They are released once no task of the execution has run for this many seconds,
+# so that the workers do not keep the memory mapped after the arrays have been freed in the main process
+RELEASE_AFTER_SECONDS = 1.0
+
+
+class _CurrentExecution(threading.local):
+    # The list of the execution whose task is running in this thread
+    shared_list: List[Any] = []
+
+
+_current = _CurrentExecution()
+
+# Stacks stored in reduced precision are given to the functions one image, or batch, at a time
+# upcast to this type, and the results are converted back when they are written to the stack.
+# The functions then get the same type as for full precision stacks, e.g. as scipy does not support float16
+REDUCED_PRECISION_DTYPES = (np.float16, )
+COMPUTE_DTYPE = np.float32
+
+
+def upcast(data):
+    if isinstance(data, np.ndarray) and data.dtype in REDUCED_PRECISION_DTYPES:
+        return data.astype(COMPUTE_DTYPE)
+    return data
+
+
+def _write_back(view, data):
+    if data is not view:
+        view[...] = data
+
+
+# The forwarding functions below receive the index `i` of the image to process,
+# or a slice of contiguous images when executed with `batched=True`.
+# They read the arrays from the `shared_list` given to the `execute` call that is running them
 
 
 def inplace3(func, i, **kwargs):
-    global shared_list
-    func(shared_list[0][i], shared_list[1][i], shared_list[2], **kwargs)
+    shared_list = _current.shared_list
+    first, second = shared_list[0][i], shared_list[1][i]
+    first_computed, second_computed = upcast(first), upcast(second)
+    func(first_computed, second_computed, shared_list[2], **kwargs)
+    _write_back(first, first_computed)
+    _write_back(second, second_computed)
 
 
 def inplace2(func, i, **kwargs):
-    global shared_list
+    shared_list = _current.shared_list
+    first, second = shared_list[0][i], shared_list[1][i]
+    first_computed, second_computed = upcast(first), upcast(second)
+    func(first_computed, second_computed, **kwargs)
+    _write_back(first, first_computed)
+    _write_back(second, second_computed)
+
+
+def inplace2_stored(func, i, **kwargs):
+    """
+    Like inplace2, but gives the images in the type they are stored in, for functions that only move them around
+    """
+    shared_list = _current.shared_list
     func(shared_list[0][i], shared_list[1][i], **kwargs)
 
 
 def inplace1(func, i, **kwargs):
-    global shared_list
-    func(shared_list[0][i], **kwargs)
+    shared_list = _current.shared_list
+    data = shared_list[0][i]
+    computed = upcast(data)
+    func(computed, **kwargs)
+    _write_back(data, computed)
 
 
 def return_to_self(func, i, **kwargs):
-    global shared_list
-    shared_list[0][i] = func(shared_list[0][i], **kwargs)
+    shared_list = _current.shared_list
+    shared_list[0][i] = func(upcast(shared_list[0][i]), **kwargs)
 
 
 def inplace_second_2d(func, i, **kwargs):
-    global shared_list
-    func(shared_list[0][i], shared_list[1], **kwargs)
+    shared_list = _current.shared_list
+    data = shared_list[0][i]
+    computed = upcast(data)
+    func(computed, upcast(shared_list[1]), **kwargs)
+    _write_back(data, computed)
 
 
 def return_to_second(func, i, **kwargs):
-    global shared_list
-    shared_list[1] = func(shared_list[0][i], **kwargs)
+    shared_list = _current.shared_list
+    shared_list[1] = func(upcast(shared_list[0][i]), **kwargs)
 
 
 def return_to_second_at_i(func, i, **kwargs):
-    global shared_list
-    shared_list[1][i] = func(shared_list[0][i], **kwargs)
+    shared_list = _current.shared_list
+    shared_list[1][i] = func(upcast(shared_list[0][i]), **kwargs)
+
+
+class ExecutionContext:
+    """
+    The list of arrays and values that a single execution works on.
+
+    It is sent to the pool workers along with every task. The shared arrays in it are sent as
+    their descriptors and attached to by name in the workers. Anything else is pickled once into
+    a shared array of its own, which each worker unpickles on its first task of the execution.
+    """
+    def __init__(self, shared_list: List[Any]):
+        self.id = uuid.uuid4().hex
+        self.shared_list: Optional[List[Any]] = shared_list
+        self._transferable: Optional[List[Any]] = None
+        self._packed_descriptor: Any = None
+        # kept alive for as long as the execution, as the workers attach to it while it runs
+        self._packed: Optional[np.ndarray] = None
+
+    def __getstate__(self):
+        if self._transferable is None:
+            self._pack()
+        return self.id, self._transferable, self._packed_descriptor
+
+    def __setstate__(self, state):
+        self.id, self._transferable, self._packed_descriptor = state
+        # resolved from the arrays attached in this process, see `get_shared_list`
+        self.shared_list = None
+
+    def _pack(self):
+        transferable: List[Any] = []
+        others: List[Any] = []
+        for item in self.shared_list or []:
+            descriptor = pu.get_descriptor(item) if isinstance(item, np.ndarray) else None
+            if descriptor is not None:
+                transferable.append(descriptor)
+            else:
+                transferable.append(_Packed(len(others)))
+                others.append(item)
+        if others:
+            pickled = pickle.dumps(others, protocol=pickle.HIGHEST_PROTOCOL)
+            self._packed = pu.create_array((len(pickled), ), np.uint8)
+            self._packed[:] = np.frombuffer(pickled, np.uint8)
+            self._packed_descriptor = pu.get_descriptor(self._packed)
+        self._transferable = transferable
+
+    def get_shared_list(self) -> List[Any]:
+        if self.shared_list is not None:
+            return self.shared_list
+        return _attached_lists.get(self.id, self._transferable or [], self._packed_descriptor)
+
+
+class _Packed(NamedTuple):
+    # Position of an item of the shared list in the items that were pickled together, see `ExecutionContext`
+    position: int
+
+
+class _AttachedList:
+    def __init__(self, transferable: List[Any], packed_descriptor: Any = None):
+        others: List[Any] = []
+        if packed_descriptor is not None:
+            others = pickle.loads(pu.attach_array(packed_descriptor, track=True).data)
+        # the pool workers share the resource tracker of the main process
+        self.shared_list = [_from_transferable(item, others) for item in transferable]
+        self.running_tasks = 0
+        self.last_used = time.monotonic()
+
+
+def _from_transferable(item: Any, others: List[Any]) -> Any:
+    if isinstance(item, pu.ARRAY_DESCRIPTORS):
+        return pu.attach_array(item, track=True)
+    if isinstance(item, _Packed):
+        return others[item.position]
+    return item
+
+
+class _AttachedLists:
+    """
+    The lists of the executions that have recently run tasks in this worker process.
+    """
+    def __init__(self):
+        self._lists: Dict[str, _AttachedList] = {}
+        self._lock = threading.Lock()
+        self._release_thread: Optional[threading.Thread] = None
+
+    def get(self, context_id: str, transferable: List[Any], packed_descriptor: Any = None) -> List[Any]:
+        with self._lock:
+            if context_id not in self._lists:
+                self._lists[context_id] = _AttachedList(transferable, packed_descriptor)
+                if self._release_thread is None:
+                    self._release_thread = threading.Thread(target=self._release_idle, daemon=True)
+                    self._release_thread.start()
+            attached = self._lists[context_id]
+            attached.running_tasks += 1
+            return attached.shared_list
+
+    def done(self, context_id: str):
+        with self._lock:
+            attached = self._lists.get(context_id)
+            if attached is not None:
+                attached.running_tasks -= 1
+                attached.last_used = time.monotonic()
+
+    def __len__(self):
+        return len(self._lists)
+
+    def _release_idle(self):
+        while True:
+            time.sleep(RELEASE_AFTER_SECONDS / 2)
+            with self._lock:
+                now = time.monotonic()
+                for context_id, attached in list(self._lists.items()):
+                    if attached.running_tasks == 0 and now - attached.last_used > RELEASE_AFTER_SECONDS:
+                        del self._lists[context_id]
+
+
+_attached_lists = _AttachedLists()
+
+
+class _ContextTask:
+    """
+    Picklable task that runs the forwarded function with the list of its execution.
+    """
+    def __init__(self, context: ExecutionContext, partial_func: partial):
+        self.context = context
+        self.partial_func = partial_func
+
+    def __call__(self, i):
+        attached = self.context.shared_list is None
+        previous = _current.shared_list
+        _current.shared_list = self.context.get_shared_list()
+        try:
+            return self.partial_func(i)
+        finally:
+            _current.shared_list = previous
+            if attached:
+                _attached_lists.done(self.context.id)
 
 
 def create_partial(func, fwd_function, **kwargs):
@@ -61,12 +257,24 @@ def create_partial(func, fwd_function, **kwargs):
     return partial(fwd_function, func, **kwargs)
 
 
-def execute(partial_func: partial, num_operations: int, progress=None, msg: str = '', cores=None) -> None:
+def execute(partial_func: partial,
+            num_operations: int,
+            progress=None,
+            msg: str = '',
+            cores=None,
+            batched: bool = False,
+            shared_list: Optional[List[Any]] = None,
+            backend: Backend = DEFAULT_BACKEND,
+            guided: bool = False) -> None:
     """
     Executes a function in parallel with shared memory between the processes.
 
     The array must have been created using
-    parallel.utility.create_shared_array(shape, dtype).
+    parallel.utility.create_array(shape, dtype).
+
+    The work is done by the long-lived pool from parallel.manager, which is
+    started on the first parallel execution and then reused. Each execution
+    carries its own shared list, so several can run at the same time from different threads.
 
     If the input array IS NOT a shared array, the data will NOT BE CHANGED!
 
@@ -100,18 +308,33 @@ def execute(partial_func: partial, num_operations: int, progress=None, msg: str
     :param partial_func: A function constructed using create_partial
     :param num_operations: The expected number of operations - should match the number of images being processed
                            Also used to set the number of progress steps
-    :param cores: number of cores that the processing will use
+    :param cores: number of cores that the processing will use. If not given, the backend and number of cores
+                  are taken from this machine's calibration profile, see parallel.calibration
     :param progress: Progress instance to use for progress reporting (optional)
     :param msg: Message to be shown on the progress bar
+    :param batched: Call the function with a slice of contiguous images, e.g. `slice(start, stop)`, instead of
+                    a single index. The forwarding functions then give it blocks like `data[start:stop]`,
+                    so the function must be able to process several images at once. The size of the slices
+                    is chosen from how long the first image took to process.
+    :param shared_list: The arrays and values the forwarding function passes on to the function, e.g. `[data, dark]`.
+                        Assigning to an element, like `return_to_second` does, replaces it in this list
+                        only when running in this process.
+    :param backend: Whether to run in the worker processes, in threads, or serially. Threads avoid sending
+                    the data to other processes, but only run in parallel if the function releases the GIL,
+                    like NumPy ufuncs and most of scipy.ndimage do.
+    :param guided: Hand out the images in chunks that shrink towards the end of the execution, instead of
+                   one by one or in equal batches. Suits functions whose cost varies a lot between images,
+                   as the workers finish at about the same time. Also logs how busy each worker was.
     :return:
     """
 
-    if not cores:
-        cores = pu.get_cores()
-
-    chunksize = pu.calculate_chunksize(cores)
-
-    pu.execute_impl(num_operations, partial_func, cores, chunksize, progress, msg)
+    backend, cores = calibration.choose(partial_func, backend, cores)
 
-    global shared_list
-    shared_list = []
+    task = _ContextTask(ExecutionContext(shared_list if shared_list is not None else []), partial_func)
+    if guided:
+        pu.execute_guided_impl(num_operations, task, cores, progress, msg, backend, batched)
+    elif batched:
+        pu.execute_batched_impl(num_operations, task, cores, progress, msg, backend)
+    else:
+        chunksize = pu.calculate_chunksize(cores)
+        pu.execute_impl(num_operations, task, cores, chunksize, progress, msg, backend)
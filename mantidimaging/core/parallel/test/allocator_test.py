@@ -0,0 +1,109 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from mantidimaging.core.parallel import allocator
+from mantidimaging.core.parallel.utility import _create_shared_array, create_array, get_descriptor
+
+
+@pytest.fixture(autouse=True)
+def empty_pool():
+    allocator.trim()
+    yield
+    allocator.trim()
+
+
+@pytest.mark.parametrize('size,expected', [
+    [0, 1],
+    [8, 8],
+    [1024, 1024],
+    [1025, 1152],
+    [1152, 1152],
+    [1153, 1280],
+    [2000, 2048],
+])
+def test_block_size(size, expected):
+    assert allocator.block_size(size) == expected
+
+
+def test_collected_array_block_is_reused():
+    arr = _create_shared_array((4, 5, 6))
+    name = get_descriptor(arr).name
+    del arr
+    assert allocator.pooled_bytes() == allocator.block_size(4 * 5 * 6 * 4)
+
+    reused = _create_shared_array((6, 5, 4))
+    assert get_descriptor(reused).name == name
+    assert allocator.pooled_bytes() == 0
+
+
+def test_reused_block_is_only_zeroed_when_asked_for():
+    arr = _create_shared_array((4, 5, 6))
+    arr[:] = 7
+    del arr
+
+    reused, is_new = allocator.allocate((4, 5, 6), np.dtype(np.float32))
+    assert not is_new
+    assert np.all(reused == 7)
+    del reused
+
+    assert np.all(_create_shared_array((4, 5, 6), zeroed=True) == 0)
+
+
+def test_block_of_different_size_is_not_reused():
+    arr = _create_shared_array((4, 5, 6))
+    name = get_descriptor(arr).name
+    del arr
+
+    other = _create_shared_array((40, 5, 6))
+    assert get_descriptor(other).name != name
+    assert allocator.pooled_bytes() > 0
+
+
+def test_blocks_over_the_limit_are_freed():
+    arr = _create_shared_array((4, 5, 6))
+    with mock.patch.object(allocator, 'max_pooled_bytes', return_value=0):
+        del arr
+    assert allocator.pooled_bytes() == 0
+
+
+def test_create_array_trims_pool_when_memory_is_low():
+    arr = _create_shared_array((4, 5, 6))
+    del arr
+    with mock.patch('mantidimaging.core.parallel.utility.enough_memory', side_effect=[False, True]):
+        new_arr = create_array((40, 5, 6))
+    assert allocator.pooled_bytes() == 0
+    assert new_arr.shape == (40, 5, 6)
+
+
+def test_released_array_alive_is_reported():
+    arr = _create_shared_array((4, 5, 6))
+    assert allocator.leak_report() == []
+
+    allocator.release(arr)
+    leaks = allocator.leak_report()
+    assert len(leaks) == 1
+    assert leaks[0].shape == (4, 5, 6)
+    assert __file__ in leaks[0].created_at
+
+    del arr
+    assert allocator.leak_report() == []
+
+
+def test_retained_array_is_reported_after_last_release():
+    arr = _create_shared_array((4, 5, 6))
+    allocator.retain(arr[1])
+    allocator.release(arr)
+    assert allocator.leak_report() == []
+    allocator.release(arr[1])
+    assert len(allocator.leak_report()) == 1
+
+
+def test_arrays_not_in_shared_memory_are_ignored():
+    allocator.retain(np.zeros((4, 5, 6)))
+    allocator.release(np.zeros((4, 5, 6)))
+    allocator.release(None)
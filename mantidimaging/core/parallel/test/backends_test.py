@@ -0,0 +1,59 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+
+import threading
+import time
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from mantidimaging.core.parallel import shared as ps
+from mantidimaging.core.parallel.backends import Backend, mapper
+
+
+def _thread_name(_):
+    # long enough for the other threads to pick up some of the tasks
+    time.sleep(0.01)
+    return threading.current_thread().name
+
+
+def _add_one(data):
+    np.add(data, 1, out=data)
+
+
+def test_threads_backend_runs_in_thread_pool():
+    with mapper(Backend.THREADS, 2) as imap:
+        names = set(imap(_thread_name, range(10)))
+    assert len(names) == 2
+    assert threading.current_thread().name not in names
+
+
+def test_results_keep_order():
+    for backend in (Backend.THREADS, Backend.SERIAL):
+        with mapper(backend, 3) as imap:
+            assert list(imap(lambda i: i * 2, range(20))) == list(range(0, 40, 2))
+
+
+@mock.patch('mantidimaging.core.parallel.backends.manager')
+def test_processes_backend_uses_worker_pool(mock_manager):
+    with mapper(Backend.PROCESSES, 4, chunksize=2) as imap:
+        imap(_add_one, range(3))
+    mock_manager.acquire.assert_called_once_with(4)
+    mock_pool = mock_manager.acquire.return_value.__enter__.return_value
+    mock_pool.imap.assert_called_once_with(_add_one, range(3), chunksize=2)
+
+
+@pytest.mark.parametrize('batched', [False, True])
+@mock.patch('mantidimaging.core.parallel.backends.manager')
+def test_threads_backend_works_on_any_array(mock_manager, batched):
+    # the threads share this process' memory, so the array does not have to be a shared one
+    data = np.ones((20, 3, 3))
+    ps.execute(ps.create_partial(_add_one, ps.inplace1),
+               data.shape[0],
+               cores=4,
+               batched=batched,
+               shared_list=[data],
+               backend=Backend.THREADS)
+    assert np.all(data == 2)
+    mock_manager.acquire.assert_not_called()
@@ -0,0 +1,95 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+
+import threading
+import time
+
+from unittest import mock
+
+import pytest
+
+from mantidimaging.core.parallel import allocator, budget, scratch
+from mantidimaging.core.parallel.utility import create_array
+
+ARRAY_SHAPE = (4, 32, 32)
+ARRAY_BYTES = allocator.block_size(4 * 32 * 32 * 4)
+
+
+@pytest.fixture(autouse=True)
+def small_budget():
+    allocator.trim()
+    budget.set_budget(allocator.live_bytes() + 2 * ARRAY_BYTES)
+    with mock.patch.object(scratch, 'FALLBACK_TO_SCRATCH', False):
+        yield
+    budget.set_budget(None)
+
+
+def test_array_over_budget_is_refused():
+    arr = create_array(ARRAY_SHAPE)
+    arr2 = create_array(ARRAY_SHAPE)
+    with pytest.raises(budget.MemoryBudgetExceeded):
+        create_array(ARRAY_SHAPE)
+    del arr, arr2
+
+    assert create_array(ARRAY_SHAPE).shape == ARRAY_SHAPE
+
+
+def test_reservation_is_refused_when_it_does_not_fit():
+    arr = create_array(ARRAY_SHAPE)
+    with pytest.raises(budget.MemoryBudgetExceeded):
+        with budget.reserve(2 * ARRAY_BYTES):
+            pass
+    assert arr.shape == ARRAY_SHAPE
+
+
+def test_allocations_are_taken_out_of_reservation():
+    with budget.reserve(2 * ARRAY_BYTES) as reservation:
+        # nothing is left outside of the reservation
+        assert budget.available_bytes() == 0
+        arr = create_array(ARRAY_SHAPE)
+        arr2 = create_array(ARRAY_SHAPE)
+        assert reservation.remaining == 0
+        with pytest.raises(budget.MemoryBudgetExceeded):
+            create_array(ARRAY_SHAPE)
+    assert budget.available_bytes() == 0
+    del arr, arr2
+    assert budget.available_bytes() == 2 * ARRAY_BYTES
+
+
+def test_unused_reservation_is_given_back():
+    with budget.reserve(2 * ARRAY_BYTES):
+        arr = create_array(ARRAY_SHAPE)
+    assert budget.available_bytes() == ARRAY_BYTES
+    assert arr.shape == ARRAY_SHAPE
+
+
+def test_reservation_waits_for_memory_to_be_freed():
+    arrays = [create_array(ARRAY_SHAPE)]
+
+    def free_later():
+        time.sleep(0.2)
+        arrays.clear()
+
+    thread = threading.Thread(target=free_later)
+    thread.start()
+    with budget.reserve(2 * ARRAY_BYTES, timeout=10):
+        assert arrays == []
+    thread.join()
+
+
+def test_reservation_times_out():
+    arr = create_array(ARRAY_SHAPE)
+    start = time.monotonic()
+    with pytest.raises(budget.MemoryBudgetExceeded):
+        with budget.reserve(2 * ARRAY_BYTES, timeout=0.2):
+            pass
+    assert time.monotonic() - start >= 0.2
+    assert arr.shape == ARRAY_SHAPE
+
+
+def test_reservation_not_required_runs_without_it():
+    arr = create_array(ARRAY_SHAPE)
+    with budget.reserve(2 * ARRAY_BYTES, required=False) as reservation:
+        assert reservation.nbytes == 0
+        assert budget.available_bytes() == ARRAY_BYTES
+    assert arr.shape == ARRAY_SHAPE
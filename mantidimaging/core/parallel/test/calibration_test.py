@@ -0,0 +1,83 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+
+import json
+from unittest import mock
+
+import scipy.ndimage as scipy_ndimage
+
+from mantidimaging.core.operations.gaussian import GaussianFilter
+from mantidimaging.core.parallel import calibration, shared as ps
+from mantidimaging.core.parallel.backends import Backend
+from mantidimaging.core.parallel.calibration import Choice
+
+
+def test_function_key_names_the_forwarded_function():
+    partial_func = ps.create_partial(scipy_ndimage.median_filter, ps.return_to_self, size=3)
+    assert calibration.function_key(partial_func).endswith(".median_filter")
+
+
+@mock.patch.object(calibration, "_profile", {})
+def test_choose_without_profile():
+    partial_func = ps.create_partial(scipy_ndimage.median_filter, ps.return_to_self)
+    assert calibration.choose(partial_func, Backend.THREADS, 3) == (Backend.THREADS, 3)
+    assert calibration.choose(partial_func, Backend.THREADS, None) == (Backend.THREADS, calibration.pu.get_cores())
+
+
+def test_choose_from_profile_when_cores_not_given():
+    partial_func = ps.create_partial(scipy_ndimage.median_filter, ps.return_to_self)
+    profile = {calibration.function_key(partial_func): Choice(Backend.PROCESSES, 5)}
+    with mock.patch.object(calibration, "_profile", profile):
+        assert calibration.choose(partial_func, Backend.THREADS, None) == (Backend.PROCESSES, 5)
+        assert calibration.choose(partial_func, Backend.THREADS, 2) == (Backend.THREADS, 2)
+
+
+def test_save_and_load_profile(tmp_path):
+    path = str(tmp_path / "profile.json")
+    choices = {"a.b": Choice(Backend.THREADS, 4), "c.d": Choice(Backend.SERIAL, 1)}
+    calibration.save_profile(choices, path)
+    assert calibration.load_profile(path) == choices
+
+
+def test_profile_from_other_machine_ignored(tmp_path):
+    path = tmp_path / "profile.json"
+    path.write_text(json.dumps({"cpu_count": 100000, "choices": {"a.b": {"backend": "threads", "cores": 4}}}))
+    assert calibration.load_profile(str(path)) == {}
+
+    path.write_text("not a profile")
+    assert calibration.load_profile(str(path)) == {}
+    assert calibration.load_profile(str(tmp_path / "missing.json")) == {}
+
+
+def test_candidate_choices():
+    assert calibration.candidate_choices(6) == [
+        Choice(Backend.SERIAL, 1),
+        Choice(Backend.PROCESSES, 2),
+        Choice(Backend.THREADS, 2),
+        Choice(Backend.PROCESSES, 4),
+        Choice(Backend.THREADS, 4),
+        Choice(Backend.PROCESSES, 6),
+        Choice(Backend.THREADS, 6),
+    ]
+
+
+class _SerialFilter:
+    filter_name = "Serial"
+
+    @staticmethod
+    def calibration_kwargs(images):
+        return {}
+
+    @staticmethod
+    def filter_func(images):
+        return images
+
+
+def test_calibrate_finds_executed_functions():
+    choices = [Choice(Backend.SERIAL, 1), Choice(Backend.THREADS, 2)]
+    results = calibration.calibrate([GaussianFilter, _SerialFilter], shape=(12, 8, 8), choices=choices, save=False)
+
+    assert len(results) == 1
+    key, choice = results.popitem()
+    assert key.endswith(".gaussian_filter")
+    assert choice in choices
@@ -0,0 +1,135 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+
+import multiprocessing
+import os
+import threading
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from mantidimaging.core.parallel import manager, scheduling, shared as ps, utility as pu
+
+
+def _return_pid(_):
+    return os.getpid()
+
+
+def _add_one(data):
+    np.add(data, 1, out=data)
+
+
+DEFAULT_START_METHOD = manager.START_METHOD
+
+
+def setup_function():
+    manager.shutdown(terminate=True)
+
+
+def teardown_function():
+    manager.set_start_method(DEFAULT_START_METHOD)
+    manager.shutdown(terminate=True)
+
+
+def test_pool_started_lazily():
+    assert not manager.is_running()
+    assert not manager.is_healthy()
+    manager.start(2)
+    assert manager.is_running()
+    assert manager.is_healthy()
+    assert manager.size() == 2
+
+
+def test_pool_reused_between_executions():
+    first = manager.start(2)
+    assert manager.start(2) is first
+
+    pids = {process.pid for process in first._pool}
+    with manager.acquire(2) as pool:
+        assert pool is first
+        assert set(pool.map(_return_pid, range(20))) <= pids
+    assert {process.pid for process in first._pool} == pids
+
+
+def test_resize():
+    first = manager.start(2)
+    second = manager.resize(3)
+    assert first is not second
+    assert manager.size() == 3
+    assert len(set(second.map(_return_pid, range(30)))) <= 3
+
+
+def test_shutdown():
+    manager.start(2)
+    manager.shutdown()
+    assert not manager.is_running()
+    assert manager.size() == 0
+
+
+def test_unhealthy_pool_restarted():
+    first = manager.start(2)
+    # the pool replaces killed workers by itself after a short while, so whether it responds is faked
+    with mock.patch.object(manager, '_responds', return_value=False):
+        assert not manager.is_healthy()
+        second = manager.start(2)
+    assert second is not first
+    assert manager.is_healthy()
+
+
+@pytest.mark.parametrize('start_method', multiprocessing.get_all_start_methods())
+def test_execute_on_array_created_after_pool_started(start_method):
+    manager.set_start_method(start_method)
+    manager.start(2)
+    data = pu.create_array((15, 4, 4))
+    data[:] = 1
+
+    ps.execute(ps.create_partial(_add_one, ps.inplace1), data.shape[0], cores=2, shared_list=[data])
+
+    assert np.all(data == 2)
+    assert manager.size() == 2
+
+
+def test_batched_execute_on_blocks():
+    data = pu.create_array((40, 4, 4))
+    data[:] = 1
+
+    ps.execute(ps.create_partial(_add_one, ps.inplace1), data.shape[0], cores=2, batched=True, shared_list=[data])
+
+    assert np.all(data == 2)
+
+
+def test_concurrent_executions_from_threads():
+    arrays = [pu.create_array((30, 4, 4)) for _ in range(4)]
+    for value, data in enumerate(arrays):
+        data[:] = value
+
+    def run(data):
+        ps.execute(ps.create_partial(_add_one, ps.inplace1), data.shape[0], cores=2, shared_list=[data])
+
+    threads = [threading.Thread(target=run, args=(data, )) for data in arrays]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for value, data in enumerate(arrays):
+        assert np.all(data == value + 1)
+
+
+def test_pool_in_use_is_shared_instead_of_resized():
+    with manager.acquire(2) as first:
+        with manager.acquire(3) as second:
+            assert second is first
+    assert manager.size() == 2
+    assert manager.resize(3) is not first
+
+
+def test_guided_execute_on_workers():
+    data = pu.create_array((40, 4, 4))
+    data[:] = 1
+
+    ps.execute(ps.create_partial(_add_one, ps.inplace1), data.shape[0], cores=2, shared_list=[data], guided=True)
+
+    assert np.all(data == 2)
+    assert set(scheduling.last_report.busy_seconds) <= {f"{process.pid}:MainThread" for process in manager._pool._pool}
@@ -0,0 +1,107 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+
+import os
+import threading
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from mantidimaging.core.parallel import manager, numa, shared as ps, utility as pu
+
+
+def _two_nodes():
+    cpus = sorted(os.sched_getaffinity(0))
+    # with a single CPU available, both nodes share it
+    return [cpus[:max(1, len(cpus) // 2)], cpus[len(cpus) // 2:]]
+
+
+def _record(processed, item):
+    processed.append(item)
+
+
+def _add_one(data):
+    np.add(data, 1, out=data)
+
+
+@pytest.fixture
+def two_node_pool():
+    manager.shutdown(terminate=True)
+    with mock.patch.object(numa, "get_nodes", _two_nodes):
+        yield
+    manager.shutdown(terminate=True)
+
+
+@pytest.mark.parametrize('cpu_list,expected', [
+    ["0", [0]],
+    ["0-3", [0, 1, 2, 3]],
+    ["0-1,8-9\n", [0, 1, 8, 9]],
+])
+def test_parse_cpu_list(cpu_list, expected):
+    assert numa._parse_cpu_list(cpu_list) == expected
+
+
+def test_get_nodes_covers_allowed_cpus():
+    nodes = numa.get_nodes()
+    assert nodes
+    assert {cpu for node in nodes for cpu in node} <= os.sched_getaffinity(0)
+
+
+def test_worker_placements_alternate_nodes():
+    with mock.patch.object(numa, "get_nodes", return_value=[[0, 1], [2, 3]]):
+        assert numa.worker_placements(5) == [(0, [0]), (1, [2]), (0, [1]), (1, [3]), (0, [0])]
+
+
+def test_node_blocks_proportional_to_workers():
+    assert numa.node_blocks(9, [2, 1]).tolist() == [[0, 6], [6, 9]]
+    assert numa.node_blocks(3, [1, 1, 1]).tolist() == [[0, 1], [1, 2], [2, 3]]
+
+
+@mock.patch.object(numa, "_claim_lock", threading.Lock())
+@mock.patch.object(numa, "_worker_node", 1)
+def test_node_local_task_processes_own_block_first():
+    claims = pu.create_array((2, 2), np.int64)
+    claims[:] = numa.node_blocks(6, [1, 1])
+    processed = []
+    task = numa.NodeLocalTask(lambda item: _record(processed, item), range(10, 16), pu.get_descriptor(claims))
+
+    assert [task(None)[0] for _ in range(6)] == [3, 4, 5, 0, 1, 2]
+    assert processed == [13, 14, 15, 10, 11, 12]
+    with pytest.raises(RuntimeError):
+        task(None)
+
+
+@mock.patch.object(numa, "_claim_lock", threading.Lock())
+@mock.patch.object(numa, "_attached_claims", (None, None))
+def test_node_local_task_attaches_claims_once():
+    claims = pu.create_array((1, 2), np.int64)
+    claims[:] = numa.node_blocks(4, [1])
+    task = numa.NodeLocalTask(lambda item: item, range(4), pu.get_descriptor(claims))
+
+    with mock.patch.object(pu, "attach_array", wraps=pu.attach_array) as attach_array:
+        assert [task(None)[1] for _ in range(4)] == [0, 1, 2, 3]
+    attach_array.assert_called_once()
+
+
+@pytest.mark.parametrize('batched', [False, True])
+def test_execute_on_pinned_workers(two_node_pool, batched):
+    data = pu.create_array((25, 3, 3))
+    data[:] = 1
+
+    ps.execute(ps.create_partial(_add_one, ps.inplace1),
+               data.shape[0],
+               cores=2,
+               batched=batched,
+               shared_list=[data],
+               backend=ps.Backend.PROCESSES)
+
+    assert manager.worker_nodes() == [0, 1]
+    assert np.all(data == 2)
+
+
+def test_first_touch_zeroes_from_workers(two_node_pool):
+    manager.start(2)
+    data = pu.create_array((20, 3, 3), first_touch=True)
+    assert np.all(data == 0)
+    assert manager.worker_nodes() == [0, 1]
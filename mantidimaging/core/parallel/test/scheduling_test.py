@@ -0,0 +1,72 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from mantidimaging.core.parallel import scheduling, shared as ps
+from mantidimaging.core.parallel.scheduling import ChunkStats, UtilisationReport, guided_chunks
+
+
+def _add_one(data):
+    np.add(data, 1, out=data)
+
+
+@pytest.mark.parametrize('start,stop,workers', [[0, 100, 4], [0, 7, 8], [5, 1000, 3], [0, 0, 2]])
+def test_guided_chunks_cover_range_and_shrink(start, stop, workers):
+    chunks = guided_chunks(start, stop, workers)
+    covered = [index for chunk in chunks for index in range(chunk.start, chunk.stop)]
+    assert covered == list(range(start, stop))
+
+    sizes = [chunk.stop - chunk.start for chunk in chunks]
+    assert sizes == sorted(sizes, reverse=True)
+    if sizes:
+        assert sizes[-1] == 1
+
+
+def test_guided_chunks_sizes():
+    sizes = [chunk.stop - chunk.start for chunk in guided_chunks(0, 100, 4)]
+    assert sizes[:4] == [13, 11, 10, 9]
+    assert len(sizes) < 100 / 2
+
+
+def test_chunk_task():
+    func = mock.Mock()
+    stats = scheduling.ChunkTask(func, batched=False)(slice(3, 6))
+    assert [call.args[0] for call in func.call_args_list] == [3, 4, 5]
+    assert stats.images == 3
+
+    func = mock.Mock()
+    scheduling.ChunkTask(func, batched=True)(slice(3, 6))
+    func.assert_called_once_with(slice(3, 6))
+
+
+@mock.patch.object(scheduling.time, "monotonic", return_value=0)
+def test_utilisation_report(_):
+    report = UtilisationReport()
+    report.add(ChunkStats("a", 5, 3.0, 3.0))
+    report.add(ChunkStats("a", 5, 1.0, 4.0))
+    report.add(ChunkStats("b", 2, 2.0, 2.0))
+    report.started_at, report.finished_at = 0, 4.0
+
+    assert report.utilisation() == {"a": 1.0, "b": 0.5}
+    assert report.images == {"a": 10, "b": 2}
+    assert report.tail_seconds == 2.0
+    assert "mean utilisation 75%" in str(report)
+
+
+@pytest.mark.parametrize('backend', [ps.Backend.SERIAL, ps.Backend.THREADS])
+@pytest.mark.parametrize('batched', [False, True])
+def test_guided_execute(backend, batched):
+    data = np.ones((50, 2, 2))
+    ps.execute(ps.create_partial(_add_one, ps.inplace1),
+               data.shape[0],
+               cores=3,
+               shared_list=[data],
+               backend=backend,
+               batched=batched,
+               guided=True)
+    assert np.all(data == 2)
+    assert sum(scheduling.last_report.images.values()) == 50
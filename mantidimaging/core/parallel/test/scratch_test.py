@@ -0,0 +1,109 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+
+import os
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from mantidimaging.core.data import Images
+from mantidimaging.core.parallel import budget, manager, scratch, shared as ps
+from mantidimaging.core.parallel.backends import Backend
+from mantidimaging.core.parallel.utility import ScratchArrayDescriptor, attach_array, create_array, get_descriptor
+from mantidimaging.core.utility.memory_usage import NotEnoughMemory
+
+
+@pytest.fixture(autouse=True)
+def scratch_in_tmp_path(tmp_path):
+    with mock.patch.dict(os.environ, {scratch.SCRATCH_DIR_VARIABLE: str(tmp_path)}):
+        yield tmp_path
+
+
+@pytest.fixture
+def pool():
+    manager.start(2)
+    yield
+    manager.shutdown(terminate=True)
+
+
+def _add_one(data):
+    data += 1
+
+
+def test_create_scratch_array(scratch_in_tmp_path):
+    arr = create_array((4, 5, 6), np.uint16, use_scratch=True)
+    assert isinstance(arr, np.memmap)
+    assert arr.dtype == np.uint16
+    assert np.all(arr == 0)
+    assert scratch.is_scratch_array(arr[1:])
+    assert len(os.listdir(scratch_in_tmp_path)) == 1
+
+
+def test_scratch_file_deleted_with_array(scratch_in_tmp_path):
+    arr = create_array((4, 5, 6), use_scratch=True)
+    view = arr[1:]
+    del arr
+    assert len(os.listdir(scratch_in_tmp_path)) == 1
+    del view
+    assert os.listdir(scratch_in_tmp_path) == []
+
+
+def test_attach_scratch_view_by_descriptor():
+    arr = create_array((4, 5, 6), use_scratch=True)
+    descriptor = get_descriptor(np.swapaxes(arr, 0, 1)[2])
+    assert isinstance(descriptor, ScratchArrayDescriptor)
+
+    attach_array(descriptor)[:] = 1
+    assert np.all(arr[:, 2] == 1)
+    assert arr.sum() == 4 * 6
+
+
+def test_execute_on_scratch_array_in_worker_processes(pool):
+    arr = create_array((10, 5, 6), use_scratch=True)
+    ps.execute(ps.create_partial(_add_one, ps.inplace1),
+               arr.shape[0],
+               cores=2,
+               shared_list=[arr],
+               backend=Backend.PROCESSES)
+    assert np.all(arr == 1)
+
+
+def test_falls_back_to_scratch_when_not_enough_memory():
+    with mock.patch('mantidimaging.core.parallel.utility.enough_memory', return_value=False):
+        arr = create_array((4, 5, 6))
+    assert scratch.is_scratch_array(arr)
+
+
+def test_falls_back_to_scratch_over_memory_budget():
+    budget.set_budget(0)
+    try:
+        arr = create_array((4, 5, 6))
+    finally:
+        budget.set_budget(None)
+    assert scratch.is_scratch_array(arr)
+
+
+def test_no_fallback_when_disabled():
+    with mock.patch.object(scratch, 'FALLBACK_TO_SCRATCH', False), \
+            mock.patch('mantidimaging.core.parallel.utility.enough_memory', return_value=False):
+        with pytest.raises(NotEnoughMemory):
+            create_array((4, 5, 6))
+
+
+def test_no_fallback_without_scratch_dir():
+    with mock.patch.dict(os.environ), \
+            mock.patch('mantidimaging.core.parallel.utility.enough_memory', return_value=False):
+        del os.environ[scratch.SCRATCH_DIR_VARIABLE]
+        assert not scratch.fallback_to_scratch()
+        with pytest.raises(NotEnoughMemory):
+            create_array((4, 5, 6))
+
+
+def test_copy_of_scratch_backed_images_stays_in_scratch():
+    images = Images(create_array((4, 5, 6), use_scratch=True))
+    images.data[:] = 3
+    copy = images.copy(flip_axes=True)
+    assert copy.is_scratch_backed
+    assert np.all(copy.data == 3)
+    assert not Images(create_array((4, 5, 6))).is_scratch_backed
@@ -0,0 +1,108 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+
+import pickle
+import time
+from multiprocessing.reduction import ForkingPickler
+from unittest import mock
+
+import numpy as np
+
+from mantidimaging.core.parallel import shared as ps
+from mantidimaging.core.parallel.utility import _create_shared_array
+
+
+def _fill(data, values):
+    data[:] = 5
+    values[:] = 0
+
+
+def _double(data):
+    return data * 2
+
+
+def test_execution_context_sends_shared_arrays_by_reference():
+    arr = _create_shared_array((10, 10, 10))
+    values = np.ones(3)
+    context = pickle.loads(ForkingPickler.dumps(ps.ExecutionContext([arr[2:5, :, 3], values])))
+
+    task = ps._ContextTask(context, ps.create_partial(_fill, ps.inplace2))
+    task(slice(None))
+
+    assert np.all(arr[2:5, :, 3] == 5)
+    assert arr.sum() == 5 * 3 * 10
+    # anything that is not in shared memory is only copied
+    assert np.all(values == 1)
+
+
+def test_execution_context_sends_other_items_once():
+    values = np.arange(100000.0)
+    context = ps.ExecutionContext([values, ["file_1.tif", "file_2.tif"]])
+
+    # the items are pickled into shared memory when the context is first sent, not with every task
+    sent = ForkingPickler.dumps(context)
+    assert len(sent) < 1000
+    assert len(ForkingPickler.dumps(context)) == len(sent)
+
+    received = pickle.loads(sent)
+    shared_list = received.get_shared_list()
+    ps._attached_lists.done(received.id)
+    assert np.array_equal(shared_list[0], values)
+    assert shared_list[1] == ["file_1.tif", "file_2.tif"]
+
+
+def test_forwarding_functions_use_the_list_of_their_execution():
+    first = np.arange(4.0)
+    second = np.zeros(4)
+    ps.execute(ps.create_partial(_double, ps.return_to_second_at_i), 4, cores=1, shared_list=[first, second])
+    assert np.array_equal(second, first * 2)
+
+    # the list is only in use while the execution is running
+    assert ps._current.shared_list == []
+
+
+def test_return_to_second_replaces_element_of_the_list():
+    shared_list = [np.ones((1, 3)), None]
+    ps.execute(ps.create_partial(_double, ps.return_to_second), 1, cores=1, shared_list=shared_list)
+    assert np.array_equal(shared_list[1], np.full(3, 2))
+
+
+def test_idle_attached_lists_are_released():
+    attached_lists = ps._AttachedLists()
+    with mock.patch.object(ps, "RELEASE_AFTER_SECONDS", 0.05):
+        attached_lists.get("running", [1])
+        attached_lists.get("finished", [2])
+        attached_lists.done("finished")
+        time.sleep(0.2)
+        assert len(attached_lists) == 1
+        attached_lists.done("running")
+        time.sleep(0.2)
+        assert len(attached_lists) == 0
+
+
+def _add_half_checking_dtype(data):
+    assert data.dtype == np.float32
+    data += 0.5
+
+
+def test_reduced_precision_images_are_upcast_one_at_a_time():
+    data = _create_shared_array((4, 3, 3), np.float16)
+
+    ps.execute(ps.create_partial(_add_half_checking_dtype, ps.inplace1), data.shape[0], cores=1, shared_list=[data])
+    ps.execute(ps.create_partial(_double, ps.return_to_self), data.shape[0], cores=1, shared_list=[data])
+
+    assert data.dtype == np.float16
+    assert np.all(data == 1)
+
+
+def test_stored_type_forwarding_is_not_upcast():
+    data = np.zeros((2, 3), np.float16)
+    out = np.ones((2, 3), np.float16)
+
+    def _check(first, second):
+        assert first.dtype == second.dtype == np.float16
+        second[:] = first
+
+    task = ps._ContextTask(ps.ExecutionContext([data, out]), ps.create_partial(_check, ps.inplace2_stored))
+    task(slice(None))
+    assert np.all(out == 0)
@@ -1,13 +1,19 @@
 # Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
 # SPDX - License - Identifier: GPL-3.0-or-later
 
+import subprocess
+import sys
+
 import numpy as np
 from typing import List, Tuple, Union
 from unittest import mock
 
 import pytest
 
-from mantidimaging.core.parallel.utility import _create_shared_array, execute_impl, multiprocessing_necessary
+from mantidimaging.core.parallel import allocator
+from mantidimaging.core.parallel.utility import (_create_shared_array, attach_array, calculate_batch_size,
+                                                 execute_batched_impl, execute_impl, get_descriptor,
+                                                 multiprocessing_necessary)
 
 
 @pytest.mark.parametrize(
@@ -30,27 +36,122 @@ def test_correctly_chooses_parallel(shape: Union[int, List, Tuple[int, int, int]
     assert multiprocessing_necessary(shape, cores) is should_be_parallel
 
 
-@mock.patch('mantidimaging.core.parallel.utility.Pool')
-def test_execute_impl_one_core(mock_pool):
+@mock.patch('mantidimaging.core.parallel.backends.manager')
+def test_execute_impl_one_core(mock_manager):
     mock_partial = mock.Mock()
     mock_progress = mock.Mock()
     execute_impl(1, mock_partial, 1, 1, mock_progress, "Test")
     mock_partial.assert_called_once_with(0)
     mock_progress.update.assert_called_once_with(1, "Test")
+    mock_manager.acquire.assert_not_called()
 
 
-@mock.patch('mantidimaging.core.parallel.utility.Pool')
-def test_execute_impl_par(mock_pool):
+@mock.patch('mantidimaging.core.parallel.backends.manager')
+def test_execute_impl_par(mock_manager):
     mock_partial = mock.Mock()
     mock_progress = mock.Mock()
     mock_pool_instance = mock.Mock()
     mock_pool_instance.imap.return_value = range(15)
-    mock_pool.return_value.__enter__.return_value = mock_pool_instance
+    mock_manager.acquire.return_value.__enter__.return_value = mock_pool_instance
     execute_impl(15, mock_partial, 10, 1, mock_progress, "Test")
+    mock_manager.acquire.assert_called_once_with(10)
     mock_pool_instance.imap.assert_called_once()
     assert mock_progress.update.call_count == 15
 
 
+@pytest.mark.parametrize(
+    'seconds_per_image,img_num,cores,expected',
+    (
+        [0.001, 1000, 4, 50],  # enough images to reach the target time per batch
+        [0.0001, 1000, 4, 63],  # limited so every core gets several batches
+        [1.0, 1000, 4, 1],  # slow images are sent one at a time
+        [0, 100, 1, 25],  # too fast to measure
+        [0.001, 3, 8, 1],
+    ))
+def test_calculate_batch_size(seconds_per_image, img_num, cores, expected):
+    assert calculate_batch_size(seconds_per_image, img_num, cores) == expected
+
+
+def _covered_indices(calls) -> List[int]:
+    indices: List[int] = []
+    for call in calls:
+        batch = call.args[0]
+        assert isinstance(batch, slice)
+        indices.extend(range(batch.start, batch.stop))
+    return indices
+
+
+@mock.patch('mantidimaging.core.parallel.backends.manager')
+def test_execute_batched_impl_one_core(mock_manager):
+    mock_partial = mock.Mock()
+    mock_progress = mock.Mock()
+    execute_batched_impl(10, mock_partial, 1, mock_progress, "Test")
+    mock_partial.assert_any_call(slice(0, 1))
+    assert _covered_indices(mock_partial.call_args_list) == list(range(10))
+    assert sum(call.args[0] for call in mock_progress.update.call_args_list) == 10
+    mock_manager.acquire.assert_not_called()
+
+
+@mock.patch('mantidimaging.core.parallel.backends.manager')
+def test_execute_batched_impl_par(mock_manager):
+    mock_partial = mock.Mock()
+    mock_progress = mock.Mock()
+    mock_pool_instance = mock.Mock()
+    mock_pool_instance.imap.side_effect = lambda func, batches, chunksize: [None] * len(batches)
+    mock_manager.acquire.return_value.__enter__.return_value = mock_pool_instance
+    execute_batched_impl(100, mock_partial, 4, mock_progress, "Test")
+
+    mock_partial.assert_called_once_with(slice(0, 1))
+    batches = mock_pool_instance.imap.call_args.args[1]
+    assert _covered_indices([mock.call(batch) for batch in batches]) == list(range(1, 100))
+    assert sum(call.args[0] for call in mock_progress.update.call_args_list) == 100
+
+
+def test_non_shared_array_has_no_descriptor():
+    assert get_descriptor(np.zeros((3, 3))) is None
+
+
+def test_attach_array_by_descriptor():
+    arr = _create_shared_array((4, 5, 6), np.uint16)
+    descriptor = get_descriptor(arr)
+    assert descriptor.shape == (4, 5, 6)
+    assert np.dtype(descriptor.dtype) == np.uint16
+
+    attached = attach_array(descriptor)
+    attached[1] = 3
+    assert np.all(arr[1] == 3)
+    assert arr.sum() == 3 * 5 * 6
+
+
+def test_attach_view_by_descriptor():
+    arr = _create_shared_array((4, 5, 6))
+    view = np.swapaxes(arr, 0, 1)[2]
+    attached = attach_array(get_descriptor(view))
+    attached[:] = 1
+    assert np.all(arr[:, 2] == 1)
+    assert arr.sum() == 4 * 6
+
+
+def test_attach_array_from_unrelated_process():
+    arr = _create_shared_array((4, 5, 6))
+    script = ("import sys; from mantidimaging.core.parallel.utility import attach_array, SharedArrayDescriptor; "
+              f"attach_array(SharedArrayDescriptor(*{tuple(get_descriptor(arr))!r}))[:] = 7")
+    subprocess.run([sys.executable, "-c", script], check=True)
+
+    assert np.all(arr == 7)
+    # the other process must not have destroyed the shared memory when it exited
+    assert np.all(attach_array(get_descriptor(arr)) == 7)
+
+
+def test_shared_memory_freed_with_array_once_pool_trimmed():
+    arr = _create_shared_array((4, 5, 6))
+    descriptor = get_descriptor(arr)
+    del arr
+    allocator.trim()
+    with pytest.raises(FileNotFoundError):
+        attach_array(descriptor)
+
+
 @pytest.mark.parametrize('dtype,expected_dtype', [
     [np.uint8, np.uint8],
     ['uint8', np.uint8],
@@ -1,90 +1,186 @@
 # Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
 # SPDX - License - Identifier: GPL-3.0-or-later
 
-import ctypes
+import math
 import multiprocessing
 import os
-from functools import partial
+import time
+import weakref
+from collections import namedtuple
 from logging import getLogger
-# COMPAT python 3.7 : Using heap instead of Array,
-# see https://github.com/mantidproject/mantidimaging/pull/762#issuecomment-741663482
-from multiprocessing import heap  # type: ignore
-from multiprocessing.pool import Pool
-from typing import Any, List, Tuple, Type, Union
+from multiprocessing import resource_tracker  # type: ignore
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, List, Optional, Sequence, Tuple, Type, Union
 
 import numpy as np
 
-from mantidimaging.core.utility.memory_usage import system_free_memory
+from mantidimaging.core.parallel import allocator, backends, budget, numa, scheduling, scratch
+from mantidimaging.core.parallel.backends import Backend
+from mantidimaging.core.utility.memory_usage import NotEnoughMemory, system_free_memory
 from mantidimaging.core.utility.progress_reporting import Progress
 from mantidimaging.core.utility.size_calculator import full_size_KB
 
 LOG = getLogger(__name__)
 
-SimpleCType = Union[Type[ctypes.c_uint8], Type[ctypes.c_uint16], Type[ctypes.c_int32], Type[ctypes.c_int64],
-                    Type[ctypes.c_float], Type[ctypes.c_double]]
+NP_DTYPE = Union[Type[np.generic], np.dtype, str]
 
-NP_DTYPE = Type[np.single]
+# Batched executions aim for each range of images to take at least this many seconds to process,
+# so that the cost of sending it to a worker and reporting it back is insignificant in comparison
+BATCH_TARGET_SECONDS = 0.05
+# Each worker is still handed at least this many ranges, so that the workers finish at about the same time
+MIN_BATCHES_PER_CORE = 4
+
+# Where POSIX shared memory is allocated on Linux. Writing past its capacity kills the process with SIGBUS
+SHARED_MEMORY_DIR = "/dev/shm"
+
+# Everything needed to attach to a shared array from another process.
+# The offset and strides allow describing views into the shared memory, not only whole arrays
+SharedArrayDescriptor = namedtuple('SharedArrayDescriptor', ['name', 'shape', 'dtype', 'offset', 'strides'])
+# The same for arrays in scratch files, see `scratch`
+ScratchArrayDescriptor = namedtuple('ScratchArrayDescriptor', ['path', 'shape', 'dtype', 'offset', 'strides'])
+ARRAY_DESCRIPTORS = (SharedArrayDescriptor, ScratchArrayDescriptor)
 
 
 def enough_memory(shape, dtype):
     return full_size_KB(shape=shape, axis=0, dtype=dtype) < system_free_memory().kb()
 
 
-def create_array(shape: Tuple[Any, ...], dtype: NP_DTYPE = np.float32) -> np.ndarray:
+def enough_shared_memory_space(size: int) -> bool:
+    if not os.path.isdir(SHARED_MEMORY_DIR):
+        return True
+    stats = os.statvfs(SHARED_MEMORY_DIR)
+    return size <= stats.f_bavail * stats.f_frsize
+
+
+def create_array(shape: Tuple[Any, ...],
+                 dtype: NP_DTYPE = np.float32,
+                 first_touch: bool = False,
+                 use_scratch: bool = False,
+                 zeroed: bool = False) -> np.ndarray:
     """
-    Create an array, either in a memory file (if name provided), or purely in memory (if name is None)
+    Create an array in named shared memory, which can be accessed by the worker processes
+    and by any other process, see `get_descriptor` and `attach_array`.
+
+    If there is not enough memory for it, the array is made in a scratch file instead, see `scratch`.
 
     :param shape: Shape of the array
     :param dtype: Dtype of the array
-    :param name: Name of the shared memory array. If None, a non-shared array will be created
-    :param random_name: Whether to randomise the name. Will discard anything in the `name` parameter
+    :param first_touch: On NUMA machines, zero the array from the worker processes, so that each block
+                        of images is placed in the memory of the node that will process it, see `numa.first_touch`
+    :param use_scratch: Make the array in a scratch file, even if there is enough memory for it
+    :param zeroed: Zero the array. Only needed if it is not going to be overwritten, as the shared memory
+                   of a new array can be reused from an old one, and then still holds its values, see `allocator`
     :return: The created Numpy array
+    :raises NotEnoughMemory: If the array does not fit in memory, or in the memory budget, see `budget.reserve`,
+                             and cannot be made in a scratch file
     """
-    if not enough_memory(shape, dtype):
-        raise RuntimeError(
-            "The machine does not have enough physical memory available to allocate space for this data.")
+    dtype = np.dtype(dtype)
+    if use_scratch:
+        return scratch.create_array(shape, dtype)
+
+    size = int(np.prod(shape)) * dtype.itemsize
+    zero_from_workers = first_touch and numa.is_numa_aware()
+    try:
+        with budget.allocation(allocator.block_size(size)):
+            data = _create_checked_array(shape, dtype, size, zeroed and not zero_from_workers)
+    except NotEnoughMemory as e:
+        if not scratch.fallback_to_scratch():
+            raise
+        LOG.warning(f"{e} Making the array in a scratch file in {scratch.scratch_dir()} instead.")
+        return scratch.create_array(shape, dtype)
 
-    return _create_shared_array(shape, dtype)
+    if zero_from_workers:
+        numa.first_touch(data)
+    return data
 
 
-def _create_shared_array(shape, dtype: Union[str, np.dtype] = np.float32):
-    ctype: SimpleCType = ctypes.c_float  # default to numpy float32 / C type float
-    if dtype == np.uint8 or dtype == 'uint8':
-        ctype = ctypes.c_uint8
-        dtype = np.uint8
-    elif dtype == np.uint16 or dtype == 'uint16':
-        ctype = ctypes.c_uint16
-        dtype = np.uint16
-    elif dtype == np.int32 or dtype == 'int32':
-        ctype = ctypes.c_int32
-        dtype = np.int32
-    elif dtype == np.int64 or dtype == 'int64':
-        ctype = ctypes.c_int64
-        dtype = np.int64
-    elif dtype == np.float32 or dtype == 'float32':
-        ctype = ctypes.c_float
-        dtype = np.float32
-    elif dtype == np.float64 or dtype == 'float64':
-        ctype = ctypes.c_double
-        dtype = np.float64
+def _create_checked_array(shape: Tuple[Any, ...], dtype: NP_DTYPE, size: int, zeroed: bool = False) -> np.ndarray:
+    if not allocator.is_pooled(size):
+        if not enough_memory(shape, dtype) or not enough_shared_memory_space(size):
+            # the unused blocks kept for reuse take up both, free them before giving up
+            allocator.trim()
 
-    length = 1
-    for axis_length in shape:
-        length *= axis_length
+        if not enough_memory(shape, dtype):
+            raise NotEnoughMemory(
+                "The machine does not have enough physical memory available to allocate space for this data.")
 
-    size = ctypes.sizeof(ctype(1)) * length
+        if not enough_shared_memory_space(size):
+            raise NotEnoughMemory(f"There is not enough space in {SHARED_MEMORY_DIR} to allocate this data. "
+                                  f"Its size can be increased by remounting it, or in the Docker run options.")
 
-    LOG.info('Requested shared array with shape={}, length={}, size={}, ' 'dtype={}'.format(shape, length, size, dtype))
+    return _create_shared_array(shape, dtype, zeroed)
 
-    arena = heap.Arena(size)
-    mem = memoryview(arena.buffer)
 
-    array_type = ctype * length
-    array = array_type.from_buffer(mem)
+def _create_shared_array(shape, dtype: Union[str, np.dtype, NP_DTYPE] = np.float32, zeroed: bool = False) -> np.ndarray:
+    dtype = np.dtype(dtype)
+    size = int(np.prod(shape)) * dtype.itemsize
 
-    data = np.frombuffer(array, dtype=dtype)
+    LOG.info(f'Requested shared array with shape={shape}, size={size}, dtype={dtype}')
 
-    return data.reshape(shape)
+    data, is_new = allocator.allocate(shape, dtype)
+    if not is_new:
+        LOG.debug(f'Reused an unused shared memory block for shape={shape}')
+        if zeroed:
+            data.fill(0)
+    return data
+
+
+def get_descriptor(data: np.ndarray) -> Optional[Union[SharedArrayDescriptor, ScratchArrayDescriptor]]:
+    """
+    Describes where the array is in shared memory, or in a scratch file, so that another process can attach to it.
+
+    The array must stay alive in this process while it is being used elsewhere,
+    as the shared memory is reused or freed once it is garbage collected.
+
+    :param data: An array created by `create_array`, or a view into one
+    :return: The descriptor, or None if the array is not in shared memory or a scratch file
+    """
+    if data.size == 0:
+        return None
+    data_address = data.__array_interface__['data'][0]
+    block = allocator.find_block(data)
+    if block is not None:
+        name, _, address = block
+        return SharedArrayDescriptor(name, data.shape, data.dtype.str, data_address - address, data.strides)
+    scratch_file = scratch.find_file(data)
+    if scratch_file is not None:
+        path, address = scratch_file
+        return ScratchArrayDescriptor(path, data.shape, data.dtype.str, data_address - address, data.strides)
+    return None
+
+
+def attach_array(descriptor: Union[SharedArrayDescriptor, ScratchArrayDescriptor], track: bool = False) -> np.ndarray:
+    """
+    Attaches to a shared array by name. The shared memory is mapped for as long as the returned array is alive.
+
+    :param descriptor: The descriptor of the array, from `get_descriptor` in the process that owns it
+    :param track: Whether this process' resource tracker should also track the shared memory.
+                  This should only be True in processes started by the owner, as tracking it from
+                  an unrelated process would destroy it when that process exits.
+    """
+    if isinstance(descriptor, ScratchArrayDescriptor):
+        return scratch.attach_array(descriptor.path, descriptor.shape, descriptor.dtype, descriptor.offset,
+                                    descriptor.strides)
+    shared_memory = _open_shared_memory(descriptor.name, track)
+    data: np.ndarray = np.ndarray(descriptor.shape,
+                                  descriptor.dtype,
+                                  buffer=shared_memory.buf,
+                                  offset=descriptor.offset,
+                                  strides=descriptor.strides)
+    weakref.finalize(data, shared_memory.close)
+    return data
+
+
+def _open_shared_memory(name: str, track: bool) -> SharedMemory:
+    if track:
+        return SharedMemory(name)
+    try:
+        # COMPAT python 3.12 : Tracking attached memory can only be disabled from 3.13
+        return SharedMemory(name, track=False)  # type: ignore
+    except TypeError:
+        shared_memory = SharedMemory(name)
+        resource_tracker.unregister(shared_memory._name, "shared_memory")  # type: ignore
+        return shared_memory
 
 
 def get_cores():
@@ -97,6 +193,44 @@ def calculate_chunksize(cores):
     return 1
 
 
+class Batches(Sequence):
+    """
+    The contiguous slices of a range of images, e.g. `slice(1, 5), slice(5, 9), slice(9, 10)`.
+    Kept as a sequence rather than a list, so that it stays small when sent to the workers.
+    """
+    def __init__(self, start: int, stop: int, size: int):
+        self.start = start
+        self.stop = stop
+        self.size = size
+
+    def __len__(self) -> int:
+        return max(0, math.ceil((self.stop - self.start) / self.size))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Batch {index} out of range")
+        start = self.start + index * self.size
+        return slice(start, min(start + self.size, self.stop))
+
+
+def calculate_batch_size(seconds_per_image: float, img_num: int, cores: int) -> int:
+    """
+    Calculates how many contiguous images to hand to a worker at once.
+
+    :param seconds_per_image: Measured time it takes to process a single image
+    :param img_num: Total number of images
+    :param cores: Number of workers the images are shared between
+    """
+    balanced_size = math.ceil(img_num / (cores * MIN_BATCHES_PER_CORE))
+    if seconds_per_image <= 0:
+        return max(1, balanced_size)
+    return max(1, min(math.ceil(BATCH_TARGET_SECONDS / seconds_per_image), balanced_size))
+
+
 def multiprocessing_necessary(shape: Union[int, Tuple[int, int, int], List], cores) -> bool:
     # This environment variable will be present when running PYDEVD from PyCharm
     # and that has the bug that multiprocessing Pools can never finish `.join()` ing
@@ -121,16 +255,82 @@ def multiprocessing_necessary(shape: Union[int, Tuple[int, int, int], List], cor
     return True
 
 
-def execute_impl(img_num: int, partial_func: partial, cores: int, chunksize: int, progress: Progress, msg: str):
+def execute_impl(img_num: int,
+                 partial_func: Callable,
+                 cores: int,
+                 chunksize: int,
+                 progress: Progress,
+                 msg: str,
+                 backend: Backend = backends.DEFAULT_BACKEND):
     task_name = f"{msg} {cores}c {chunksize}chs"
     progress = Progress.ensure_instance(progress, num_steps=img_num, task_name=task_name)
     indices_list = range(img_num)
-    if multiprocessing_necessary(img_num, cores):
-        with Pool(cores) as pool:
-            for _ in pool.imap(partial_func, indices_list, chunksize=chunksize):
-                progress.update(1, msg)
-    else:
-        for ind in indices_list:
-            partial_func(ind)
+    if backend != Backend.SERIAL and not multiprocessing_necessary(img_num, cores):
+        backend = Backend.SERIAL
+    with backends.mapper(backend, cores, chunksize) as imap:
+        for _ in imap(partial_func, indices_list):
             progress.update(1, msg)
     progress.mark_complete()
+
+
+def execute_batched_impl(img_num: int,
+                         partial_func: Callable,
+                         cores: int,
+                         progress: Progress,
+                         msg: str,
+                         backend: Backend = backends.DEFAULT_BACKEND):
+    """
+    Calls the function with slices of contiguous images, instead of with single indices.
+
+    The first image is processed in this process and timed, and the size of the
+    slices for the rest of the images is calculated from that.
+    """
+    progress = Progress.ensure_instance(progress, num_steps=img_num, task_name=f"{msg} {cores}c batched")
+    if img_num > 0:
+        start_time = time.perf_counter()
+        partial_func(slice(0, 1))
+        seconds_per_image = time.perf_counter() - start_time
+        progress.update(1, msg)
+
+        if backend != Backend.SERIAL and not multiprocessing_necessary(img_num, cores):
+            backend = Backend.SERIAL
+        batch_size = calculate_batch_size(seconds_per_image, img_num, cores if backend != Backend.SERIAL else 1)
+        batches = Batches(1, img_num, batch_size)
+        LOG.info(f"Processing {img_num} images in batches of {batch_size}, "
+                 f"measured {seconds_per_image:.6f}s for a single image")
+
+        with backends.mapper(backend, cores) as imap:
+            for batch, _ in zip(batches, imap(partial_func, batches)):
+                progress.update(batch.stop - batch.start, msg)
+    progress.mark_complete()
+
+
+def execute_guided_impl(img_num: int,
+                        partial_func: Callable,
+                        cores: int,
+                        progress: Progress,
+                        msg: str,
+                        backend: Backend = backends.DEFAULT_BACKEND,
+                        batched: bool = False):
+    """
+    Hands out the images in chunks that shrink towards the end of the execution, see `scheduling`.
+    Logs how busy each worker was, and keeps the report in `scheduling.last_report`.
+    """
+    progress = Progress.ensure_instance(progress, num_steps=img_num, task_name=f"{msg} {cores}c guided")
+    if backend != Backend.SERIAL and not multiprocessing_necessary(img_num, cores):
+        backend = Backend.SERIAL
+    if backend == Backend.SERIAL and not batched:
+        # nothing is sent anywhere, so the progress can be reported for every image
+        chunks = [slice(index, index + 1) for index in range(img_num)]
+    else:
+        chunks = scheduling.guided_chunks(0, img_num, cores if backend != Backend.SERIAL else 1)
+
+    report = scheduling.UtilisationReport()
+    with backends.mapper(backend, cores) as imap:
+        for chunk, stats in zip(chunks, imap(scheduling.ChunkTask(partial_func, batched), chunks)):
+            report.add(stats)
+            progress.update(chunk.stop - chunk.start, msg)
+    report.finish()
+    scheduling.last_report = report
+    LOG.info(f"Utilisation of {msg or 'execution'}: {report}")
+    progress.mark_complete()
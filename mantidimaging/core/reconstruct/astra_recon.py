@@ -92,8 +92,11 @@ class AstraRecon(BaseRecon):
         def get_sumsq(image: np.ndarray) -> float:
             return np.sum(image**2)
 
+        # the same sinogram is reconstructed for every CoR tried, so it is only gathered into contiguous memory once
+        sino = np.ascontiguousarray(images.sino(slice_idx))
+
         def minimizer_function(cor):
-            return -get_sumsq(AstraRecon.single_sino(images.sino(slice_idx), ScalarCoR(cor), proj_angles, recon_params))
+            return -get_sumsq(AstraRecon.single_sino(sino, ScalarCoR(cor), proj_angles, recon_params))
 
         return minimize(minimizer_function, start_cor, method='nelder-mead', tol=0.1).x[0]
 
@@ -124,9 +127,16 @@ class AstraRecon(BaseRecon):
         output_images.record_operation('AstraRecon.full', 'Volume Reconstruction', **recon_params.to_dict())
 
         proj_angles = images.projection_angles(recon_params.max_projection_angle)
-        for i in range(images.height):
-            output_images.data[i] = AstraRecon.single_sino(images.sino(i), cors[i], proj_angles, recon_params)
-            progress.update(1, "Reconstructed slice")
+        # a mirror built here is as big as the stack, so it is only kept while the slices are reconstructed
+        had_mirror = images.has_sinogram_mirror
+        images.build_sinogram_mirror()
+        try:
+            for i in range(images.height):
+                output_images.data[i] = AstraRecon.single_sino(images.sino(i), cors[i], proj_angles, recon_params)
+                progress.update(1, "Reconstructed slice")
+        finally:
+            if not had_mirror:
+                images.drop_sinogram_mirror()
 
         return output_images
 
@@ -13,7 +13,8 @@ from mantidimaging.core.utility.progress_reporting import Progress
 class BaseRecon:
     @staticmethod
     def sino_recon_prep(sino: np.ndarray):
-        return -np.log(sino)
+        # reduced precision stacks are reconstructed in full precision
+        return -np.log(sino, dtype=np.float32) if sino.dtype == np.float16 else -np.log(sino)
 
     @staticmethod
     def single_sino(sino: np.ndarray, cor: ScalarCoR, proj_angles: ProjectionAngles,
@@ -137,3 +137,5 @@ class LoadingParameters:
     name: str
     dtype: str
     sinograms: bool
+    # Only decode the sample images when they are accessed
+    lazy: bool = False
@@ -9,6 +9,21 @@ from logging import getLogger
 # to the point of being unusable
 MEMORY_CAP_PERCENTAGE = 0.025
 
+# Fraction of the system total that the shared arrays of Mantid Imaging can take up altogether,
+# including the extra memory reserved by operations that are running, see core.parallel.budget
+MEMORY_BUDGET_FRACTION = 0.8
+
+# Fraction of the memory budget that the main window keeps available, by compressing the stacks that are not in use
+COMPRESS_BELOW_FRACTION = 0.25
+
+# Fraction of the memory budget that the main window keeps available, by moving the stacks that have not been
+# used for the longest into scratch files, once compressing them has not freed up enough memory
+EVICT_BELOW_FRACTION = 0.1
+
+
+class NotEnoughMemory(RuntimeError):
+    pass
+
 
 def system_free_memory():
     class Value:
@@ -27,6 +42,15 @@ def system_free_memory():
     return Value(meminfo.available - meminfo.total * MEMORY_CAP_PERCENTAGE)
 
 
+def system_total_memory() -> int:
+    """
+    :return: The total physical memory of the system in bytes
+    """
+    import psutil
+
+    return psutil.virtual_memory().total
+
+
 def get_memory_usage_linux(kb=False, mb=False):
     """
     :param kb: Return the value in Kilobytes
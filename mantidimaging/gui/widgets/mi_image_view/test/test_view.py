@@ -0,0 +1,34 @@
+# Copyright (C) 2020 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+
+import unittest
+from unittest import mock
+
+import numpy as np
+from PyQt5 import sip
+
+from mantidimaging.core.data.lazy_stack import LazyStack
+from mantidimaging.gui.widgets.mi_image_view.view import MIImageView
+from mantidimaging.test_helpers import start_qapplication
+
+
+@start_qapplication
+class MIImageViewTest(unittest.TestCase):
+    def setUp(self):
+        self.view = MIImageView()
+
+    def tearDown(self):
+        sip.delete(self.view)  # type: ignore
+
+    def test_set_image_decodes_only_shown_image(self):
+        load_func = mock.Mock(side_effect=lambda index: np.full((8, 10), index, dtype=np.float32))
+        stack = LazyStack(list(range(20)), load_func, (8, 10), np.float32)
+
+        self.view.setImage(stack)
+
+        self.assertFalse(stack.is_materialised)
+        load_func.assert_called_once_with(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
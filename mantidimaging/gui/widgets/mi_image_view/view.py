@@ -9,6 +9,7 @@ from PyQt5.QtWidgets import QApplication, QHBoxLayout, QLabel, QPushButton, QSiz
 from pyqtgraph import ROI, ImageItem, ImageView
 from pyqtgraph.GraphicsScene.mouseEvents import HoverEvent
 
+from mantidimaging.core.data.lazy_stack import LazyStack
 from mantidimaging.core.utility.close_enough_point import CloseEnoughPoint
 from mantidimaging.core.utility.sensible_roi import SensibleROI
 from mantidimaging.gui.widgets.mi_image_view.presenter import MIImagePresenter
@@ -134,6 +135,15 @@ class MIImageView(ImageView):
         if self.roi_changed_callback and roi is not None:
             self.roi_changed_callback(roi)
 
+    def quickMinMax(self, data):
+        """
+        Re-implements quickMinMax to estimate the levels of lazy stacks from the current image only,
+        as sampling the whole stack would decode all of it
+        """
+        if isinstance(data, LazyStack) and not data.is_materialised:
+            data = data[self.currentIndex]
+        return super().quickMinMax(data)
+
     def timeLineChanged(self):
         """
         Re-implements timeLineChanged function, and the only change
@@ -155,15 +165,19 @@ class MIImageView(ImageView):
         # image indices are in order [Z, X, Y]
         left, right = roi_pos.x, roi_pos.x + roi_size.x
         top, bottom = roi_pos.y, roi_pos.y + roi_size.y
-        data = self.image[:, top:bottom, left:right]
-        if data is not None:
-            while data.ndim > 1:
-                data = data.mean(axis=1)
-            if len(self.roiCurves) == 0:
-                self.roiCurves.append(self.ui.roiPlot.plot())
-            self.roiCurves[0].setData(y=data, x=self.tVals)
-        self.roiString = f"({left}, {top}, {right}, {bottom}) | " \
-                         f"region avg={data[int(self.timeLine.value())].mean():.6f}"
+        if isinstance(self.image, LazyStack) and not self.image.is_materialised:
+            # the average of the region in every image would decode all of them, so only the shown one is used
+            region_avg = self.image[self.currentIndex][top:bottom, left:right].mean()
+        else:
+            data = self.image[:, top:bottom, left:right]
+            if data is not None:
+                while data.ndim > 1:
+                    data = data.mean(axis=1)
+                if len(self.roiCurves) == 0:
+                    self.roiCurves.append(self.ui.roiPlot.plot())
+                self.roiCurves[0].setData(y=data, x=self.tVals)
+            region_avg = data[int(self.timeLine.value())].mean()
+        self.roiString = f"({left}, {top}, {right}, {bottom}) | region avg={region_avg:.6f}"
         return SensibleROI(left, top, right, bottom)
 
     def extend_roi_plot_mouse_press_handler(self):
@@ -62,6 +62,8 @@ class LoadPresenter:
 
         sample_filename = self.view.sample.file()
         self.image_format = get_file_extension(sample_filename)
+        # NeXus files are always loaded straight away, see nexus_loader
+        self.view.load_on_demand.setEnabled(self.image_format != 'nxs')
 
         filename = self.view.sample.path_text()
         dirname = self.view.sample.directory()
@@ -168,6 +170,7 @@ class LoadPresenter:
 
         lp.dtype = self.view.pixel_bit_depth.currentText()
         lp.sinograms = self.view.images_are_sinograms.isChecked()
+        lp.lazy = self.view.load_on_demand.isEnabled() and self.view.load_on_demand.isChecked()
         lp.pixel_size = self.view.pixelSize.value()
 
         return lp
@@ -79,6 +79,7 @@ class LoadDialogPresenterTest(unittest.TestCase):
         self.assertEqual(selected_file, self.v.sample.path)
         self.v.sample.widget.setExpanded.assert_called_once_with(True)
         self.assertEqual(image_format, self.p.image_format)
+        self.v.load_on_demand.setEnabled.assert_called_once_with(True)
         get_file_extension.assert_called_once_with(sample_file_name)
         get_prefix.assert_called_once_with(path_text)
         read_in_file_information.assert_called_once_with(dirname, in_prefix=prefix, in_format=image_format)
@@ -115,6 +116,14 @@ class LoadDialogPresenterTest(unittest.TestCase):
         mock_load_log.assert_called_once()
         mock_log.raise_if_angle_missing.assert_called_once()
 
+    @mock.patch("mantidimaging.gui.windows.load_dialog.presenter.read_in_file_information",
+                side_effect=RuntimeError)
+    @mock.patch("mantidimaging.gui.windows.load_dialog.presenter.get_file_extension", return_value="nxs")
+    def test_do_update_sample_nexus_not_loaded_on_demand(self, _, __):
+        self.p.do_update_sample()
+
+        self.v.load_on_demand.setEnabled.assert_called_once_with(False)
+
     def test_do_update_flat_or_dark_returns_without_setting_anything(self):
         file_name = None
         name = "Name"
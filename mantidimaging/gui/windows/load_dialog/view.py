@@ -18,6 +18,7 @@ class MWLoadDialog(Qt.QDialog):
     tree: QTreeWidget
     pixel_bit_depth: QComboBox
     images_are_sinograms: QCheckBox
+    load_on_demand: QCheckBox
 
     pixelSize: QSpinBox
 
@@ -2,16 +2,18 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 import os
 import uuid
-from collections import namedtuple
+from collections import OrderedDict, namedtuple
 from logging import getLogger
-from typing import Any, Dict, List, Optional
+from typing import Any, Collection, Dict, List, Optional
 
 from PyQt5.QtWidgets import QDockWidget
 
 from mantidimaging.core.data import Images
 from mantidimaging.core.data.dataset import Dataset
 from mantidimaging.core.io import loader, saver
+from mantidimaging.core.parallel import budget
 from mantidimaging.core.utility.data_containers import LoadingParameters, ProjectionAngles
+from mantidimaging.core.utility.memory_usage import COMPRESS_BELOW_FRACTION, EVICT_BELOW_FRACTION
 from mantidimaging.gui.windows.stack_visualiser import StackVisualiserView
 
 StackId = namedtuple('StackId', ['id', 'name'])
@@ -23,9 +25,11 @@ class MainWindowModel(object):
         super(MainWindowModel, self).__init__()
 
         self.active_stacks: Dict[uuid.UUID, QDockWidget] = {}
+        # The stacks in the order they were last used, least recently used first
+        self._last_used: 'OrderedDict[uuid.UUID, None]' = OrderedDict()
 
     def do_load_stack(self, parameters: LoadingParameters, progress):
-        ds = Dataset(loader.load_p(parameters.sample, parameters.dtype, progress))
+        ds = Dataset(loader.load_p(parameters.sample, parameters.dtype, progress, parameters.lazy))
         ds.sample._is_sinograms = parameters.sinograms
         ds.sample.pixel_size = parameters.pixel_size
 
@@ -96,6 +100,7 @@ class MainWindowModel(object):
     def add_stack(self, stack_visualiser: StackVisualiserView, dock_widget: 'QDockWidget'):
         stack_visualiser.uuid = uuid.uuid1()
         self.active_stacks[stack_visualiser.uuid] = dock_widget
+        self._last_used[stack_visualiser.uuid] = None
         logger.debug(f"Active stacks: {self.active_stacks}")
 
     def get_stack(self, stack_uuid: uuid.UUID) -> QDockWidget:
@@ -114,11 +119,80 @@ class MainWindowModel(object):
 
         if not stack.presenter.images == images:
             stack.image_view.clear()
-            stack.image_view.setImage(images.data)
+            stack.image_view.setImage(images.display_data)
 
             # Free previous images stack before reassignment
             stack.presenter.images = images
 
+    def compress_inactive_stacks(self, in_use: Collection[uuid.UUID]) -> int:
+        """
+        Compresses the stacks that are not in use, largest first, while less than `COMPRESS_BELOW_FRACTION`
+        of the memory budget is available. They are decompressed again when they are next used as a whole.
+
+        :param in_use: The stacks that are being viewed or processed, which are left as they are
+        :return: The number of stacks that were compressed
+        """
+        if not _memory_below(COMPRESS_BELOW_FRACTION):
+            return 0
+        stacks = self._idle_stacks(in_use)
+        stacks.sort(key=lambda sv: sv.presenter.images.display_data.nbytes, reverse=True)
+        compressed = 0
+        for stack in stacks:
+            if not _memory_below(COMPRESS_BELOW_FRACTION):
+                break
+            if stack.presenter.images.compress():
+                _show_new_data(stack)
+                logger.info(f"Compressed stack {stack.name} to free up memory")
+                compressed += 1
+        return compressed
+
+    def evict_idle_stacks(self, in_use: Collection[uuid.UUID]) -> int:
+        """
+        Moves the stacks that have not been used for the longest into scratch files, while less than
+        `EVICT_BELOW_FRACTION` of the memory budget is available. They are moved back when they are used, see
+        `mark_used`.
+
+        :param in_use: The stacks that are being viewed or processed, which are left as they are
+        :return: The number of stacks that were evicted
+        """
+        if not _memory_below(EVICT_BELOW_FRACTION):
+            return 0
+        idle = {stack.uuid: stack for stack in self._idle_stacks(in_use)}
+        evicted = 0
+        for stack_uuid in self._last_used:
+            if not _memory_below(EVICT_BELOW_FRACTION):
+                break
+            stack = idle.get(stack_uuid)
+            if stack is None:
+                continue
+            images = stack.presenter.images
+            if images.evict():
+                _show_new_data(stack)
+                logger.info(f"Evicted stack {stack.name} of {images.display_data.nbytes // 1024**2} MB "
+                            f"to a scratch file, {budget.available_bytes() // 1024**2} MB of the "
+                            f"{budget.get_budget() // 1024**2} MB memory budget is now available")
+                evicted += 1
+        return evicted
+
+    def mark_used(self, stack_uuid: uuid.UUID):
+        """
+        Marks the stack as the most recently used one, and moves it back into memory if it was evicted.
+        """
+        if stack_uuid not in self.active_stacks:
+            return
+        self._last_used[stack_uuid] = None
+        self._last_used.move_to_end(stack_uuid)
+        stack = self.get_stack_visualiser(stack_uuid)
+        if stack is not None and stack.presenter.images.restore():
+            _show_new_data(stack)
+            logger.info(f"Restored stack {stack.name} from its scratch file")
+
+    def _idle_stacks(self, in_use: Collection[uuid.UUID]) -> List[StackVisualiserView]:
+        return [
+            dock.widget() for stack_uuid, dock in self.active_stacks.items()  # type:ignore
+            if stack_uuid not in in_use and dock.widget() is not None
+        ]
+
     def get_stack_by_name(self, search_name: str) -> Optional[QDockWidget]:
         for stack_id in self.stack_list:
             if stack_id.name == search_name:
@@ -159,6 +233,7 @@ class MainWindowModel(object):
         :param stack_uuid: The unique ID of the stack that will be removed.
         """
         del self.active_stacks[stack_uuid]
+        self._last_used.pop(stack_uuid, None)
 
     @property
     def have_active_stacks(self) -> bool:
@@ -192,3 +267,14 @@ class MainWindowModel(object):
         stack: StackVisualiserView = stack_dock.widget()  # type: ignore
         images: Images = stack.presenter.images
         images.set_projection_angles(proj_angles)
+
+
+def _memory_below(fraction: float) -> bool:
+    return budget.available_bytes() < budget.get_budget() * fraction
+
+
+def _show_new_data(stack: StackVisualiserView):
+    # the image view holds on to the previous array otherwise
+    index = stack.image_view.currentIndex
+    stack.image_view.setImage(stack.presenter.images.display_data)
+    stack.image_view.set_selected_image(index)
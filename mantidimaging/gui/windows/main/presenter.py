@@ -7,11 +7,13 @@ from logging import getLogger
 from typing import TYPE_CHECKING, Union, Tuple, Optional
 from uuid import UUID
 
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QDockWidget, QTabBar, QApplication
 
 from mantidimaging.core.data import Images
 from mantidimaging.core.data.dataset import Dataset
 from mantidimaging.core.io.loader.loader import create_loading_parameters_for_file_path
+from mantidimaging.core.parallel import allocator
 from mantidimaging.core.utility.data_containers import ProjectionAngles, LoadingParameters
 from mantidimaging.gui.dialogs.async_task import start_async_task_view
 from mantidimaging.gui.mvp_base import BasePresenter
@@ -35,6 +37,8 @@ class Notification(Enum):
 class MainWindowPresenter(BasePresenter):
     LOAD_ERROR_STRING = "Failed to load stack. Error: {}"
     SAVE_ERROR_STRING = "Failed to save stack. Error: {}"
+    # The widgets of a removed stack are deleted by the event loop, so its data is only expected to be freed after this
+    LEAK_REPORT_DELAY_MS = 1000
 
     view: 'MainWindowView'
 
@@ -60,6 +64,7 @@ class MainWindowPresenter(BasePresenter):
     def _do_remove_stack(self, uuid: UUID):
         self.model.do_remove_stack(uuid)
         self.view.active_stacks_changed.emit()
+        QTimer.singleShot(self.LEAK_REPORT_DELAY_MS, allocator.log_leak_report)
 
     def _do_rename(self, current_name: str, new_name: str):
         dock = self.model.get_stack_by_name(current_name)
@@ -107,9 +112,15 @@ class MainWindowPresenter(BasePresenter):
 
     def make_stack_window(self, images: Images, title) -> Tuple[QDockWidget, StackVisualiserView]:
         dock = self.view.create_stack_window(images, title=title)
-        stack_visualiser = dock.widget()
+        stack_visualiser: StackVisualiserView = dock.widget()  # type: ignore
+        dock.visibilityChanged.connect(lambda visible: self._on_stack_visibility_changed(stack_visualiser, visible))
         return dock, stack_visualiser
 
+    def _on_stack_visibility_changed(self, stack_visualiser: StackVisualiserView, visible: bool):
+        # the stack is only given its ID once it has been added to the model
+        if visible and getattr(stack_visualiser, 'uuid', None) is not None:
+            self.mark_stack_used(stack_visualiser.uuid)
+
     def _add_stack(self, images: Images, filename: str, sample_dock):
         name = self.model.create_name(os.path.basename(filename))
         dock, stack_visualiser = self.make_stack_window(images, title=f"{name}")
@@ -148,6 +159,34 @@ class MainWindowPresenter(BasePresenter):
                 tab_bar.setCurrentIndex(last_stack_pos)
 
         self.view.active_stacks_changed.emit()
+        # once Qt has shown the new stack, so that the stacks still being viewed are known
+        QTimer.singleShot(0, self.free_up_memory)
+
+    def mark_stack_used(self, stack_uuid: UUID):
+        """
+        Moves the stack back into memory if it was evicted, and keeps it there for longer than the stacks
+        that were used before it, see `MainWindowModel.mark_used`.
+        """
+        self.model.mark_used(stack_uuid)
+        QTimer.singleShot(0, self.free_up_memory)
+
+    def free_up_memory(self):
+        """
+        If memory is running low, compresses the stacks that are not being viewed, or processed in the operations
+        or reconstruction windows, and then moves those that have not been used for the longest into scratch files,
+        see `MainWindowModel.compress_inactive_stacks` and `MainWindowModel.evict_idle_stacks`.
+        """
+        in_use = {
+            sv.uuid
+            for sv in self.get_all_stack_visualisers() if sv is not None and not sv.visibleRegion().isEmpty()
+        }
+        processed = [
+            self.view.filters.presenter.stack if self.view.filters is not None else None,
+            self.view.recon.presenter.model.stack if self.view.recon is not None else None
+        ]
+        in_use.update(stack.uuid for stack in processed if stack is not None)
+        self.model.compress_inactive_stacks(in_use)
+        self.model.evict_idle_stacks(in_use)
 
     def save(self):
         kwargs = {
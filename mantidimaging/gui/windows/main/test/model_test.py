@@ -6,10 +6,14 @@ import uuid
 
 from unittest import mock
 import numpy as np
+from PyQt5 import sip
 
+import mantidimaging.test_helpers.unit_test_helper as th
 from mantidimaging.core.utility.data_containers import LoadingParameters, ProjectionAngles
+from mantidimaging.gui.widgets.mi_image_view.view import MIImageView
 from mantidimaging.gui.windows.main import MainWindowModel
-from mantidimaging.gui.windows.main.model import StackId
+from mantidimaging.gui.windows.main.model import StackId, _show_new_data
+from mantidimaging.test_helpers import start_qapplication
 
 
 class MainWindowModelTest(unittest.TestCase):
@@ -66,6 +70,64 @@ class MainWindowModelTest(unittest.TestCase):
         self.assertEqual(1, len(self.model._stack_names))
         self.assertEqual(expected_name, self.model._stack_names[0])
 
+    def _add_stacks_to_compress(self):
+        docks = {}
+        for nbytes in [10, 30, 20]:
+            dock = mock.Mock()
+            dock.widget.return_value.presenter.images.display_data.nbytes = nbytes
+            docks[uuid.uuid4()] = dock
+        self.model.active_stacks = docks
+        return list(docks.keys()), [dock.widget.return_value for dock in docks.values()]
+
+    @mock.patch('mantidimaging.gui.windows.main.model.budget')
+    def test_compress_inactive_stacks_largest_first(self, budget_mock):
+        uids, stacks = self._add_stacks_to_compress()
+        budget_mock.get_budget.return_value = 100
+        budget_mock.available_bytes.side_effect = [0, 0, 0, 50]
+
+        self.assertEqual(self.model.compress_inactive_stacks(in_use=[uids[2]]), 2)
+
+        stacks[1].presenter.images.compress.assert_called_once()
+        stacks[1].image_view.setImage.assert_called_once_with(stacks[1].presenter.images.display_data)
+        stacks[0].presenter.images.compress.assert_called_once()
+        stacks[2].presenter.images.compress.assert_not_called()
+
+    @mock.patch('mantidimaging.gui.windows.main.model.budget')
+    def test_evict_idle_stacks_least_recently_used_first(self, budget_mock):
+        uids, stacks = self._add_stacks_to_compress()
+        for uid, stack in zip(uids, stacks):
+            stack.uuid = uid
+            self.model._last_used[uid] = None
+        self.model.mark_used(uids[0])
+        budget_mock.get_budget.return_value = 100
+        budget_mock.available_bytes.side_effect = [0, 0, 50, 50, 50]
+
+        self.assertEqual(self.model.evict_idle_stacks(in_use=[]), 1)
+
+        stacks[1].presenter.images.evict.assert_called_once()
+        stacks[0].presenter.images.evict.assert_not_called()
+        stacks[2].presenter.images.evict.assert_not_called()
+
+    def test_mark_used_restores_evicted_stack(self):
+        uids, stacks = self._add_stacks_to_compress()
+        stacks[1].presenter.images.restore.return_value = True
+
+        self.model.mark_used(uids[1])
+
+        self.assertEqual(list(self.model._last_used)[-1], uids[1])
+        stacks[1].image_view.setImage.assert_called_once_with(stacks[1].presenter.images.display_data)
+
+    @mock.patch('mantidimaging.gui.windows.main.model.budget')
+    def test_compress_inactive_stacks_not_needed(self, budget_mock):
+        _, stacks = self._add_stacks_to_compress()
+        budget_mock.get_budget.return_value = 100
+        budget_mock.available_bytes.return_value = 50
+
+        self.assertEqual(self.model.compress_inactive_stacks(in_use=[]), 0)
+
+        for stack in stacks:
+            stack.presenter.images.compress.assert_not_called()
+
     def test_stack_list(self):
         uid, widget_mock, expected_name = self._add_mock_widget()
 
@@ -124,7 +186,7 @@ class MainWindowModelTest(unittest.TestCase):
 
         self.model.do_load_stack(lp, progress_mock)
 
-        load_p_mock.assert_called_once_with(sample_mock, lp.dtype, progress_mock)
+        load_p_mock.assert_called_once_with(sample_mock, lp.dtype, progress_mock, False)
         load_log_mock.assert_not_called()
 
     @mock.patch('mantidimaging.core.io.loader.load_log')
@@ -140,7 +202,7 @@ class MainWindowModelTest(unittest.TestCase):
 
         self.model.do_load_stack(lp, progress_mock)
 
-        load_p_mock.assert_called_once_with(sample_mock, lp.dtype, progress_mock)
+        load_p_mock.assert_called_once_with(sample_mock, lp.dtype, progress_mock, False)
         load_log_mock.assert_called_once_with(sample_mock.log_file)
 
     @mock.patch('mantidimaging.core.io.loader.load_log')
@@ -162,7 +224,7 @@ class MainWindowModelTest(unittest.TestCase):
         self.model.do_load_stack(lp, progress_mock)
 
         load_p_mock.assert_has_calls([
-            mock.call(sample_mock, lp.dtype, progress_mock),
+            mock.call(sample_mock, lp.dtype, progress_mock, False),
             mock.call(flat_before_mock, lp.dtype, progress_mock),
             mock.call(flat_after_mock, lp.dtype, progress_mock)
         ])
@@ -200,7 +262,7 @@ class MainWindowModelTest(unittest.TestCase):
         self.model.do_load_stack(lp, progress_mock)
 
         load_p_mock.assert_has_calls([
-            mock.call(sample_mock, lp.dtype, progress_mock),
+            mock.call(sample_mock, lp.dtype, progress_mock, False),
             mock.call(flat_before_mock, lp.dtype, progress_mock),
             mock.call(flat_after_mock, lp.dtype, progress_mock),
             mock.call(dark_before_mock, lp.dtype, progress_mock),
@@ -310,3 +372,23 @@ class MainWindowModelTest(unittest.TestCase):
         self.model.load_stack(file_path, progress)
 
         loader.load_stack.assert_called_once_with(file_path, progress)
+
+
+@start_qapplication
+class ShowNewDataTest(unittest.TestCase):
+    def setUp(self):
+        self.stack = mock.Mock()
+        self.stack.image_view = MIImageView()
+        self.stack.presenter.images = th.generate_images()
+
+    def tearDown(self):
+        sip.delete(self.stack.image_view)  # type: ignore
+
+    def test_compressed_stack_stays_compressed_when_shown(self):
+        images = self.stack.presenter.images
+        images.compress()
+
+        _show_new_data(self.stack)
+
+        self.assertTrue(images.is_compressed)
+        self.assertIs(self.stack.image_view.image, images.display_data)
@@ -157,6 +157,33 @@ class MainWindowPresenterTest(unittest.TestCase):
         self.assertEqual(5, len(self.presenter.model.stack_list))
         self.view.active_stacks_changed.emit.assert_called_once()
 
+    def test_free_up_memory_keeps_stacks_in_use(self):
+        shown, hidden, filtered, reconstructed = [mock.Mock() for _ in range(4)]
+        shown.visibleRegion.return_value.isEmpty.return_value = False
+        for stack in (hidden, filtered, reconstructed):
+            stack.visibleRegion.return_value.isEmpty.return_value = True
+        self.view.filters = mock.Mock()
+        self.view.filters.presenter.stack = filtered
+        self.view.recon = mock.Mock()
+        self.view.recon.presenter.model.stack = reconstructed
+        self.presenter.model = mock.Mock()
+        self.presenter.model.get_all_stack_visualisers.return_value = [shown, hidden, filtered, reconstructed]
+
+        self.presenter.free_up_memory()
+
+        in_use = {shown.uuid, filtered.uuid, reconstructed.uuid}
+        self.presenter.model.compress_inactive_stacks.assert_called_once_with(in_use)
+        self.presenter.model.evict_idle_stacks.assert_called_once_with(in_use)
+
+    def test_shown_stack_marked_used(self):
+        stack = mock.Mock()
+        self.presenter.model = mock.Mock()
+
+        self.presenter._on_stack_visibility_changed(stack, False)
+        self.presenter.model.mark_used.assert_not_called()
+        self.presenter._on_stack_visibility_changed(stack, True)
+        self.presenter.model.mark_used.assert_called_once_with(stack.uuid)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -266,6 +266,9 @@ class MainWindowView(BaseMainWindowView):
     def get_stack_visualiser(self, stack_uuid):
         return self.presenter.get_stack_visualiser(stack_uuid)
 
+    def mark_stack_used(self, stack_uuid: UUID):
+        self.presenter.mark_stack_used(stack_uuid)
+
     def get_images_from_stack_uuid(self, stack_uuid) -> Images:
         return self.presenter.get_stack_visualiser(stack_uuid).presenter.images
 
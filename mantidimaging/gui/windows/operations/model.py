@@ -6,6 +6,7 @@ from typing import Callable, TYPE_CHECKING, List, Any, Dict
 
 from mantidimaging.core.operations.base_filter import BaseFilter, FilterGroup
 from mantidimaging.core.operations.loader import load_filter_packages
+from mantidimaging.core.parallel import budget, scratch
 from mantidimaging.gui.dialogs.async_task import start_async_task_view
 from mantidimaging.gui.mvp_base import BaseMainWindowView
 
@@ -15,6 +16,10 @@ if TYPE_CHECKING:
     from mantidimaging.gui.windows.stack_visualiser import StackVisualiserView  # pragma: no cover
 
 
+# How long an operation waits for others to free up the memory it needs, before it is refused
+MEMORY_WAIT_SECONDS = 30
+
+
 def ensure_tuple(val):
     return val if isinstance(val, tuple) else (val, )
 
@@ -110,7 +115,17 @@ class FiltersWindowModel(object):
         # Run filter
         exec_func: partial = self.selected_filter.execute_wrapper(**input_kwarg_widgets)
         exec_func.keywords["progress"] = progress
-        exec_func(images)
+        peak_extra_memory = self.selected_filter.peak_extra_memory(images, **exec_func.keywords)
+        try:
+            with budget.reserve(peak_extra_memory,
+                                f"'{self.selected_filter.filter_name}'",
+                                timeout=MEMORY_WAIT_SECONDS,
+                                required=not scratch.fallback_to_scratch()):
+                exec_func(images)
+        except Exception:
+            # the filter might have changed some of the images before it failed
+            images.mark_changed()
+            raise
         # store the executed filter in history if it executed successfully
         images.record_operation(
             self.selected_filter.__name__,  # type: ignore
@@ -79,6 +79,8 @@ class FiltersWindowPresenter(BasePresenter):
         return max(num_images - 1, 0)
 
     def set_stack_uuid(self, uuid):
+        if uuid is not None:
+            self.main_window.mark_stack_used(uuid)
         self.set_stack(self.main_window.get_stack_visualiser(uuid) if uuid is not None else None)
 
     def set_stack(self, stack):
@@ -189,9 +191,8 @@ class FiltersWindowPresenter(BasePresenter):
                 # if the stack that was kept happened to have a proj180 stack - then apply the filter to that too
                 if stack.presenter.images.has_proj180deg() and do_180deg and not self.applying_to_all:
                     self.view.clear_previews()
-                    # Apply to proj180 synchronously - this function is already running async
-                    # and running another async instance causes a race condition in the parallel module
-                    # where the shared data can be removed in the middle of the operation of another operation
+                    # Apply to proj180 synchronously, as its stack is updated straight after.
+                    # Each parallel execution carries its own data, so this does not interfere with any other
                     self._do_apply_filter_sync(
                         [self.view.main_window.get_stack_with_images(stack.presenter.images.proj180deg)])
                     self.view.main_window.update_stack_with_images(stack.presenter.images.proj180deg)
@@ -9,6 +9,7 @@ import numpy as np
 
 import mantidimaging.test_helpers.unit_test_helper as th
 from mantidimaging.core.operation_history import const
+from mantidimaging.core.parallel import budget
 from mantidimaging.gui.windows.operations import FiltersWindowModel
 from mantidimaging.gui.windows.stack_visualiser import (StackVisualiserView, StackVisualiserPresenter, SVParameters)
 
@@ -153,12 +154,27 @@ class FiltersWindowModelTest(unittest.TestCase):
         callback_mock = mock.Mock()
 
         selected_filter_mock.execute_wrapper.return_value = partial(callback_mock)
+        selected_filter_mock.peak_extra_memory.return_value = 0
         self.model.selected_filter = selected_filter_mock
         self.model.apply_to_images(images, progress=progress_mock)
 
         selected_filter_mock.validate_execute_kwargs.assert_called_once()
+        selected_filter_mock.peak_extra_memory.assert_called_once_with(images, progress=progress_mock)
         callback_mock.assert_called_once_with(images, progress=progress_mock)
 
+    @mock.patch("mantidimaging.gui.windows.operations.model.MEMORY_WAIT_SECONDS", 0)
+    def test_apply_filter_to_images_refused_over_memory_budget(self):
+        images = th.generate_images()
+        selected_filter_mock = mock.Mock()
+        selected_filter_mock.filter_name = "Test filter"
+        callback_mock = mock.Mock()
+        selected_filter_mock.execute_wrapper.return_value = partial(callback_mock)
+        selected_filter_mock.peak_extra_memory.return_value = budget.get_budget() + 1
+        self.model.selected_filter = selected_filter_mock
+
+        self.assertRaises(budget.MemoryBudgetExceeded, self.model.apply_to_images, images)
+        callback_mock.assert_not_called()
+
     def test_get_filter_module_name(self):
         self.model.filters = mock.MagicMock()
 
@@ -3,7 +3,6 @@
 
 from typing import TYPE_CHECKING
 
-import numpy as np
 from PyQt5 import Qt
 from PyQt5.QtWidgets import (QAction, QApplication, QCheckBox, QComboBox, QLabel, QMainWindow, QMenu, QMessageBox,
                              QPushButton, QSizePolicy, QSplitter, QStyle, QVBoxLayout)
@@ -243,7 +242,7 @@ class FiltersWindowView(BaseMainWindowView):
                 self.roi_view.setImage(images_.data)
                 self.roi_view_averaged = False
             else:
-                averaged_images = np.sum(self.presenter.stack.presenter.images.data, axis=0)
+                averaged_images = self.presenter.stack.presenter.images.summed_image()
                 self.roi_view.setImage(averaged_images)
                 self.roi_view_averaged = True
             self.roi_view.roi.show()
@@ -114,6 +114,8 @@ class ReconstructWindowPresenter(BasePresenter):
         stack = self.view.get_stack_visualiser(uuid)
         if self.model.is_current_stack(stack):
             return
+        if uuid is not None:
+            self.view.mark_stack_used(uuid)
 
         self.view.reset_image_recon_preview()
         self.view.clear_cor_table()
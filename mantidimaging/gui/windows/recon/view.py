@@ -342,6 +342,9 @@ class ReconstructWindowView(BaseMainWindowView):
             return self.main_window.get_stack_visualiser(uuid)
         return None
 
+    def mark_stack_used(self, uuid):
+        self.main_window.mark_stack_used(uuid)
+
     def hide_tilt(self):
         self.image_view.hide_tilt()
 
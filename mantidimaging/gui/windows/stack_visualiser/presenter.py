@@ -66,6 +66,8 @@ class StackVisualiserPresenter(BasePresenter):
             getLogger(__name__).exception("Notification handler failed")
 
     def delete_data(self):
+        if self.images is not None:
+            self.images.release()
         self.images = None
 
     def get_image(self, index) -> Images:
@@ -73,7 +75,7 @@ class StackVisualiserPresenter(BasePresenter):
 
     def refresh_image(self):
         self.view.image = self.summed_image if self.image_mode is SVImageMode.SUMMED \
-            else self.images.data
+            else self.images.display_data
 
     def get_parameter_value(self, parameter: SVParameters):
         """
@@ -92,10 +94,8 @@ class StackVisualiserPresenter(BasePresenter):
         else:
             self.image_mode = SVImageMode.NORMAL
 
-        if self.image_mode is SVImageMode.SUMMED and \
-                (self.summed_image is None
-                 or self.summed_image.shape != self.images.data.shape[1:]):
-            self.summed_image = self.model.sum_images(self.images.data)
+        if self.image_mode is SVImageMode.SUMMED:
+            self.summed_image = self.images.summed_image()
         self.refresh_image()
 
     def create_swapped_axis_stack(self):
@@ -109,6 +109,8 @@ class StackVisualiserPresenter(BasePresenter):
         with operation_in_progress("Copying data, this may take a while",
                                    "The data is being copied, this may take a while.", self.view):
             new_images = self.images.copy(flip_axes=False)
+            # these images now read from the memory they share with the copy, which is shown instead of their old array
+            self.refresh_image()
             self.view.parent_create_stack(new_images, self.view.name)
 
     def dupe_stack_roi(self):
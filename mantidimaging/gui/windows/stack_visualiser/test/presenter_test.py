@@ -55,7 +55,7 @@ class StackVisualiserPresenterTest(unittest.TestCase):
         self.presenter.image_mode = SVImageMode.SUMMED
         self.presenter.notify(SVNotification.TOGGLE_IMAGE_MODE)
         assert self.presenter.image_mode is SVImageMode.NORMAL
-        self.presenter.model.sum_images.assert_not_called()
+        self.assertIsNone(self.presenter.summed_image)
 
     def test_notify_toggle_image_mode_summed_to_normal(self):
         self.presenter.image_mode = SVImageMode.NORMAL
@@ -64,16 +64,21 @@ class StackVisualiserPresenterTest(unittest.TestCase):
 
     def test_notify_toggle_image_mode_sets_summed_image(self):
         self.presenter.image_mode = SVImageMode.NORMAL
-        self.summed_image = None
         self.presenter.notify(SVNotification.TOGGLE_IMAGE_MODE)
-        assert self.presenter.summed_image == self.presenter.model.sum_images.return_value
-        self.presenter.model.sum_images.assert_called_once_with(self.presenter.images.data)
+        npt.assert_equal(self.presenter.summed_image, np.sum(self.presenter.images.data, axis=0))
 
-    def test_notify_toggle_image_mode_does_not_set_summed_image(self):
+    def test_notify_toggle_image_mode_reuses_summed_image_until_changed(self):
         self.presenter.image_mode = SVImageMode.NORMAL
-        self.presenter.summed_image = self.presenter.images.data[0]
         self.presenter.notify(SVNotification.TOGGLE_IMAGE_MODE)
-        self.presenter.model.sum_images.assert_not_called()
+        summed_image = self.presenter.summed_image
+        self.presenter.notify(SVNotification.TOGGLE_IMAGE_MODE)
+        self.presenter.notify(SVNotification.TOGGLE_IMAGE_MODE)
+        self.assertIs(self.presenter.summed_image, summed_image)
+
+        self.presenter.images.mark_changed()
+        self.presenter.notify(SVNotification.TOGGLE_IMAGE_MODE)
+        self.presenter.notify(SVNotification.TOGGLE_IMAGE_MODE)
+        self.assertIsNot(self.presenter.summed_image, summed_image)
 
     def test_get_num_images(self):
         assert self.presenter.get_num_images() == self.presenter.images.num_projections
@@ -10,10 +10,11 @@ from PyQt5.QtWidgets import QDockWidget
 
 import mantidimaging.test_helpers.unit_test_helper as th
 from mantidimaging.core.data import Images
+from mantidimaging.core.data.lazy_stack import CopyOnWriteStack
 from mantidimaging.core.utility.sensible_roi import SensibleROI
 from mantidimaging.core.utility.version_check import versions
 from mantidimaging.gui.windows.main import MainWindowView
-from mantidimaging.gui.windows.stack_visualiser import StackVisualiserView
+from mantidimaging.gui.windows.stack_visualiser import StackVisualiserView, SVNotification
 from mantidimaging.test_helpers import start_qapplication
 
 versions._use_test_values()
@@ -52,6 +53,17 @@ class StackVisualiserViewTest(unittest.TestCase):
         self.dock.setWindowTitle(title)
         self.assertEqual(title, self.view.name)
 
+    def test_duplicate_shown_without_copying_data(self):
+        self.view.presenter.notify(SVNotification.DUPE_STACK)
+        views = self.window.presenter.model.get_all_stack_visualisers()
+        self.assertEqual(2, len(views))
+
+        for view in views:
+            display_data = view.presenter.images.display_data
+            self.assertIsInstance(display_data, CopyOnWriteStack)
+            self.assertFalse(display_data.is_materialised)
+            self.assertIs(view.image_view.image, display_data)
+
     def test_closeEvent_deletes_images(self):
         self.dock.setFloating = mock.Mock()
         self.dock.deleteLater = mock.Mock()
@@ -34,8 +34,8 @@ class StackVisualiserView(BaseMainWindowView):
 
     def __init__(self, parent: 'MainWindowView', dock: QDockWidget, images: Images):
         # enforce not showing a single image
-        assert images.data.ndim == 3, \
-            "Data does NOT have 3 dimensions! Dimensions found: {0}".format(images.data.ndim)
+        assert images.display_data.ndim == 3, \
+            "Data does NOT have 3 dimensions! Dimensions found: {0}".format(images.display_data.ndim)
 
         # We set the main window as the parent, the effect is the same as
         # having no parent, the window will be inside the QDockWidget. If the
@@ -78,7 +78,7 @@ class StackVisualiserView(BaseMainWindowView):
         self.actionCloseStack.triggered.connect(self.close)
         self.actionCloseStack.setShortcut("Ctrl+W")
         self.dock.addAction(self.actionCloseStack)
-        self.image_view.setImage(self.presenter.images.data)
+        self.image_view.setImage(self.presenter.images.display_data)
         self.image_view.roi_changed_callback = self.roi_changed_callback
         self.layout.addWidget(self.image_view)
 
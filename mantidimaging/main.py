@@ -35,6 +35,11 @@ def parse_args():
 
     parser.add_argument("--version", action="store_true", help="Print version number and exit.")
 
+    parser.add_argument("--calibrate-parallel",
+                        action="store_true",
+                        help="Benchmark the parallel execution of the operations on this machine, "
+                        "save the fastest settings for each of them, and exit.")
+
     return parser.parse_args()
 
 
@@ -50,6 +55,11 @@ def main():
     h.initialise_logging(logging.getLevelName(args.log_level))
     startup_checks()
 
+    if args.calibrate_parallel:
+        from mantidimaging.core.parallel import calibration
+        calibration.calibrate()
+        return
+
     from mantidimaging import gui
     gui.execute()
 